@@ -0,0 +1,160 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+
+from benchmarks import generate_catalog as gen
+from libs import catalog as cat
+from libs import classes as cls
+
+
+class Dict_Item:
+    """ Classe de referência com a representação original do item do carrinho, com cópias dos atributos do produto no __dict__
+    """
+    # Sem referência ao catálogo, o carrinho não troca a versão dos preços dos itens copiados
+    catalog = None
+
+    def __init__(self, id:int, name:str, price:float, minimun:int, amount_per_package:int, max_availability:int, quantity:int):
+        self.id = id
+        self.name = name
+        self.price = price
+        self.minimun = minimun
+        self.amount_per_package = amount_per_package
+        self.max_availability = max_availability
+        self.quantity = quantity
+
+    @property
+    def price_cents(self):
+        return cls.to_cents(self.price)
+
+
+def build_catalog(size:int, seed:int):
+    """ Função que monta em memória um catálogo sintético
+
+    Args:
+        size (int): Quantidade de produtos
+        seed (int): Semente do gerador
+
+    Returns:
+        [cat.Catalog]: Retorna o catálogo de produtos
+    """
+    rng = random.Random(seed)
+    builder = cat.Catalog_Builder()
+
+    for id in range(1, size + 1):
+        builder.add(gen.generate_product(rng, id))
+
+    return builder.build(1)
+
+
+def copied_item(catalog:cat.Catalog, id:int):
+    """ Função que cria o item de referência copiando os atributos do produto do catálogo, com a quantidade mínima
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+        id (int): Id do produto
+
+    Returns:
+        [Dict_Item]: Retorna o item do carrinho
+    """
+    match = catalog.get(id)
+    return Dict_Item(match['id'], match['name'], match['price'], match['minimun'], match['amount-per-package'], match['max-availability'], match['minimun'])
+
+
+def catalog_item(catalog:cat.Catalog, id:int):
+    """ Função que cria o item do carrinho referenciando o produto do catálogo, como nas rotas do carrinho, com a quantidade mínima
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+        id (int): Id do produto
+
+    Returns:
+        [cls.Item]: Retorna o item do carrinho
+    """
+    match = catalog.get(id)
+    return cls.Item.from_product(catalog, match, match['minimun'])
+
+
+def measure(new_item, catalog:cat.Catalog, lines:int):
+    """ Função que mede a memória alocada por linha de um carrinho com a quantidade de linhas informada
+
+    Args:
+        new_item (function): Função que cria o item do carrinho a partir do catálogo e do id do produto
+        catalog (cat.Catalog): Catálogo de produtos
+        lines (int): Quantidade de linhas do carrinho
+
+    Returns:
+        [dict]: Retorna os bytes por item e por linha do carrinho
+    """
+    ids = range(1, lines + 1)
+
+    gc.collect()
+    tracemalloc.start()
+
+    start = tracemalloc.get_traced_memory()[0]
+    items = [new_item(catalog, id) for id in ids]
+    items_bytes = tracemalloc.get_traced_memory()[0] - start
+
+    # A lista auxiliar é descontada da medição dos itens
+    items_bytes -= sys.getsizeof(items)
+
+    start = tracemalloc.get_traced_memory()[0]
+    shopping_cart = cls.Shopping_Cart()
+    for item in items:
+        assert shopping_cart.add_to_shopping_cart(item) == True
+    cart_bytes = tracemalloc.get_traced_memory()[0] - start
+
+    tracemalloc.stop()
+    del items, shopping_cart
+
+    data = {
+        'item_bytes': items_bytes / lines,
+        'line_bytes': (items_bytes + cart_bytes) / lines
+    }
+
+    return data
+
+
+def run(lines:int, seed:int):
+    """ Função que compara a memória das linhas do carrinho com o item atual, que referencia o produto do catálogo, e
+    com a representação anterior, que copiava os atributos do produto
+
+    Args:
+        lines (int): Quantidade de linhas do carrinho
+        seed (int): Semente do gerador
+
+    Returns:
+        [dict]: Retorna as medições de cada representação do item
+    """
+    catalog = build_catalog(lines, seed)
+
+    data = {
+        'lines': lines,
+        'before': measure(copied_item, catalog, lines),
+        'after': measure(catalog_item, catalog, lines)
+    }
+
+    return data
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mede a memória ocupada por linha do carrinho de compras')
+    parser.add_argument('--lines', type=int, default=100000, help='quantidade de linhas do carrinho')
+    parser.add_argument('--seed', type=int, default=0, help='semente do gerador')
+    parser.add_argument('--output', help='arquivo JSON com os resultados')
+    args = parser.parse_args()
+
+    data = run(args.lines, args.seed)
+
+    for name in ('before', 'after'):
+        print('{0:>6}: {1:.1f} bytes por item, {2:.1f} bytes por linha do carrinho'.format(
+            name, data[name]['item_bytes'], data[name]['line_bytes']), file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as json_file:
+            json.dump(data, json_file, indent=2, ensure_ascii=False)
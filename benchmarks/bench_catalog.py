@@ -0,0 +1,229 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import generate_catalog as gen
+
+# Buscas executadas em cada tamanho de catálogo, de termos frequentes a termos inexistentes
+SEARCH_QUERIES = ['ração', 'feij', 'refri', 'café torrado', 'zero', 'sem glúten', 'a', 'xablau']
+
+# Textos digitados no autocompletar, simulando cada tecla da digitação
+AUTOCOMPLETE_PREFIXES = ['r', 'ra', 'rac', 'raca', 'racao', 'racao p', 'racao para', 'racao para ca', 'f', 'fe', 'fei', 'de u', 'xa']
+
+# Textos com várias palavras no autocompletar, com palavras frequentes e poucos (ou nenhum) produtos com a sequência
+AUTOCOMPLETE_WORD_PREFIXES = ['com gas 1', 'racao para ca', 'suco de u', 'refrigerante com', 'sem gluten da f']
+
+
+def summarize(latencies:list):
+    """ Função que resume uma lista de latências em nanosegundos
+
+    Args:
+        latencies (list): Latências de cada operação, em nanosegundos
+
+    Returns:
+        [dict]: Retorna a vazão e os percentis das latências, em microssegundos
+    """
+    ordered = sorted(latencies)
+    total = sum(ordered)
+
+    def percentile(value):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * value))] / 1000
+
+    data = {
+        'operations': len(ordered),
+        'ops_per_second': len(ordered) / (total / 1e9) if total else None,
+        'mean_us': total / len(ordered) / 1000,
+        'p50_us': percentile(0.50),
+        'p95_us': percentile(0.95),
+        'p99_us': percentile(0.99),
+        'max_us': ordered[-1] / 1000
+    }
+
+    return data
+
+
+def peak_rss():
+    """ Função que retorna o pico de memória residente do processo atual
+
+    Returns:
+        [int]: Retorna o pico de memória em bytes
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # O Linux informa o valor em kilobytes e o macOS em bytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def measure(path:str, size:int, seed:int, lookups:int, repeat:int):
+    """ Função que mede as operações do catálogo em um processo isolado, para que o pico de memória seja apenas deste tamanho
+
+    Args:
+        path (str): Caminho do catálogo sintético
+        size (int): Quantidade de produtos
+        seed (int): Semente usada na escolha dos ids buscados
+        lookups (int): Quantidade de buscas por id
+        repeat (int): Quantidade de repetições de cada busca por nome
+
+    Returns:
+        [dict]: Retorna as medições deste tamanho de catálogo
+    """
+    from cotabest_api import app
+    from flask import jsonify
+    from libs import catalog as cat
+    from libs import functions as funcs
+
+    rss_before = peak_rss()
+
+    start = time.perf_counter()
+    catalog = cat.load_catalog(path, 1)
+    load_seconds = time.perf_counter() - start
+    rss_loaded = peak_rss()
+
+    # Os índices são montados antes das medições, como no aquecimento de cada nova versão do catálogo
+    warm = {}
+    for warmer in funcs.CATALOG_WARMERS:
+        start = time.perf_counter()
+        warmer(catalog)
+        warm[warmer.__name__] = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    ids = [rng.randint(1, size) for _ in range(lookups)]
+    latencies = []
+
+    for id in ids:
+        start = time.perf_counter_ns()
+        funcs.find_product_by_id(id, catalog)
+        latencies.append(time.perf_counter_ns() - start)
+
+    lookup = summarize(latencies)
+
+    search = {}
+    for query in SEARCH_QUERIES:
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            matches = funcs.find_products(query, catalog)
+            latencies.append(time.perf_counter_ns() - start)
+
+        search[query] = summarize(latencies)
+        search[query]['matches'] = len(matches)
+
+    latencies = []
+    for _ in range(repeat * 20):
+        for prefix in AUTOCOMPLETE_PREFIXES:
+            start = time.perf_counter_ns()
+            funcs.autocomplete(prefix, funcs.AUTOCOMPLETE_LIMIT, catalog)
+            latencies.append(time.perf_counter_ns() - start)
+
+    autocomplete = summarize(latencies)
+    autocomplete['index_seconds'] = warm['prefix_index']
+    autocomplete['pair_index_seconds'] = warm['pair_index']
+
+    autocomplete_words = {}
+    for prefix in AUTOCOMPLETE_WORD_PREFIXES:
+        latencies = []
+        for _ in range(repeat * 20):
+            start = time.perf_counter_ns()
+            matches = funcs.autocomplete(prefix, funcs.AUTOCOMPLETE_LIMIT, catalog)
+            latencies.append(time.perf_counter_ns() - start)
+
+        autocomplete_words[prefix] = summarize(latencies)
+        autocomplete_words[prefix]['matches'] = len(matches)
+
+    with app.app_context():
+        start = time.perf_counter()
+        body = jsonify(list(catalog)).get_data()
+        list_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        jsonify(funcs.paginate_products(catalog, None, funcs.PAGE_LIMIT, None)).get_data()
+        page_seconds = time.perf_counter() - start
+
+    data = {
+        'size': size,
+        'load': {'seconds': load_seconds, 'products_per_second': size / load_seconds},
+        'warm_seconds': warm,
+        'lookup': lookup,
+        'search': search,
+        'autocomplete': autocomplete,
+        'autocomplete_words': autocomplete_words,
+        'list_serialization': {'seconds': list_seconds, 'bytes': len(body), 'page_seconds': page_seconds},
+        'memory': {'peak_rss_bytes': peak_rss(), 'load_rss_bytes': rss_loaded - rss_before}
+    }
+
+    return data
+
+
+def run(sizes:list, seed:int, lookups:int, repeat:int):
+    """ Função que gera os catálogos sintéticos e executa as medições de cada tamanho em um subprocesso
+
+    Args:
+        sizes (list): Tamanhos de catálogo
+        seed (int): Semente do gerador
+        lookups (int): Quantidade de buscas por id
+        repeat (int): Quantidade de repetições de cada busca por nome
+
+    Returns:
+        [list]: Retorna as medições de todos os tamanhos
+    """
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            path = os.path.join(tmp_dir, 'catalog-{0}.json'.format(size))
+            gen.generate_catalog(path, size, seed)
+
+            command = [sys.executable, '-m', 'benchmarks.bench_catalog', '--child', path, '--sizes', str(size),
+                       '--seed', str(seed), '--lookups', str(lookups), '--repeat', str(repeat)]
+            output = subprocess.run(command, check=True, stdout=subprocess.PIPE).stdout
+
+            result = json.loads(output)
+            result['file_bytes'] = os.path.getsize(path)
+            results.append(result)
+            os.remove(path)
+
+            print('{0:>10} produtos: carga {1:.3f}s, id p99 {2:.1f}us, autocompletar p99 {3:.1f}us, pico de memória {4:.1f}MB'.format(
+                size, result['load']['seconds'], result['lookup']['p99_us'], result['autocomplete']['p99_us'],
+                result['memory']['peak_rss_bytes'] / 2 ** 20), file=sys.stderr)
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mede carga, busca por id, busca por nome e serialização do catálogo em vários tamanhos')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='tamanhos de catálogo separados por vírgula (até 10000000)')
+    parser.add_argument('--seed', type=int, default=0, help='semente do gerador')
+    parser.add_argument('--lookups', type=int, default=10000, help='quantidade de buscas por id')
+    parser.add_argument('--repeat', type=int, default=5, help='repetições de cada busca por nome')
+    parser.add_argument('--output', default='benchmarks/baseline.json', help='arquivo JSON com os resultados')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    # Execução interna de um único tamanho, chamada pelo processo principal
+    if args.child:
+        print(json.dumps(measure(args.child, sizes[0], args.seed, args.lookups, args.repeat)))
+        sys.exit(0)
+
+    data = {
+        'generated_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'results': run(sizes, args.seed, args.lookups, args.repeat)
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as json_file:
+        json.dump(data, json_file, indent=2, ensure_ascii=False)
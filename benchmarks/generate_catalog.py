@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import random
+
+# Vocabulário usado na geração dos nomes dos produtos
+PRODUCTS = [
+    'Ração', 'Feijão', 'Arroz', 'Refrigerante', 'Pão', 'Leite', 'Café', 'Açúcar', 'Óleo', 'Macarrão', 'Farinha de trigo',
+    'Sabão em pó', 'Detergente', 'Biscoito', 'Suco', 'Água mineral', 'Cerveja', 'Molho de tomate', 'Sal', 'Azeite',
+    'Achocolatado', 'Margarina', 'Queijo', 'Presunto', 'Iogurte', 'Papel higiênico', 'Amaciante', 'Desinfetante',
+    'Milho', 'Ervilha', 'Atum', 'Sardinha', 'Fubá', 'Aveia', 'Granola', 'Chá', 'Vinagre', 'Maionese', 'Catchup', 'Mostarda'
+]
+
+QUALIFIERS = [
+    'para cachorro', 'para gato', 'para coelho', 'preto', 'carioca', 'agulha', 'integral', 'de forma', 'desnatado',
+    'torrado', 'cristal', 'refinado', 'de soja', 'parboilizado', 'light', 'zero', 'tradicional', 'orgânico', 'sem glúten',
+    'em pó', 'líquido', 'extra forte', 'com gás', 'sem gás', 'de coco', 'de laranja', 'de uva', 'de maçã', 'limão',
+    'morango', 'baunilha', 'filhote', 'adulto', 'sênior', 'premium', 'econômico'
+]
+
+BRANDS = [
+    'Bom Preço', 'Da Fazenda', 'Sabor Real', 'Nobre', 'Campo Verde', 'Estrela', 'Vitória', 'São Jorge', 'Primavera',
+    'Tropical', 'Boa Safra', 'Dona Maria', 'Serra Azul', 'Ouro Fino', 'Vale do Sol', 'Brasileirinho'
+]
+
+SIZES = ['1kg', '2kg', '5kg', '15kg', '500g', '200g', '1L', '2L', '5L', '350ml', '600ml', '12un', '30un', '6x1L']
+
+PACKAGES = [1, 2, 5, 6, 7, 10, 12, 20, 24, 30, 50]
+
+
+def generate_product(rng:random.Random, id:int):
+    """ Função que gera um produto sintético com nome em português e regras de venda variadas
+
+    Args:
+        rng (random.Random): Gerador de números aleatórios
+        id (int): Id do produto
+
+    Returns:
+        [dict]: Retorna o produto no formato do arquivo de catálogo
+    """
+    words = [rng.choice(PRODUCTS)]
+
+    if rng.random() < 0.8:
+        words.append(rng.choice(QUALIFIERS))
+
+    words.append(rng.choice(BRANDS))
+    words.append(rng.choice(SIZES))
+
+    package = rng.choice(PACKAGES)
+    minimun = package * rng.randint(1, 20)
+
+    product = {
+        'id': id,
+        'name': ' '.join(words),
+        'price': round(rng.uniform(0.5, 500.0), 2),
+        'minimun': minimun,
+        'amount-per-package': package,
+        'max-availability': rng.randint(minimun, minimun * 5000)
+    }
+
+    return product
+
+
+def generate_catalog(path:str, size:int, seed:int=0):
+    """ Função que grava um catálogo sintético determinístico, produto a produto, sem mantê-lo em memória
+
+    Args:
+        path (str): Caminho do arquivo JSON a ser gravado
+        size (int): Quantidade de produtos
+        seed (int): Semente do gerador, o mesmo valor sempre gera o mesmo catálogo
+    """
+    rng = random.Random(seed)
+
+    with open(path, 'w', encoding='utf-8') as json_file:
+        json_file.write('[\n')
+
+        for id in range(1, size + 1):
+            if id > 1:
+                json_file.write(',\n')
+            json_file.write(json.dumps(generate_product(rng, id), ensure_ascii=False))
+
+        json_file.write('\n]\n')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera um catálogo sintético de produtos')
+    parser.add_argument('size', type=int, help='quantidade de produtos')
+    parser.add_argument('path', help='arquivo JSON a ser gravado')
+    parser.add_argument('--seed', type=int, default=0, help='semente do gerador')
+    args = parser.parse_args()
+
+    generate_catalog(args.path, args.size, args.seed)
@@ -1,26 +1,100 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 
+import hmac
 import json
+import os
+import signal
+import threading
 import uuid
-from flask import Flask, request, jsonify
+import click
+import contextlib
+from decimal import Decimal
+from flask import Flask, after_this_request, request, jsonify
+from flask.json import JSONEncoder
+from libs import catalog as cat
 from libs import classes as cls
 from libs import functions as funcs
 
+
+class Catalog_JSON_Encoder(JSONEncoder):
+    """ Classe que serializa as visões de produtos do catálogo como objetos JSON e os valores monetários como números
+    """
+    def default(self, o):
+        if isinstance(o, cat.Product):
+            return dict(o)
+        if isinstance(o, Decimal):
+            return float(o)
+        return super().default(o)
+
+
 app = Flask(__name__)
+app.json_encoder = Catalog_JSON_Encoder
 
-# Criando um carrinho de compras
-shopping_cart_1 = cls.Shopping_Cart()
+# Token exigido nas rotas administrativas, que ficam desabilitadas caso ele não seja configurado
+app.config['ADMIN_TOKEN'] = os.environ.get('COTABEST_ADMIN_TOKEN')
+
+# O sinal SIGHUP solicita a recarga do catálogo, feita em segundo plano a partir da próxima requisição
+if hasattr(signal, 'SIGHUP') and threading.current_thread() is threading.main_thread():
+    signal.signal(signal.SIGHUP, lambda signum, frame: funcs.catalog_cache.request_reload())
+
+# Cookie e cabeçalho com o token do carrinho de compras de cada cliente
+CART_COOKIE = 'cart_token'
+CART_HEADER = 'X-Cart-Token'
 
 @app.route('/api/list_products', methods=['GET'])
 def list_products():
     """ Rota da api que retorna a lista de produtos
 
     Returns:
-        [json]: Retorna a lista de produtos cadastrados no arquivo JSON de base
+        [json]: Retorna a lista de produtos cadastrados no arquivo JSON de base, ou 304 caso o cliente já possua a versão atual
+    """
+    catalog = funcs.read_catalog()
+
+    # Caso seja solicitada a paginação ou a seleção de campos
+    if any(param in request.args for param in ('limit', 'cursor', 'fields')):
+        return list_products_page(catalog)
+
+    # O corpo da resposta é serializado apenas uma vez por versão do catálogo
+    body = catalog.derived('list_products', lambda: jsonify(list(catalog)).get_data())
+
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(catalog.etag)
+
+    # Responde 304 sem corpo caso o If-None-Match corresponda à versão atual
+    return response.make_conditional(request)
+
+
+def list_products_page(catalog):
+    """ Função que retorna uma página da lista de produtos, ordenada por id, com os parâmetros limit, cursor e fields
+
+    Returns:
+        [json]: Retorna os produtos da página e o cursor da próxima, ou erro caso algum parâmetro seja inválido
     """
-    products = funcs.read_products_list()
-    return jsonify(products), 200
+    limit = request.args.get('limit', str(funcs.PAGE_LIMIT))
+    cursor = request.args.get('cursor')
+    fields = request.args.get('fields')
+    after = None
+
+    # Caso o limite não seja um número entre 1 e o máximo permitido
+    limit = int(limit) if limit.isdecimal() else 0
+    if not 1 <= limit <= funcs.MAX_PAGE_LIMIT:
+        return jsonify({'error': 'O parâmetro limit deve ser um número entre 1 e {0} !!!'.format(funcs.MAX_PAGE_LIMIT)}), 400
+
+    # Caso o cursor informado não seja válido
+    if cursor is not None:
+        after = funcs.decode_cursor(cursor)
+        if after is None:
+            return jsonify({'error': 'O parâmetro cursor é inválido !!!'}), 400
+
+    # Caso algum dos campos informados não exista nos produtos
+    if fields is not None:
+        fields = [field.strip() for field in fields.split(',')]
+        if not all(field in funcs.PRODUCT_FIELDS for field in fields):
+            return jsonify({'error': 'O parâmetro fields aceita apenas os campos {0} !!!'.format(', '.join(funcs.PRODUCT_FIELDS))}), 400
+
+    data = funcs.paginate_products(catalog, after, limit, fields)
+    return jsonify(data), 200
 
 
 @app.route('/api/find_products', methods=['POST'])
@@ -28,21 +102,238 @@ def find_products():
     """ Rota da api que retorna um produto com base no nome informado
 
     Returns:
-        [json]: Retorna a lista de produtos encontrados com o nome informado, ou erro caso o parâmetro name não seja informado
+        [json]: Retorna a lista de produtos encontrados com o nome informado, dos mais relevantes para os menos relevantes, ou erro caso algum parâmetro seja inválido
     """
+    # Caso o corpo da requisição não seja um objeto JSON
+    if type(request.json) != dict:
+        return jsonify({'error': 'O corpo da requisição deve ser um objeto JSON !!!'}), 400
+
     name = request.json.get('name')
+    options = search_options(request.json)
+
+    # Caso algum dos parâmetros da busca seja inválido
+    if type(options) == str:
+        return jsonify({'error': options}), 400
     
+    # Caso o nome não seja um texto
+    if name is not None and type(name) != str:
+        return jsonify({'error': 'O parâmetro name deve ser um texto !!!'}), 400
+
     # Caso o parâmetro name tenha sido passado corretamente retorna os matches
     if name is not None:
-        products = funcs.read_products_list()
-        matches = funcs.find_products(name, products)
-        return jsonify(matches), 200
+        catalog = funcs.read_catalog()
+        body = search_body(catalog, name, *options)
+        return app.response_class(body, mimetype='application/json'), 200
 
     else:
         # Caso o parâmetro name não tenha sido passado corretamente
         return jsonify({'error': 'O parâmetro name não foi informado!!!'}), 400
 
 
+@app.route('/api/find_products_batch', methods=['POST'])
+def find_products_batch():
+    """ Rota da api que busca vários nomes em uma única requisição (ex: uma lista de compras), com os mesmos parâmetros
+    fuzzy, limit e terms da busca por nome aplicados a todos
+
+    Returns:
+        [json]: Retorna uma lista com os produtos encontrados para cada nome, na ordem informada, ou erro caso algum parâmetro seja inválido
+    """
+    # Caso o corpo da requisição não seja um objeto JSON
+    if type(request.json) != dict:
+        return jsonify({'error': 'O corpo da requisição deve ser um objeto JSON !!!'}), 400
+
+    queries = request.json.get('queries')
+    options = search_options(request.json)
+
+    # Caso algum dos parâmetros da busca seja inválido
+    if type(options) == str:
+        return jsonify({'error': options}), 400
+
+    # Caso a lista de nomes não tenha sido passada corretamente
+    if type(queries) != list or not all(type(name) == str for name in queries):
+        return jsonify({'error': 'O parâmetro queries deve ser uma lista de nomes !!!'}), 400
+
+    if len(queries) > funcs.MAX_BATCH_QUERIES:
+        return jsonify({'error': 'O parâmetro queries aceita no máximo {0} nomes !!!'.format(funcs.MAX_BATCH_QUERIES)}), 400
+
+    # Todas as buscas usam a mesma versão do catálogo, e as buscas repetidas (após a normalização) são feitas uma única vez
+    catalog = funcs.read_catalog()
+    keys = [funcs.search_cache_key(name, *options) for name in queries]
+    bodies = {}
+
+    # As respostas fora do cache não são guardadas, para que um único lote não descarte as buscas frequentes do cache
+    for key, name in zip(keys, queries):
+        if key not in bodies:
+            bodies[key] = search_body(catalog, name, *options, store=False).rstrip()
+
+    # As respostas já serializadas de cada busca são apenas concatenadas
+    body = b'[' + b','.join(bodies[key] for key in keys) + b']\n'
+    return app.response_class(body, mimetype='application/json'), 200
+
+
+def search_options(data:dict):
+    """ Função que valida os parâmetros fuzzy, limit e terms das rotas de busca por nome
+
+    Args:
+        data (dict): Corpo da requisição
+
+    Returns:
+        [tuple]: Retorna a distância de edição, o limite e a busca por palavras, ou a mensagem de erro caso algum seja inválido
+    """
+    fuzzy = data.get('fuzzy', False)
+    limit = data.get('limit', funcs.SEARCH_LIMIT)
+    terms = data.get('terms', False)
+
+    # Caso o limite não seja um número entre 1 e o máximo permitido
+    if type(limit) != int or not 1 <= limit <= funcs.MAX_SEARCH_LIMIT:
+        return 'O parâmetro limit deve ser um número entre 1 e {0} !!!'.format(funcs.MAX_SEARCH_LIMIT)
+
+    # Caso o parâmetro fuzzy não seja um booleano ou a distância de edição 1 ou 2
+    if type(fuzzy) == bool:
+        fuzzy = funcs.FUZZY_DISTANCE if fuzzy else 0
+    elif type(fuzzy) != int or not 1 <= fuzzy <= funcs.FUZZY_DISTANCE:
+        return 'O parâmetro fuzzy deve ser true, false ou a distância de edição 1 ou 2 !!!'
+
+    # Caso o parâmetro terms não seja um booleano, ou seja usado junto com a busca aproximada
+    if type(terms) != bool or (terms and fuzzy):
+        return 'O parâmetro terms deve ser true ou false e não pode ser usado com o parâmetro fuzzy !!!'
+
+    return fuzzy, limit, terms
+
+
+def search_body(catalog:cat.Catalog, name:str, fuzzy:int, limit:int, terms:bool, store:bool=True):
+    """ Função que retorna a resposta serializada da busca por nome, reaproveitando o cache da versão atual do catálogo
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+        name (str): Nome ou parte do nome do produto
+        fuzzy (int): Distância de edição tolerada
+        limit (int): Quantidade máxima de produtos
+        terms (bool): Caso seja a busca por palavras
+        store (bool): Caso falso, a resposta de uma busca fora do cache não é guardada nele
+
+    Returns:
+        [bytes]: Retorna a lista de produtos encontrados em JSON
+    """
+    key = funcs.search_cache_key(name, fuzzy, limit, terms)
+
+    # Buscas repetidas na mesma versão do catálogo reaproveitam a resposta já serializada
+    body = funcs.search_cache.get(catalog.version, key)
+    if body is None:
+        body = jsonify(funcs.find_products(name, catalog, fuzzy, limit, terms)).get_data()
+        if store:
+            funcs.search_cache.put(catalog.version, key, body)
+
+    return body
+
+
+@app.route('/api/filter_products', methods=['POST'])
+def filter_products():
+    """ Rota da api que filtra os produtos por faixas de preço, mínimo, quantidade por pacote e disponibilidade, e pelo nome
+
+    Returns:
+        [json]: Retorna a lista de produtos dentro das faixas informadas, ou erro caso algum parâmetro seja inválido
+    """
+    # Caso o corpo da requisição não seja um objeto JSON
+    if type(request.json) != dict:
+        return jsonify({'error': 'O corpo da requisição deve ser um objeto JSON !!!'}), 400
+
+    name = request.json.get('name')
+    limit = request.json.get('limit', funcs.SEARCH_LIMIT)
+    ranges = funcs.parse_ranges(request.json)
+
+    # Caso alguma faixa não possua apenas os limites numéricos min e max
+    if ranges is None:
+        return jsonify({'error': 'As faixas dos campos {0} devem possuir apenas os limites numéricos min e max !!!'.format(', '.join(funcs.FILTER_FIELDS))}), 400
+
+    # Caso nenhum filtro tenha sido informado
+    if not ranges and name is None:
+        return jsonify({'error': 'Nenhum filtro foi informado!!!'}), 400
+
+    # Caso o nome não seja um texto
+    if name is not None and type(name) != str:
+        return jsonify({'error': 'O parâmetro name deve ser um texto !!!'}), 400
+
+    # Caso o limite não seja um número entre 1 e o máximo permitido
+    if type(limit) != int or not 1 <= limit <= funcs.MAX_SEARCH_LIMIT:
+        return jsonify({'error': 'O parâmetro limit deve ser um número entre 1 e {0} !!!'.format(funcs.MAX_SEARCH_LIMIT)}), 400
+
+    catalog = funcs.read_catalog()
+    matches = funcs.filter_products(ranges, name, limit, catalog)
+    return jsonify(matches), 200
+
+
+@app.route('/api/autocomplete', methods=['GET'])
+def autocomplete():
+    """ Rota da api que sugere produtos a cada tecla digitada, com os parâmetros prefix e limit
+
+    Returns:
+        [json]: Retorna a lista de produtos com alguma palavra do nome iniciada pelo prefixo, ou erro caso algum parâmetro seja inválido
+    """
+    prefix = request.args.get('prefix')
+    limit = request.args.get('limit', str(funcs.AUTOCOMPLETE_LIMIT))
+
+    # Caso o parâmetro prefix não tenha sido passado
+    if prefix is None:
+        return jsonify({'error': 'O parâmetro prefix não foi informado!!!'}), 400
+
+    # Caso o limite não seja um número entre 1 e o máximo permitido
+    limit = int(limit) if limit.isdecimal() else 0
+    if not 1 <= limit <= funcs.MAX_AUTOCOMPLETE_LIMIT:
+        return jsonify({'error': 'O parâmetro limit deve ser um número entre 1 e {0} !!!'.format(funcs.MAX_AUTOCOMPLETE_LIMIT)}), 400
+
+    catalog = funcs.read_catalog()
+    matches = funcs.autocomplete(prefix, limit, catalog)
+    return jsonify(matches), 200
+
+
+@contextlib.contextmanager
+def customer_shopping_cart(create:bool=False):
+    """ Função que abre o carrinho de compras do cliente da requisição, identificado pelo cabeçalho X-Cart-Token ou pelo
+    cookie cart_token, e devolve o token na resposta
+
+    Sem um carrinho guardado para o token informado é usado um carrinho vazio, que só é guardado, com um novo token,
+    quando a rota permite a criação e um produto foi incluído com sucesso. Assim, requisições sem token ou rejeitadas
+    não ocupam o repositório de carrinhos.
+
+    Args:
+        create (bool): Caso verdadeiro, o carrinho vazio é guardado caso algum produto tenha sido incluído
+
+    Yields:
+        [cls.Shopping_Cart]: Retorna o carrinho de compras do cliente
+    """
+    token = request.headers.get(CART_HEADER) or request.cookies.get(CART_COOKIE)
+
+    with funcs.cart_store.open(token, create=False) as (token, shopping_cart):
+        yield shopping_cart
+
+    if token is None and create and shopping_cart.items:
+        token = funcs.cart_store.store(shopping_cart)
+
+    if token is not None:
+        @after_this_request
+        def send_cart_token(response):
+            response.headers[CART_HEADER] = token
+            if request.cookies.get(CART_COOKIE) != token:
+                response.set_cookie(CART_COOKIE, token, httponly=True, samesite='Lax')
+            return response
+
+
+def removed_items(data:dict, removed:list):
+    """ Função que informa na resposta os ids dos itens removidos do carrinho por não existirem mais no catálogo
+
+    Args:
+        data (dict): Dados da resposta
+        removed (list): Ids dos itens removidos
+
+    Returns:
+        [dict]: Retorna os dados da resposta, com a lista removed caso algum item tenha sido removido
+    """
+    if removed:
+        data['removed'] = removed
+    return data
+
+
 @app.route('/api/shopping_cart', methods=['GET'])
 def get_shopping_cart():
     """ Rota da api que exibe o carrinho de compras
@@ -50,9 +341,12 @@ def get_shopping_cart():
     Returns:
         [json]: Retorna os dados presentes no carrinho de compras
     """
-    global shopping_cart_1
+    with customer_shopping_cart() as shopping_cart:
+        # Atualiza os preços do carrinho caso uma nova versão do catálogo tenha sido publicada
+        shopping_cart.reprice(funcs.read_catalog())
+
+        data = removed_items(funcs.get_shopping_cart(shopping_cart), shopping_cart.take_removed())
 
-    data = funcs.get_shopping_cart(shopping_cart_1)
     return jsonify(data), 200
 
 
@@ -63,12 +357,10 @@ def add_to_shopping_cart():
     Returns:
         [json]: Retorna se um produto foi criado ou os erros que foram encontrados
     """    
-    global shopping_cart_1
-    
     id = request.json.get('id')
     quantity = request.json.get('quantity')
-    products = funcs.read_products_list()
-    match = funcs.find_product_by_id(id, products)
+    catalog = funcs.read_catalog()
+    match = funcs.find_product_by_id(id, catalog)
 
     # Caso não seja passado um id ou não encontre o produto
     if id is None or not match:
@@ -80,17 +372,20 @@ def add_to_shopping_cart():
         # Caso o parâmetro name não tenha sido passado corretamente
         return jsonify({'error': 'O parâmetro quantity não foi informado !!!'}), 400   
 
-    item = cls.Item(match['id'], match['name'], match['price'], match['minimun'], match['amount-per-package'], match['max-availability'], quantity)
-    add_cart = shopping_cart_1.add_to_shopping_cart(item)
+    item = cls.Item.from_product(catalog, match, quantity)
+
+    with customer_shopping_cart(create=True) as shopping_cart:
+        add_cart = shopping_cart.add_to_shopping_cart(item)
+        removed = shopping_cart.take_removed()
 
     # Caso não encontre erros
     if add_cart == True:
-        return jsonify({'sucess': 'O produto {0} com {1} unidades foi adicionado com sucesso !!!'.format(item.name, item.quantity)}), 200
+        return jsonify(removed_items({'sucess': 'O produto {0} com {1} unidades foi adicionado com sucesso !!!'.format(item.name, item.quantity)}, removed)), 200
 
     # Pegando as mensagens de erro a serem exibidas
     errors = funcs.return_error_messages(add_cart, item)
 
-    return jsonify(errors), 400
+    return jsonify(removed_items(errors, removed)), 400
 
 
 @app.route('/api/update_shopping_cart', methods=['PUT'])
@@ -100,12 +395,10 @@ def update_to_shopping_cart():
     Returns:
         [json]: Retorna se um produto foi atualizado ou os erros que foram encontrados
     """
-    global shopping_cart_1
-
     id = request.json.get('id')
     quantity = request.json.get('quantity')
-    products = funcs.read_products_list()
-    match = funcs.find_product_by_id(id, products)
+    catalog = funcs.read_catalog()
+    match = funcs.find_product_by_id(id, catalog)
 
     # Caso não seja passado um id ou não encontre o produto
     if id is None or not match:
@@ -117,17 +410,20 @@ def update_to_shopping_cart():
         # Caso o parâmetro name não tenha sido passado corretamente
         return jsonify({'error': 'O parâmetro quantity não foi informado !!!'}), 400   
 
-    item = cls.Item(match['id'], match['name'], match['price'], match['minimun'], match['amount-per-package'], match['max-availability'], quantity)
-    update_cart = shopping_cart_1.update_to_shopping_cart(item)
+    item = cls.Item.from_product(catalog, match, quantity)
+
+    with customer_shopping_cart() as shopping_cart:
+        update_cart = shopping_cart.update_to_shopping_cart(item)
+        removed = shopping_cart.take_removed()
 
     # Caso não encontre erros
     if update_cart == True:
-        return jsonify({'sucess': 'O produto {0} foi atualizado com sucesso para {1} unidades !!!'.format(item.name, item.quantity)}), 200
+        return jsonify(removed_items({'sucess': 'O produto {0} foi atualizado com sucesso para {1} unidades !!!'.format(item.name, item.quantity)}, removed)), 200
 
     # Pegando as mensagens de erro a serem exibidas
     errors = funcs.return_error_messages(update_cart, item)
 
-    return jsonify(errors), 400
+    return jsonify(removed_items(errors, removed)), 400
 
 
 @app.route('/api/remove_shopping_cart', methods=['DELETE'])
@@ -137,28 +433,29 @@ def remove_from_shopping_cart():
     Returns:
         [json]: Retorna se um produto foi removido ou os erros que foram encontrados
     """
-    global shopping_cart_1
-
     id = request.json.get('id')
-    products = funcs.read_products_list()
-    match = funcs.find_product_by_id(id, products)
+    catalog = funcs.read_catalog()
+    match = funcs.find_product_by_id(id, catalog)
 
     # Caso não seja passado um id ou não encontre o produto
     if id is None or not match:
         # Caso o parâmetro name não tenha sido passado corretamente
         return jsonify({'error': 'O parâmetro id não foi informado ou não foi encontrado !!!'}), 400 
 
-    item = cls.Item(match['id'], match['name'], match['price'], match['minimun'], match['amount-per-package'], match['max-availability'], 0)
-    remove_cart = shopping_cart_1.remove_from_shopping_cart(item)
+    item = cls.Item.from_product(catalog, match, 0)
+
+    with customer_shopping_cart() as shopping_cart:
+        remove_cart = shopping_cart.remove_from_shopping_cart(item)
+        removed = shopping_cart.take_removed()
 
     # Caso não encontre erros
     if remove_cart == True:
-        return jsonify({'sucess': 'O produto {0} foi removido do carrinho com sucesso !!!'.format(item.name)}), 200
+        return jsonify(removed_items({'sucess': 'O produto {0} foi removido do carrinho com sucesso !!!'.format(item.name)}, removed)), 200
 
     # Pegando as mensagens de erro a serem exibidas
     errors = funcs.return_error_messages(remove_cart, item)
 
-    return jsonify(errors), 400
+    return jsonify(removed_items(errors, removed)), 400
 
 
 @app.route('/api/checkout', methods=['GET'])
@@ -168,21 +465,106 @@ def checkout():
     Returns:
         [json]: Retorna se um produto foi removido ou os erros que foram encontrados
     """
-    global shopping_cart_1
+    with customer_shopping_cart() as shopping_cart:
+        # A compra é finalizada com os preços da versão atual do catálogo
+        shopping_cart.reprice(funcs.read_catalog())
 
-    data = funcs.get_shopping_cart(shopping_cart_1)
+        data = funcs.get_shopping_cart(shopping_cart)
+        removed = shopping_cart.take_removed()
 
-    # Caso não tenha nenhum produto no carrinho
-    if data == {'total-price': 0, 'items': []}:
-        return jsonify({'error': 'Não existe nenhum produto no carrinho !!!'}), 400 
-    
-    # Gerando o id de pedido
-    data['id'] = uuid.uuid4()
+        # Caso não tenha nenhum produto no carrinho, informando os que deixaram de existir no catálogo
+        if data == {'total-price': 0, 'items': []}:
+            return jsonify(removed_items({'error': 'Não existe nenhum produto no carrinho !!!'}, removed)), 400 
+
+        # Gerando o id de pedido
+        data['id'] = uuid.uuid4()
+        removed_items(data, removed)
+
+        # Zerando o carrinho de compras
+        shopping_cart.clear()
 
-    # Zerando o carrinho de compras
-    shopping_cart_1 = cls.Shopping_Cart()
     return jsonify(data), 200
 
 
+def is_admin():
+    """ Função que verifica se a requisição possui o token administrativo configurado
+
+    Returns:
+        [bool]: Retorna verdadeiro caso o token do cabeçalho X-Admin-Token seja o configurado
+    """
+    token = app.config.get('ADMIN_TOKEN')
+    received = request.headers.get('X-Admin-Token', '')
+    return bool(token) and hmac.compare_digest(received.encode(), token.encode())
+
+
+@app.route('/api/admin/reload_catalog', methods=['POST'])
+def reload_catalog():
+    """ Rota administrativa que recarrega o catálogo de produtos e publica a nova versão
+
+    Returns:
+        [json]: Retorna a versão publicada, ou erro caso o catálogo não seja válido e a versão atual seja mantida
+    """
+    if not is_admin():
+        return jsonify({'error': 'Acesso não autorizado !!!'}), 403
+
+    try:
+        catalog = funcs.catalog_cache.reload()
+    except cat.CatalogError as error:
+        return jsonify({'error': str(error)}), 400
+
+    return jsonify({'version': catalog.version, 'products': len(catalog)}), 200
+
+
+@app.route('/api/admin/search_cache', methods=['GET'])
+def search_cache_stats():
+    """ Rota administrativa que exibe os contadores do cache da busca por nome
+
+    Returns:
+        [json]: Retorna a versão do catálogo em cache, a quantidade de respostas guardadas e os acertos e falhas
+    """
+    if not is_admin():
+        return jsonify({'error': 'Acesso não autorizado !!!'}), 403
+
+    return jsonify(funcs.search_cache.stats()), 200
+
+
+@app.route('/api/admin/catalog_delta', methods=['POST'])
+def apply_catalog_delta():
+    """ Rota administrativa que aplica inclusões, alterações e remoções de produtos sem recarregar o catálogo inteiro
+
+    O corpo pode ser um JSON com a lista de operações em "operations", ou um arquivo JSONL com uma operação por linha.
+
+    Returns:
+        [json]: Retorna a versão publicada, ou erro caso alguma operação não seja válida e a versão atual seja mantida
+    """
+    if not is_admin():
+        return jsonify({'error': 'Acesso não autorizado !!!'}), 403
+
+    try:
+        if request.is_json:
+            operations = request.json.get('operations') if type(request.json) == dict else None
+        else:
+            operations = cat.parse_delta(request.get_data(as_text=True))
+
+        if type(operations) != list:
+            return jsonify({'error': 'O parâmetro operations não foi informado !!!'}), 400
+
+        catalog = funcs.catalog_cache.apply_delta(operations)
+    except cat.CatalogError as error:
+        return jsonify({'error': str(error)}), 400
+
+    return jsonify({'version': catalog.version, 'products': len(catalog), 'operations': len(operations)}), 200
+
+
+@app.cli.command('compile-catalog')
+@click.argument('source', default='./docs/data.json')
+@click.argument('target', default='./docs/data.catalog')
+def compile_catalog(source, target):
+    """ Comando que compila o arquivo JSON de produtos em um snapshot binário, carregado via mmap pelo servidor
+    """
+    catalog = cat.compile_catalog(source, target)
+    click.echo('Catálogo com {0} produtos compilado em {1}'.format(len(catalog), target))
+
+
 if __name__ == '__main__':
     app.run(host="0.0.0.0", port=5000)
\ No newline at end of file
@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import contextlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from libs import classes as cls
+
+# Quantidade de bytes aleatórios de cada token de carrinho
+CART_TOKEN_BYTES = 24
+
+
+class Cart_Session:
+    """ Classe que representa o carrinho de um cliente no repositório de carrinhos
+    """
+    __slots__ = ('cart', 'lock', 'last_access')
+
+    def __init__(self, last_access:float, cart:cls.Shopping_Cart=None):
+        """ Função que cria a sessão com o carrinho informado, ou com um carrinho vazio
+
+        Args:
+            last_access (float): Momento do último acesso, no relógio monotônico
+            cart (cls.Shopping_Cart): Carrinho de compras, ou None para um carrinho vazio
+        """
+        self.cart = cls.Shopping_Cart() if cart is None else cart
+        self.lock = threading.Lock()
+        self.last_access = last_access
+
+
+class Cart_Store:
+    """ Classe responsável pelos carrinhos de compras de cada cliente, identificados por tokens emitidos pela API
+
+    Os carrinhos são mantidos em ordem de acesso, e os menos usados recentemente são descartados quando o limite de
+    carrinhos é atingido ou quando ficam sem acesso pelo tempo máximo configurado.
+    """
+    def __init__(self, max_carts:int, idle_seconds:float, clock=time.monotonic):
+        """ Função que cria o repositório vazio
+
+        Args:
+            max_carts (int): Quantidade máxima de carrinhos mantidos em memória
+            idle_seconds (float): Tempo máximo, em segundos, que um carrinho é mantido sem acesso
+            clock (function): Relógio usado nos tempos de acesso
+        """
+        self.__max_carts = max_carts
+        self.__idle_seconds = idle_seconds
+        self.__clock = clock
+        self.__sessions = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @property
+    def max_carts(self):
+        return self.__max_carts
+
+    @property
+    def idle_seconds(self):
+        return self.__idle_seconds
+
+    def __len__(self):
+        return len(self.__sessions)
+
+    def __contains__(self, token:str):
+        return token in self.__sessions
+
+    def __evict(self, now:float):
+        """ Função que descarta os carrinhos sem acesso há mais tempo que o permitido, ou além do limite de carrinhos
+
+        Args:
+            now (float): Momento atual, no relógio monotônico
+        """
+        sessions = self.__sessions
+
+        while sessions:
+            token, session = next(iter(sessions.items()))
+
+            if len(sessions) <= self.__max_carts and now - session.last_access <= self.__idle_seconds:
+                break
+
+            del sessions[token]
+
+    def session(self, token:str=None, create:bool=True):
+        """ Função que retorna a sessão do carrinho do token informado, criando um novo carrinho caso ele não exista
+
+        Args:
+            token (str): Token do carrinho informado pelo cliente, ou None
+            create (bool): Caso falso, um carrinho inexistente não é criado
+
+        Returns:
+            [tuple]: Retorna o token, que é um novo token caso o informado não exista, e a sessão do carrinho, ou
+            (None, None) caso o carrinho não exista e não deva ser criado
+        """
+        with self.__lock:
+            now = self.__clock()
+            session = self.__sessions.get(token) if token else None
+
+            # Tokens desconhecidos ou expirados não são reaproveitados, apenas os emitidos pela API são aceitos
+            if session is None or now - session.last_access > self.__idle_seconds:
+                if session is not None:
+                    del self.__sessions[token]
+
+                if create:
+                    token = secrets.token_urlsafe(CART_TOKEN_BYTES)
+                    session = Cart_Session(now)
+                    self.__sessions[token] = session
+                else:
+                    token, session = None, None
+            else:
+                session.last_access = now
+                self.__sessions.move_to_end(token)
+
+            self.__evict(now)
+
+        return token, session
+
+    @contextlib.contextmanager
+    def open(self, token:str=None, create:bool=True):
+        """ Função que disponibiliza o carrinho do token informado, com acesso exclusivo enquanto ele estiver aberto
+
+        Args:
+            token (str): Token do carrinho informado pelo cliente, ou None
+            create (bool): Caso falso, um carrinho inexistente não é criado
+
+        Yields:
+            [tuple]: Retorna o token do carrinho e o carrinho de compras, ou None e um carrinho vazio que não é guardado
+            caso o carrinho não exista e não deva ser criado
+        """
+        token, session = self.session(token, create)
+
+        if session is None:
+            yield None, cls.Shopping_Cart()
+            return
+
+        # As operações de um mesmo carrinho são feitas uma por vez, sem bloquear os carrinhos dos demais clientes
+        with session.lock:
+            yield token, session.cart
+
+    def store(self, cart:cls.Shopping_Cart):
+        """ Função que guarda um carrinho que ainda não está no repositório, como o carrinho vazio de um cliente sem
+        token após a inclusão do primeiro produto
+
+        Args:
+            cart (cls.Shopping_Cart): Carrinho de compras
+
+        Returns:
+            [str]: Retorna o novo token do carrinho
+        """
+        with self.__lock:
+            now = self.__clock()
+            token = secrets.token_urlsafe(CART_TOKEN_BYTES)
+            self.__sessions[token] = Cart_Session(now, cart)
+            self.__evict(now)
+
+        return token
+
+    def discard(self, token:str):
+        """ Função que descarta o carrinho do token informado
+
+        Args:
+            token (str): Token do carrinho
+        """
+        with self.__lock:
+            self.__sessions.pop(token, None)
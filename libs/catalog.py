@@ -0,0 +1,1466 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import bisect
+import codecs
+import hashlib
+import itertools
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from collections.abc import Mapping
+
+# O lock entre processos do arquivo de atualizações existe apenas em sistemas POSIX
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Tamanho dos blocos lidos do arquivo pelo carregador incremental
+CHUNK_SIZE = 1 << 16
+
+# Caracteres considerados espaço em branco pelo JSON
+JSON_WHITESPACE = ' \t\n\r'
+
+# Campos de um produto, na ordem em que são expostos
+PRODUCT_FIELDS = ('id', 'name', 'price', 'minimun', 'amount-per-package', 'max-availability')
+
+# Colunas numéricas do catálogo e o tipo do array que as armazena
+NUMERIC_COLUMNS = (('id', 'q'), ('price', 'd'), ('minimun', 'q'), ('amount-per-package', 'q'), ('max-availability', 'q'))
+
+# Tipos de valores aceitos em cada tipo de array
+COLUMN_TYPES = {'q': (int,), 'd': (int, float)}
+
+# Tipo dos arrays que armazenam linhas do catálogo
+ROW_TYPECODE = 'i'
+
+# Limites dos valores armazenados nas colunas inteiras
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+UINT64_MASK = (1 << 64) - 1
+
+# Constante do hash de Fibonacci (2^64 dividido pela razão áurea)
+FIBONACCI_HASH = 0x9E3779B97F4A7C15
+
+# Quantidade de linhas alteradas a partir da qual uma atualização incremental compacta o catálogo
+DELTA_COMPACT_ROWS = 50000
+DELTA_COMPACT_RATIO = 0.1
+
+# Identificação e cabeçalho do snapshot binário: assinatura, ordem de bytes, quantidade de produtos,
+# tamanho do índice de ids, tamanho da tabela de nomes, tamanho da tabela de chaves de busca e hash do JSON de origem
+SNAPSHOT_MAGIC = b'CTBCAT02'
+SNAPSHOT_HEADER = struct.Struct('=8s?7xqqqq16s')
+
+# Caracteres que podem encerrar um elemento do array
+JSON_DELIMITERS = JSON_WHITESPACE + ',]'
+
+# Quantidade de caracteres do fim do buffer em que um erro de decodificação pode ser causado por um elemento cortado
+# (literais como false, números e escapes \uXXXX incompletos)
+JSON_TRUNCATED_TAIL = 8
+
+
+def fold(text:str):
+    """ Função que normaliza um texto para a busca, ignorando maiúsculas, acentos e espaços repetidos (ex: "Ração" vira "racao")
+
+    Args:
+        text (str): Texto
+
+    Returns:
+        [str]: Retorna o texto em minúsculas (case folding do Unicode), sem os sinais diacríticos e com as palavras separadas por um espaço
+    """
+    # Textos em ASCII não possuem acentos e o case folding equivale ao lower
+    if text.isascii():
+        return ' '.join(text.lower().split())
+
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ' '.join(''.join(char for char in decomposed if not unicodedata.combining(char)).split())
+
+
+def stat_signature(stat:os.stat_result):
+    """ Função que monta a assinatura de um arquivo a partir do seu stat
+
+    Args:
+        stat (os.stat_result): Resultado do os.stat ou os.fstat do arquivo
+
+    Returns:
+        [tuple]: Retorna o dispositivo, inode, tamanho e data de modificação do arquivo
+    """
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class CatalogError(Exception):
+    """ Exceção lançada quando o catálogo de produtos não pode ser carregado
+    """
+
+
+def iter_json_array(json_file, digest=None, chunk_size:int=CHUNK_SIZE):
+    """ Função que percorre, elemento a elemento, o array JSON de nível superior de um arquivo, sem carregá-lo inteiro
+
+    Args:
+        json_file (file): Arquivo aberto em modo binário
+        digest (hashlib._Hash): Hash atualizado com os bytes lidos, caso informado
+        chunk_size (int): Tamanho dos blocos lidos do arquivo
+
+    Raises:
+        CatalogError: Caso o arquivo não contenha um array JSON válido
+
+    Yields:
+        [object]: Retorna cada elemento do array já decodificado
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def read_more():
+        """ Lê o próximo bloco do arquivo, descartando do buffer o que já foi consumido
+        """
+        nonlocal buffer, pos, eof
+        chunk = json_file.read(chunk_size)
+
+        if digest is not None:
+            digest.update(chunk)
+
+        eof = not chunk
+        buffer = buffer[pos:] + text_decoder.decode(chunk, final=eof)
+        pos = 0
+
+    def next_char():
+        """ Pula os espaços em branco e retorna o próximo caractere, ou vazio no fim do arquivo
+        """
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in JSON_WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return buffer[pos:pos + 1]
+            read_more()
+
+    if next_char() != '[':
+        raise CatalogError('O catálogo de produtos deve ser um array JSON !!!')
+    pos += 1
+
+    if next_char() == ']':
+        pos += 1
+    else:
+        while True:
+            next_char()
+
+            # Decodifica o próximo elemento, lendo mais blocos caso ele esteja incompleto no buffer
+            while True:
+                try:
+                    element, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError as error:
+                    # Apenas erros no fim do buffer podem ser de um elemento incompleto, os demais são JSON inválido
+                    truncated = error.pos >= len(buffer) - JSON_TRUNCATED_TAIL or error.msg.startswith('Unterminated string')
+                    if eof or not truncated:
+                        raise CatalogError('O catálogo de produtos não é um JSON válido: {0} !!!'.format(error))
+                    read_more()
+                    continue
+
+                # Números podem estar cortados no fim do buffer, então o elemento só é aceito seguido de um delimitador
+                if not eof and (end == len(buffer) or buffer[end] not in JSON_DELIMITERS):
+                    read_more()
+                    continue
+                break
+
+            pos = end
+            yield element
+
+            separator = next_char()
+            pos += 1
+
+            if separator == ']':
+                break
+            if separator != ',':
+                raise CatalogError('O catálogo de produtos não é um JSON válido !!!')
+
+    if next_char() != '':
+        raise CatalogError('O catálogo de produtos possui conteúdo após o fim do array !!!')
+
+
+class Product(Mapping):
+    """ Classe que representa a visão de um produto (linha) do catálogo, com acesso aos campos como em um dicionário
+    """
+    __slots__ = ('__catalog', '__row')
+
+    def __init__(self, catalog, row:int):
+        """ Função que cria a visão do produto na linha informada do catálogo
+
+        Args:
+            catalog (Catalog): Catálogo de produtos
+            row (int): Posição do produto nas colunas do catálogo
+        """
+        self.__catalog = catalog
+        self.__row = row
+
+    @property
+    def row(self):
+        return self.__row
+
+    def __getitem__(self, field:str):
+        # A chave de busca é uma coluna interna do catálogo e não faz parte do produto
+        if field not in PRODUCT_FIELDS:
+            raise KeyError(field)
+        return self.__catalog.value(self.__row, field)
+
+    def __iter__(self):
+        return iter(PRODUCT_FIELDS)
+
+    def __len__(self):
+        return len(PRODUCT_FIELDS)
+
+    def __repr__(self):
+        return 'Product({0!r})'.format(dict(self))
+
+
+class Id_Index:
+    """ Classe que representa o índice hash (endereçamento aberto) de ids para linhas, armazenado em arrays tipados
+    """
+    def __init__(self, keys:array, rows:array):
+        """ Função que cria o índice a partir das suas tabelas já montadas
+
+        Args:
+            keys (array): Tabela de ids, com tamanho potência de 2
+            rows (array): Tabela de linhas, com -1 nas posições vazias
+        """
+        self.__keys = keys
+        self.__rows = rows
+        self.__mask = len(rows) - 1
+        self.__shift = 64 - self.__mask.bit_length()
+
+    @property
+    def keys(self):
+        return self.__keys
+
+    @property
+    def rows(self):
+        return self.__rows
+
+    @classmethod
+    def build(cls, ids:array):
+        """ Função que cria o índice para a coluna de ids informada
+
+        Args:
+            ids (array): Coluna de ids
+
+        Raises:
+            CatalogError: Caso algum id esteja repetido no catálogo
+
+        Returns:
+            [Id_Index]: Retorna o índice de ids
+        """
+        # Mantém a ocupação da tabela abaixo de 75% para que as sondagens sejam curtas
+        size = 2
+        while size * 3 < len(ids) * 4:
+            size *= 2
+
+        index = cls(array('q', bytes(8 * size)), array(ROW_TYPECODE, [-1]) * size)
+
+        for row, id in enumerate(ids):
+            if not index.insert(id, row):
+                raise CatalogError('O id {0} está duplicado no catálogo de produtos !!!'.format(id))
+
+        return index
+
+    def copy(self):
+        """ Função que copia o índice para que novos ids possam ser inseridos sem alterar o original
+
+        Returns:
+            [Id_Index]: Retorna a cópia do índice
+        """
+        return Id_Index(copy_column(self.__keys), copy_column(self.__rows))
+
+    def has_room(self, count:int):
+        """ Função que verifica se o índice comporta a quantidade de ids informada sem ultrapassar 75% de ocupação
+
+        Args:
+            count (int): Quantidade total de ids
+
+        Returns:
+            [bool]: Retorna verdadeiro caso o índice comporte os ids
+        """
+        return count * 4 <= len(self.__rows) * 3
+
+    def slot(self, id:int):
+        """ Função que retorna a posição da tabela onde o id está ou deveria estar
+
+        Args:
+            id (int): Id do produto
+
+        Returns:
+            [int]: Retorna a posição na tabela
+        """
+        # Hash de Fibonacci, que espalha bem ids sequenciais ou múltiplos de potências de 2
+        pos = ((id * FIBONACCI_HASH) & UINT64_MASK) >> self.__shift
+        keys = self.__keys
+        rows = self.__rows
+
+        while rows[pos] != -1 and keys[pos] != id:
+            pos = (pos + 1) & self.__mask
+
+        return pos
+
+    def insert(self, id:int, row:int):
+        """ Função que insere um id no índice
+
+        Args:
+            id (int): Id do produto
+            row (int): Linha do produto
+
+        Returns:
+            [bool]: Retorna falso caso o id já exista no índice
+        """
+        pos = self.slot(id)
+
+        if self.__rows[pos] != -1:
+            return False
+
+        self.__keys[pos] = id
+        self.__rows[pos] = row
+        return True
+
+    def get(self, id:int):
+        """ Função que retorna a linha de um id
+
+        Args:
+            id (int): Id do produto
+
+        Returns:
+            [int]: Retorna a linha do produto, ou None caso o id não exista
+        """
+        row = self.__rows[self.slot(id)]
+        return None if row == -1 else row
+
+
+def validate_product(product:dict, partial:bool=False):
+    """ Função que valida os campos de um produto antes de armazená-lo nas colunas do catálogo
+
+    Args:
+        product (dict): Produto
+        partial (bool): Aceita produtos apenas com parte dos campos, como nas atualizações
+
+    Raises:
+        CatalogError: Caso o produto não seja válido
+    """
+    if type(product) != dict or 'id' not in product:
+        raise CatalogError('O catálogo de produtos possui um produto sem id !!!')
+
+    id = product['id']
+
+    for field, typecode in NUMERIC_COLUMNS:
+        if partial and field not in product:
+            continue
+
+        value = product.get(field)
+        if type(value) not in COLUMN_TYPES[typecode] or (typecode == 'q' and not INT64_MIN <= value <= INT64_MAX):
+            raise CatalogError('O campo {0} do produto {1} não é válido !!!'.format(field, id))
+
+    if (not partial or 'name' in product) and type(product.get('name')) != str:
+        raise CatalogError('O campo name do produto {0} não é válido !!!'.format(id))
+
+
+def copy_column(column):
+    """ Função que copia uma coluna (array ou memoryview) para um novo array tipado, que pode ser alterado
+
+    Args:
+        column (array): Coluna a ser copiada
+
+    Returns:
+        [array]: Retorna a cópia da coluna
+    """
+    if isinstance(column, array):
+        return column[:]
+
+    view = memoryview(column)
+    copy = array(view.format)
+    copy.frombytes(view.cast('B'))
+    return copy
+
+
+class Catalog_Builder:
+    """ Classe responsável por montar o catálogo incrementalmente, produto a produto, direto nas colunas
+    """
+    def __init__(self):
+        self.__columns = {field: array(typecode) for field, typecode in NUMERIC_COLUMNS}
+        self.__name_offsets = array('q', [0])
+        self.__name_heap = bytearray()
+        self.__key_offsets = array('q', [0])
+        self.__key_heap = bytearray()
+
+    def add(self, product:dict):
+        """ Função que adiciona um produto às colunas do catálogo em construção
+
+        Args:
+            product (dict): Produto
+
+        Raises:
+            CatalogError: Caso o produto não seja válido
+        """
+        validate_product(product)
+
+        for field, typecode in NUMERIC_COLUMNS:
+            self.__columns[field].append(product[field])
+
+        self.__name_heap += product['name'].encode('utf-8')
+        self.__name_offsets.append(len(self.__name_heap))
+
+        # A chave de busca é calculada uma única vez, na carga, e não a cada busca
+        self.__key_heap += fold(product['name']).encode('utf-8')
+        self.__key_offsets.append(len(self.__key_heap))
+
+    def build(self, version:int, signature:tuple=None, fingerprint:str=''):
+        """ Função que finaliza a construção, montando o índice de ids, e retorna o snapshot do catálogo
+
+        Args:
+            version (int): Número da versão do catálogo
+            signature (tuple): Assinatura do arquivo de origem
+            fingerprint (str): Hash do conteúdo do arquivo de origem
+
+        Raises:
+            CatalogError: Caso algum id esteja repetido no catálogo
+
+        Returns:
+            [Catalog]: Retorna o snapshot do catálogo
+        """
+        index = Id_Index.build(self.__columns['id'])
+        names = String_Heap(self.__name_offsets, bytes(self.__name_heap))
+        keys = String_Heap(self.__key_offsets, bytes(self.__key_heap))
+        return Catalog(self.__columns, names, keys, version, signature, fingerprint, index)
+
+
+class String_Heap:
+    """ Classe que representa uma tabela de strings armazenadas em UTF-8 em um único bloco de bytes
+    """
+    def __init__(self, offsets:array, heap:bytes):
+        """ Função que cria a tabela de strings
+
+        Args:
+            offsets (array): Posição inicial de cada string no bloco, seguida da posição final da última
+            heap (bytes): Bloco com as strings em UTF-8
+        """
+        self.__offsets = offsets
+        self.__heap = heap
+
+    @property
+    def offsets(self):
+        return self.__offsets
+
+    @property
+    def heap(self):
+        return self.__heap
+
+    def __getitem__(self, row:int):
+        return str(self.__heap[self.__offsets[row]:self.__offsets[row + 1]], 'utf-8')
+
+    def __len__(self):
+        return len(self.__offsets) - 1
+
+
+class Patched_Strings:
+    """ Classe que representa uma tabela de strings com alterações aplicadas por cima, sem copiar a tabela original
+    """
+    def __init__(self, base:String_Heap, patches:dict, length:int):
+        """ Função que cria a tabela com as alterações
+
+        Args:
+            base (String_Heap): Tabela original
+            patches (dict): Strings alteradas ou adicionadas, indexadas pela linha
+            length (int): Quantidade total de linhas
+        """
+        self.__base = base
+        self.__patches = patches
+        self.__length = length
+
+    @property
+    def base(self):
+        return self.__base
+
+    @property
+    def patches(self):
+        return self.__patches
+
+    def __getitem__(self, row:int):
+        name = self.__patches.get(row)
+        return self.__base[row] if name is None else name
+
+    def __len__(self):
+        return self.__length
+
+
+def load_catalog(path:str, version:int):
+    """ Função que carrega o catálogo de um snapshot binário compilado, ou de um arquivo JSON de forma incremental
+
+    Args:
+        path (str): Caminho do snapshot ou do arquivo JSON de produtos
+        version (int): Número da versão do catálogo
+
+    Raises:
+        CatalogError: Caso o arquivo não seja um catálogo válido
+
+    Returns:
+        [Catalog]: Retorna o snapshot do catálogo
+    """
+    builder = Catalog_Builder()
+    digest = hashlib.blake2b(digest_size=8)
+
+    with open(path, 'rb') as json_file:
+        # A assinatura é obtida do arquivo aberto, garantindo que corresponde ao conteúdo lido
+        signature = stat_signature(os.fstat(json_file.fileno()))
+
+        # Snapshots compilados são mapeados em memória ao invés de decodificados
+        if json_file.read(len(SNAPSHOT_MAGIC))[:6] == SNAPSHOT_MAGIC[:6]:
+            return read_snapshot(json_file, signature, version)
+        json_file.seek(0)
+
+        for product in iter_json_array(json_file, digest):
+            builder.add(product)
+
+        # Caso o arquivo tenha sido alterado durante a leitura o conteúdo lido pode estar misturado
+        if stat_signature(os.fstat(json_file.fileno())) != signature:
+            raise CatalogError('O catálogo de produtos foi alterado durante a leitura !!!')
+
+    return builder.build(version, signature, digest.hexdigest())
+
+
+def validate_operation(operation:dict):
+    """ Função que valida uma operação de atualização incremental do catálogo
+
+    Args:
+        operation (dict): Operação {"op": "upsert", "product": {...}} ou {"op": "delete", "id": ...}
+
+    Raises:
+        CatalogError: Caso a operação não seja válida
+
+    Returns:
+        [dict]: Retorna a operação normalizada, contendo o id do produto
+    """
+    if type(operation) != dict or operation.get('op') not in ('upsert', 'delete'):
+        raise CatalogError('As operações do catálogo devem ser upsert ou delete !!!')
+
+    if operation['op'] == 'delete':
+        id = operation.get('id')
+        if type(id) != int:
+            raise CatalogError('O id da operação delete não é válido !!!')
+        return {'op': 'delete', 'id': id}
+
+    product = operation.get('product')
+    validate_product(product, partial=True)
+
+    if type(product['id']) != int:
+        raise CatalogError('O id da operação upsert não é válido !!!')
+
+    return {'op': 'upsert', 'id': product['id'], 'product': product}
+
+
+def parse_delta(text:str):
+    """ Função que lê as operações de atualização do catálogo de um texto JSONL (uma operação por linha)
+
+    Args:
+        text (str): Conteúdo JSONL
+
+    Raises:
+        CatalogError: Caso alguma linha não seja um JSON válido
+
+    Returns:
+        [list]: Retorna a lista de operações
+    """
+    operations = []
+
+    for number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+
+        try:
+            operations.append(json.loads(line))
+        except ValueError:
+            raise CatalogError('A linha {0} das operações não é um JSON válido !!!'.format(number))
+
+    return operations
+
+
+class Catalog:
+    """ Classe que representa uma versão imutável (snapshot) do catálogo de produtos, armazenado em colunas
+    """
+    def __init__(self, columns:dict, names:String_Heap, keys:String_Heap, version:int, signature:tuple=None, fingerprint:str='', index:Id_Index=None, derived:dict=None,
+                 alive:bytearray=None, base=None, dirty_rows:frozenset=frozenset(), dirty_names:frozenset=frozenset()):
+        """ Função que cria o snapshot do catálogo com as colunas carregadas
+
+        Args:
+            columns (dict): Colunas numéricas (arrays tipados) indexadas pelo nome do campo
+            names (String_Heap): Nomes dos produtos, na mesma ordem das colunas
+            keys (String_Heap): Chaves de busca (nomes normalizados pela função fold), na mesma ordem das colunas
+            version (int): Número da versão do catálogo
+            signature (tuple): Assinatura (dispositivo, inode, tamanho, mtime) do arquivo de origem
+            fingerprint (str): Hash do conteúdo do arquivo de origem
+            index (Id_Index): Índice de ids para linhas, ou None para montá-lo a partir da coluna de ids
+            derived (dict): Valores derivados já calculados (ex: lidos de um snapshot compilado)
+            alive (bytearray): Marcação das linhas ativas (1) e removidas (0), ou None caso nenhuma tenha sido removida
+            base (Catalog): Versão completa cujos índices de busca são reaproveitados, ou None caso seja esta
+            dirty_rows (frozenset): Linhas alteradas, adicionadas ou removidas desde a versão base
+            dirty_names (frozenset): Linhas cujo nome foi alterado, adicionadas ou removidas desde a versão base
+        """
+        self.__columns = dict(columns)
+        self.__columns['name'] = names
+        self.__columns['search_key'] = keys
+        self.__version = version
+        self.__signature = signature
+        self.__fingerprint = fingerprint
+        self.__index = Id_Index.build(columns['id']) if index is None else index
+        self.__derived = {} if derived is None else dict(derived)
+        # O bloqueio é reentrante, pois um valor derivado pode depender de outro (ex: índices de busca)
+        self.__derived_lock = threading.RLock()
+        self.__alive = alive
+        self.__base = self if base is None else base
+        self.__dirty_rows = dirty_rows
+        self.__dirty_names = dirty_names
+        self.__row_count = len(columns['id'])
+        self.__count = self.__row_count if alive is None else self.__row_count - alive.count(0)
+
+    @property
+    def version(self):
+        return self.__version
+
+    @property
+    def signature(self):
+        return self.__signature
+
+    @property
+    def fingerprint(self):
+        return self.__fingerprint
+
+    @property
+    def etag(self):
+        return '{0}-{1}'.format(self.__version, self.__fingerprint)
+
+    @property
+    def index(self):
+        return self.__index
+
+    @property
+    def base(self):
+        return self.__base
+
+    @property
+    def dirty_rows(self):
+        return self.__dirty_rows
+
+    @property
+    def dirty_names(self):
+        return self.__dirty_names
+
+    @property
+    def row_count(self):
+        return self.__row_count
+
+    def is_alive(self, row:int):
+        """ Função que verifica se uma linha do catálogo não foi removida
+
+        Args:
+            row (int): Linha do produto
+
+        Returns:
+            [bool]: Retorna verdadeiro caso o produto da linha exista nesta versão
+        """
+        return self.__alive is None or self.__alive[row] == 1
+
+    def rows(self):
+        """ Função que percorre as linhas ativas do catálogo, na ordem do arquivo
+
+        Returns:
+            [iterator]: Retorna as linhas que não foram removidas
+        """
+        if self.__alive is None:
+            return iter(range(self.__row_count))
+        return itertools.compress(range(self.__row_count), self.__alive)
+
+    def column(self, field:str):
+        """ Função que retorna uma coluna do catálogo, permitindo varreduras vetorizadas sobre os campos numéricos
+
+        Args:
+            field (str): Nome do campo
+
+        Returns:
+            [array]: Retorna o array tipado (ou memoryview, em snapshots mapeados) do campo, ou a tabela de strings para os campos name e search_key
+        """
+        return self.__columns[field]
+
+    def value(self, row:int, field:str):
+        """ Função que retorna o valor de um campo em uma linha do catálogo
+
+        Args:
+            row (int): Linha do produto
+            field (str): Nome do campo
+
+        Returns:
+            [object]: Retorna o valor do campo
+        """
+        return self.__columns[field][row]
+
+    def get(self, id:int):
+        """ Função que retorna um produto através do seu id
+
+        Args:
+            id (int): Id do produto
+
+        Returns:
+            [Product]: Retorna a visão do produto, ou None caso ele não exista no catálogo
+        """
+        # Ids decimais inteiros (ex: 3.0) correspondem ao id inteiro, como na comparação com ==
+        if type(id) == float and id.is_integer():
+            id = int(id)
+
+        # Ids que não são inteiros, ou fora do limite das colunas, nunca existem no catálogo
+        if not isinstance(id, int) or not INT64_MIN <= id <= INT64_MAX:
+            return None
+
+        row = self.__index.get(id)
+
+        if row is None or not self.is_alive(row):
+            return None
+
+        return Product(self, row)
+
+    def products_after(self, after:int, limit:int):
+        """ Função que retorna os produtos ordenados por id a partir de um id informado (paginação por cursor)
+
+        Args:
+            after (int): Último id já retornado, ou None para começar do início
+            limit (int): Quantidade máxima de produtos
+
+        Returns:
+            [list]: Retorna os produtos com id maior que o informado, ordenados por id
+        """
+        ids, rows = self.id_order()
+        start = 0 if after is None else bisect.bisect_right(ids, after)
+
+        if self.__alive is None:
+            return [Product(self, row) for row in rows[start:start + limit]]
+
+        # Pula as linhas removidas, que continuam na ordenação até a próxima compactação
+        alive_rows = (row for row in itertools.islice(rows, start, None) if self.__alive[row])
+        return [Product(self, row) for row in itertools.islice(alive_rows, limit)]
+
+    def id_order(self):
+        """ Função que retorna a ordem das linhas do catálogo por id, calculada uma vez por versão
+
+        Returns:
+            [tuple]: Retorna a coluna de ids ordenada e as linhas correspondentes
+        """
+        return self.derived('id_order', self.__build_id_order)
+
+    def __build_id_order(self):
+        """ Função que ordena as linhas do catálogo por id para a paginação
+
+        Returns:
+            [tuple]: Retorna a coluna de ids ordenada e as linhas correspondentes
+        """
+        ids = self.__columns['id']
+        rows = array(ROW_TYPECODE, sorted(range(len(ids)), key=ids.__getitem__))
+        return array('q', (ids[row] for row in rows)), rows
+
+    def derived(self, key:str, factory):
+        """ Função que retorna um valor derivado do catálogo, calculado apenas uma vez por versão
+
+        Args:
+            key (str): Nome do valor derivado
+            factory (callable): Função sem parâmetros que calcula o valor
+
+        Returns:
+            [object]: Retorna o valor derivado desta versão do catálogo
+        """
+        try:
+            return self.__derived[key]
+        except KeyError:
+            pass
+
+        with self.__derived_lock:
+            if key not in self.__derived:
+                self.__derived[key] = factory()
+            return self.__derived[key]
+
+    def apply_delta(self, operations:list, version:int):
+        """ Função que aplica inclusões, alterações e remoções de produtos, gerando uma nova versão sem alterar esta
+
+        As colunas numéricas são copiadas (cópia de memória contígua), os nomes alterados ficam em uma camada por cima
+        da tabela original, e os índices de busca da versão base continuam valendo, corrigidos pelas linhas alteradas.
+
+        Args:
+            operations (list): Operações {"op": "upsert", "product": {...}} ou {"op": "delete", "id": ...}
+            version (int): Número da nova versão do catálogo
+
+        Raises:
+            CatalogError: Caso alguma operação não seja válida, sem aplicar nenhuma delas
+
+        Returns:
+            [Catalog]: Retorna a nova versão do catálogo
+        """
+        operations = [validate_operation(operation) for operation in operations]
+
+        # As colunas são copiadas apenas quando alguma operação altera o campo
+        columns = {field: self.__columns[field] for field, typecode in NUMERIC_COLUMNS}
+        copied = set()
+
+        def writable(field):
+            if field not in copied:
+                columns[field] = copy_column(columns[field])
+                copied.add(field)
+            return columns[field]
+
+        names = self.__columns['name']
+        name_base = names.base if isinstance(names, Patched_Strings) else names
+        name_patches = dict(names.patches) if isinstance(names, Patched_Strings) else {}
+        keys = self.__columns['search_key']
+        key_base = keys.base if isinstance(keys, Patched_Strings) else keys
+        key_patches = dict(keys.patches) if isinstance(keys, Patched_Strings) else {}
+        alive = None if self.__alive is None else bytearray(self.__alive)
+        dirty_rows = set(self.__dirty_rows)
+        dirty_names = set(self.__dirty_names)
+        added = {}
+
+        for operation in operations:
+            id = operation['id']
+            row = added.get(id, self.__index.get(id))
+            exists = row is not None and (alive is None or alive[row] == 1)
+
+            if operation['op'] == 'delete':
+                # Remover um produto que não existe não altera o catálogo
+                if not exists:
+                    continue
+
+                if alive is None:
+                    alive = bytearray(b'\x01') * len(columns['id'])
+
+                alive[row] = 0
+                dirty_rows.add(row)
+                dirty_names.add(row)
+                continue
+
+            product = operation['product']
+
+            # Produtos novos (ou removidos anteriormente) precisam de todos os campos
+            if not exists and any(field not in product for field in PRODUCT_FIELDS):
+                raise CatalogError('O produto {0} não existe no catálogo e deve possuir todos os campos !!!'.format(id))
+
+            if row is None:
+                row = len(columns['id'])
+                added[id] = row
+
+                for field, typecode in NUMERIC_COLUMNS:
+                    writable(field).append(product[field])
+
+                if alive is not None:
+                    alive.append(1)
+            else:
+                for field, typecode in NUMERIC_COLUMNS:
+                    if field in product and columns[field][row] != product[field]:
+                        writable(field)[row] = product[field]
+
+                if alive is not None:
+                    alive[row] = 1
+
+            if 'name' in product:
+                name_patches[row] = product['name']
+                key_patches[row] = fold(product['name'])
+                dirty_names.add(row)
+
+            dirty_rows.add(row)
+
+        index = self.__index
+        derived = {}
+
+        if added:
+            # Ids novos são inseridos em uma cópia do índice, ou em um índice maior caso ele esteja cheio
+            if index.has_room(len(columns['id'])):
+                index = index.copy()
+                for id, row in added.items():
+                    index.insert(id, row)
+            else:
+                index = Id_Index.build(columns['id'])
+
+        # A ordenação por id é atualizada inserindo apenas os ids novos
+        if 'id_order' in self.__derived:
+            sorted_ids, id_order = self.__derived['id_order']
+
+            if added:
+                sorted_ids, id_order = copy_column(sorted_ids), copy_column(id_order)
+                for id, row in sorted(added.items()):
+                    position = bisect.bisect_right(sorted_ids, id)
+                    sorted_ids.insert(position, id)
+                    id_order.insert(position, row)
+
+            derived['id_order'] = (sorted_ids, id_order)
+
+        if name_patches:
+            names = Patched_Strings(name_base, name_patches, len(columns['id']))
+            keys = Patched_Strings(key_base, key_patches, len(columns['id']))
+
+        # O hash da nova versão combina o hash anterior com as operações aplicadas
+        digest = hashlib.blake2b(self.__fingerprint.encode(), digest_size=8)
+        digest.update(json.dumps(operations, sort_keys=True).encode())
+
+        catalog = Catalog(columns, names, keys, version, self.__signature, digest.hexdigest(), index, derived,
+                          alive, self.__base, frozenset(dirty_rows), frozenset(dirty_names))
+
+        # Com muitas alterações acumuladas, corrigir os índices da base fica caro e o catálogo é compactado
+        if len(dirty_rows) > max(DELTA_COMPACT_ROWS, self.__row_count * DELTA_COMPACT_RATIO):
+            catalog = catalog.compact()
+
+        return catalog
+
+    def compact(self):
+        """ Função que remonta o catálogo apenas com as linhas ativas, descartando as alterações acumuladas
+
+        Returns:
+            [Catalog]: Retorna a versão compactada, com a mesma versão e hash, que passa a ser a sua própria base
+        """
+        builder = Catalog_Builder()
+
+        for product in self:
+            builder.add(dict(product))
+
+        return builder.build(self.__version, self.__signature, self.__fingerprint)
+
+    def __getitem__(self, row:int):
+        if not 0 <= row < self.__row_count:
+            raise IndexError(row)
+        return Product(self, row)
+
+    def __len__(self):
+        return self.__count
+
+    def __iter__(self):
+        return (Product(self, row) for row in self.rows())
+
+
+def section_size(typecode:str, count:int):
+    """ Função que retorna o tamanho em bytes de uma seção do snapshot, alinhado em 8 bytes
+
+    Args:
+        typecode (str): Tipo dos valores da seção
+        count (int): Quantidade de valores
+
+    Returns:
+        [int]: Retorna o tamanho da seção com o alinhamento
+    """
+    size = array(typecode).itemsize * count
+    return size + (-size % 8)
+
+
+def write_snapshot(catalog:Catalog, path:str):
+    """ Função que grava o catálogo em um snapshot binário, com as colunas em largura fixa, a tabela de nomes e o índice de ids
+
+    Args:
+        catalog (Catalog): Catálogo de produtos
+        path (str): Caminho do arquivo do snapshot
+    """
+    # Versões com atualizações incrementais são compactadas, pois o snapshot guarda apenas colunas contíguas
+    if catalog.dirty_rows:
+        catalog = catalog.compact()
+
+    names = catalog.column('name')
+    keys = catalog.column('search_key')
+    index = catalog.index
+    sorted_ids, id_order = catalog.id_order()
+
+    sections = [catalog.column(field) for field, typecode in NUMERIC_COLUMNS]
+    sections += [names.offsets, keys.offsets, index.keys, index.rows, sorted_ids, id_order]
+
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, sys.byteorder == 'little', catalog.row_count, len(index.rows), len(names.heap), len(keys.heap),
+                                  catalog.fingerprint.encode('ascii'))
+
+    # Grava em um arquivo temporário e o substitui de uma vez, para que nenhum processo leia um snapshot pela metade
+    tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+
+    with open(tmp_path, 'wb') as snapshot_file:
+        snapshot_file.write(header)
+
+        for section in sections:
+            data = memoryview(section).cast('B')
+            snapshot_file.write(data)
+            snapshot_file.write(bytes(-len(data) % 8))
+
+        snapshot_file.write(names.heap)
+        snapshot_file.write(keys.heap)
+
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(snapshot_file, signature:tuple, version:int):
+    """ Função que mapeia em memória (mmap) um snapshot binário do catálogo, sem copiar nem decodificar as colunas
+
+    Args:
+        snapshot_file (file): Arquivo do snapshot aberto em modo binário
+        signature (tuple): Assinatura do arquivo
+        version (int): Número da versão do catálogo
+
+    Raises:
+        CatalogError: Caso o arquivo não seja um snapshot válido para esta máquina
+
+    Returns:
+        [Catalog]: Retorna o snapshot do catálogo, cujas colunas apontam para as páginas compartilhadas do arquivo
+    """
+    try:
+        data = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, little_endian, count, index_size, heap_size, key_heap_size, fingerprint = SNAPSHOT_HEADER.unpack_from(data)
+    except (ValueError, struct.error):
+        raise CatalogError('O snapshot do catálogo está incompleto !!!')
+
+    if magic[:6] != SNAPSHOT_MAGIC[:6]:
+        raise CatalogError('O arquivo não é um snapshot do catálogo !!!')
+
+    if magic != SNAPSHOT_MAGIC:
+        raise CatalogError('O snapshot do catálogo foi compilado em outro formato, compile-o novamente !!!')
+
+    if little_endian != (sys.byteorder == 'little'):
+        raise CatalogError('O snapshot do catálogo foi compilado em uma máquina com outra ordem de bytes !!!')
+
+    layout = [typecode for field, typecode in NUMERIC_COLUMNS]
+    layout += ['q', 'q', 'q', ROW_TYPECODE, 'q', ROW_TYPECODE]
+    counts = [count] * len(NUMERIC_COLUMNS) + [count + 1, count + 1, index_size, index_size, count, count]
+
+    expected_size = SNAPSHOT_HEADER.size + sum(section_size(typecode, length) for typecode, length in zip(layout, counts)) + heap_size + key_heap_size
+    if len(data) != expected_size:
+        raise CatalogError('O snapshot do catálogo está incompleto !!!')
+
+    view = memoryview(data)
+    offset = SNAPSHOT_HEADER.size
+    sections = []
+
+    for typecode, length in zip(layout, counts):
+        size = array(typecode).itemsize * length
+        sections.append(view[offset:offset + size].cast(typecode))
+        offset += section_size(typecode, length)
+
+    columns = dict(zip([field for field, typecode in NUMERIC_COLUMNS], sections))
+    name_offsets, key_offsets, index_keys, index_rows, sorted_ids, id_order = sections[len(NUMERIC_COLUMNS):]
+
+    names = String_Heap(name_offsets, view[offset:offset + heap_size])
+    keys = String_Heap(key_offsets, view[offset + heap_size:offset + heap_size + key_heap_size])
+    index = Id_Index(index_keys, index_rows)
+
+    return Catalog(columns, names, keys, version, signature, fingerprint.rstrip(b'\x00').decode('ascii'), index, {'id_order': (sorted_ids, id_order)})
+
+
+def compile_catalog(source:str, target:str):
+    """ Função que compila o arquivo JSON de produtos em um snapshot binário
+
+    Args:
+        source (str): Caminho do arquivo JSON de produtos
+        target (str): Caminho do snapshot a ser gravado
+
+    Returns:
+        [Catalog]: Retorna o catálogo compilado
+    """
+    catalog = load_catalog(source, 0)
+    write_snapshot(catalog, target)
+    return catalog
+
+
+class Catalog_Cache:
+    """ Classe responsável por manter o catálogo em memória, recarregando o arquivo apenas quando ele for alterado
+
+    A nova versão é montada, junto com seus índices, fora da versão atual e publicada com uma única troca de referência,
+    então as requisições em andamento continuam com o snapshot que já obtiveram e nunca aguardam uma recarga.
+
+    As atualizações incrementais podem ser gravadas em um arquivo JSONL de atualizações, aplicado sobre o arquivo de
+    produtos em cada carga e verificado junto com ele, então chegam a todos os processos e sobrevivem às recargas.
+    """
+    def __init__(self, path:str, check_interval:float=0.0, warmers:list=(), delta_path:str=None):
+        """ Função que cria o cache do catálogo para o arquivo informado
+
+        Args:
+            path (str): Caminho do arquivo JSON ou do snapshot de produtos
+            check_interval (float): Intervalo mínimo, em segundos, entre as verificações de alteração do arquivo
+            warmers (list): Funções aplicadas a cada nova versão antes da publicação, para montar seus índices
+            delta_path (str): Caminho do arquivo JSONL de atualizações, ou None para mantê-las apenas em memória
+        """
+        self.__path = path
+        self.__check_interval = check_interval
+        self.__warmers = list(warmers)
+        self.__delta_path = delta_path
+        self.__catalog = None
+        self.__version = 0
+        self.__next_check = 0.0
+        self.__failed_signature = None
+        self.__patch_id = None
+        self.__patch_offset = 0
+        self.__failed_patch = None
+        self.__reload_thread = None
+        self.__reload_requested = False
+        self.__lock = threading.Lock()
+        self.__thread_lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def delta_path(self):
+        return self.__delta_path
+
+    def file_signature(self):
+        """ Função que retorna a assinatura atual do arquivo de produtos
+
+        Returns:
+            [tuple]: Retorna o dispositivo, inode, tamanho e data de modificação do arquivo
+        """
+        return stat_signature(os.stat(self.__path))
+
+    def patch_signature(self):
+        """ Função que retorna a assinatura atual do arquivo de atualizações
+
+        Returns:
+            [tuple]: Retorna a assinatura do arquivo, ou None caso ele não exista ou não tenha sido configurado
+        """
+        if self.__delta_path is None:
+            return None
+
+        try:
+            return stat_signature(os.stat(self.__delta_path))
+        except OSError:
+            return None
+
+    def get(self):
+        """ Função que retorna o snapshot atual do catálogo, agendando uma recarga caso o arquivo tenha sido alterado
+
+        Returns:
+            [Catalog]: Retorna o snapshot do catálogo
+        """
+        catalog = self.__catalog
+
+        # Apenas a primeira carga é feita durante a requisição, pois ainda não há versão para responder
+        if catalog is None:
+            with self.__lock:
+                if self.__catalog is None:
+                    self.__publish(*self.__build())
+                return self.__catalog
+
+        self.check()
+        return catalog
+
+    def check(self, wait:bool=False):
+        """ Função que verifica se os arquivos foram alterados e, caso tenham sido, atualiza o catálogo em segundo plano
+
+        Args:
+            wait (bool): Aguarda o fim da atualização antes de retornar
+
+        Returns:
+            [bool]: Retorna verdadeiro caso uma atualização tenha sido iniciada ou já esteja em andamento
+        """
+        # Recarga solicitada por sinal, iniciada fora do tratador do sinal
+        if self.__reload_requested:
+            self.__reload_requested = False
+            return self.reload_in_background(wait)
+
+        now = time.monotonic()
+        if now < self.__next_check:
+            return False
+        self.__next_check = now + self.__check_interval
+
+        try:
+            signature = self.file_signature()
+        except OSError:
+            # Durante a troca do arquivo ele pode não existir por um instante, então mantém a versão atual
+            return False
+
+        catalog = self.__catalog
+        if catalog is None or signature != catalog.signature and signature != self.__failed_signature:
+            return self.reload_in_background(wait)
+
+        # Com o arquivo de produtos inalterado, verifica apenas se há novas operações no arquivo de atualizações
+        if self.__patch_status() is None or self.patch_signature() == self.__failed_patch:
+            return False
+
+        return self.reload_in_background(wait, full=False)
+
+    def request_reload(self):
+        """ Função que solicita a recarga do catálogo, iniciada na próxima verificação
+
+        Pode ser chamada por um tratador de sinal, pois apenas marca a solicitação sem adquirir nenhum lock, evitando o
+        deadlock caso o sinal interrompa a thread principal enquanto ela já inicia uma recarga.
+        """
+        self.__reload_requested = True
+
+    def reload_in_background(self, wait:bool=False, full:bool=True):
+        """ Função que inicia a atualização do catálogo em uma thread, caso ainda não exista uma em andamento
+
+        Args:
+            wait (bool): Aguarda o fim da atualização antes de retornar
+            full (bool): Recarrega o catálogo inteiro, ou apenas as alterações dos arquivos
+
+        Returns:
+            [bool]: Retorna verdadeiro
+        """
+        with self.__thread_lock:
+            thread = self.__reload_thread
+            if thread is None or not thread.is_alive():
+                target = self.reload if full else self.refresh
+                thread = threading.Thread(target=self.__run_quietly, args=(target,), name='catalog-reload', daemon=True)
+                thread.start()
+                self.__reload_thread = thread
+
+        if wait:
+            thread.join()
+
+        return True
+
+    def reload(self):
+        """ Função que recarrega o arquivo de produtos e o de atualizações e publica a nova versão do catálogo
+
+        Raises:
+            CatalogError: Caso o arquivo não seja um catálogo válido, mantendo a versão atual publicada
+
+        Returns:
+            [Catalog]: Retorna a nova versão do catálogo
+        """
+        with self.__lock:
+            return self.__publish(*self.__build())
+
+    def refresh(self):
+        """ Função que recarrega o catálogo caso o arquivo de produtos tenha sido alterado, ou o de atualizações
+        substituído, e caso contrário aplica apenas as novas operações do arquivo de atualizações
+
+        Raises:
+            CatalogError: Caso algum arquivo não seja válido, mantendo a versão atual publicada
+
+        Returns:
+            [Catalog]: Retorna a versão atual do catálogo
+        """
+        with self.__lock:
+            catalog = self.__catalog
+
+            try:
+                changed = catalog is None or self.file_signature() != catalog.signature
+            except OSError:
+                changed = False
+
+            if changed:
+                return self.__publish(*self.__build())
+
+            return self.__catch_up(catalog)
+
+    def apply_delta(self, operations:list):
+        """ Função que aplica atualizações incrementais sobre a versão atual do catálogo e publica o resultado
+
+        Com o arquivo de atualizações configurado, as operações são gravadas nele após serem validadas, e os demais
+        processos as aplicam na próxima verificação. Caso contrário as alterações ficam apenas em memória neste
+        processo, e são descartadas quando o arquivo do catálogo for recarregado.
+
+        Args:
+            operations (list): Operações de upsert e delete
+
+        Raises:
+            CatalogError: Caso alguma operação não seja válida, mantendo a versão atual publicada
+
+        Returns:
+            [Catalog]: Retorna a nova versão do catálogo
+        """
+        with self.__lock:
+            catalog = self.__catalog
+            if catalog is None:
+                catalog = self.__publish(*self.__build())
+
+            if self.__delta_path is None:
+                return self.__publish(self.__derive(catalog, operations))
+
+            with open(self.__delta_path, 'ab') as patch_file:
+                # O lock do arquivo ordena as gravações de todos os processos
+                if fcntl is not None:
+                    fcntl.flock(patch_file.fileno(), fcntl.LOCK_EX)
+
+                # As operações gravadas pelos demais processos são aplicadas antes, na mesma ordem do arquivo
+                catalog = self.__catch_up(catalog)
+
+                # As operações são validadas na nova versão antes de serem gravadas
+                catalog = self.__derive(catalog, operations)
+
+                patch_file.write(''.join(json.dumps(operation, ensure_ascii=False) + '\n' for operation in operations).encode('utf-8'))
+                patch_file.flush()
+                stat = os.fstat(patch_file.fileno())
+
+            return self.__publish(catalog, ((stat.st_dev, stat.st_ino), stat.st_size))
+
+    def __patch_status(self):
+        """ Função que compara o arquivo de atualizações com a parte já aplicada na versão atual
+
+        Returns:
+            [str]: Retorna 'grown' caso existam novas operações, 'replaced' caso o arquivo tenha sido substituído ou
+            truncado, ou None caso ele não tenha sido alterado
+        """
+        if self.__delta_path is None:
+            return None
+
+        try:
+            stat = os.stat(self.__delta_path)
+        except OSError:
+            return 'replaced' if self.__patch_offset else None
+
+        if (stat.st_dev, stat.st_ino) != self.__patch_id:
+            if self.__patch_offset:
+                return 'replaced'
+            return 'grown' if stat.st_size else None
+
+        if stat.st_size < self.__patch_offset:
+            return 'replaced'
+
+        return 'grown' if stat.st_size > self.__patch_offset else None
+
+    def __read_patch(self, patch_id:tuple, offset:int):
+        """ Função que lê as operações completas (terminadas por uma quebra de linha) do arquivo de atualizações
+
+        Args:
+            patch_id (tuple): Dispositivo e inode do arquivo já aplicado, lido do início caso seja outro arquivo
+            offset (int): Posição até onde o arquivo já foi aplicado
+
+        Raises:
+            CatalogError: Caso alguma linha não seja um JSON válido
+
+        Returns:
+            [tuple]: Retorna as operações, o dispositivo e inode do arquivo e a posição após a última operação lida
+        """
+        try:
+            patch_file = open(self.__delta_path, 'rb')
+        except FileNotFoundError:
+            return [], None, 0
+
+        with patch_file:
+            stat = os.fstat(patch_file.fileno())
+            file_id = (stat.st_dev, stat.st_ino)
+
+            if file_id != patch_id:
+                offset = 0
+
+            patch_file.seek(offset)
+            data = patch_file.read()
+
+        # Uma linha sem quebra no fim pode estar sendo gravada, e é lida na próxima verificação
+        end = data.rfind(b'\n') + 1
+
+        try:
+            operations = parse_delta(data[:end].decode('utf-8'))
+        except UnicodeDecodeError as error:
+            raise CatalogError('O arquivo de atualizações não está em UTF-8: {0} !!!'.format(error))
+
+        return operations, file_id, offset + end
+
+    def __catch_up(self, catalog:Catalog):
+        """ Função que aplica e publica as novas operações do arquivo de atualizações, recarregando o catálogo caso ele
+        tenha sido substituído
+
+        Args:
+            catalog (Catalog): Versão atual do catálogo
+
+        Returns:
+            [Catalog]: Retorna a versão atual do catálogo, com as novas operações
+        """
+        if self.__delta_path is None:
+            return catalog
+
+        try:
+            operations, patch_id, offset = self.__read_patch(self.__patch_id, self.__patch_offset)
+
+            # Operações substituídas ou removidas não podem ser desfeitas, então o catálogo é recarregado
+            if self.__patch_offset and patch_id != self.__patch_id:
+                return self.__publish(*self.__build())
+
+            if not operations:
+                self.__patch_id, self.__patch_offset = patch_id, offset
+                return catalog
+
+            return self.__publish(self.__derive(catalog, operations), (patch_id, offset))
+        except CatalogError:
+            # Guarda a assinatura com erro para não aplicar o mesmo arquivo inválido a cada verificação
+            self.__failed_patch = self.patch_signature()
+            raise
+
+    def __derive(self, catalog:Catalog, operations:list):
+        """ Função que aplica as operações sobre uma versão do catálogo e monta os índices da nova versão, sem publicá-la
+
+        Args:
+            catalog (Catalog): Versão atual do catálogo
+            operations (list): Operações de upsert e delete
+
+        Returns:
+            [Catalog]: Retorna a nova versão do catálogo
+        """
+        catalog = catalog.apply_delta(operations, catalog.version + 1)
+
+        for warmer in self.__warmers:
+            warmer(catalog)
+
+        return catalog
+
+    def __build(self):
+        """ Função que carrega a próxima versão do catálogo, com as operações do arquivo de atualizações, e monta seus
+        índices, sem publicá-la
+
+        Returns:
+            [tuple]: Retorna a nova versão do catálogo e a posição aplicada do arquivo de atualizações
+        """
+        try:
+            catalog = load_catalog(self.__path, self.__version + 1)
+            patch = (None, 0)
+
+            if self.__delta_path is not None:
+                operations, patch_id, offset = self.__read_patch(None, 0)
+                patch = (patch_id, offset)
+
+                if operations:
+                    catalog = catalog.apply_delta(operations, catalog.version + 1)
+        except (CatalogError, OSError) as error:
+            # Guarda a assinatura com erro para não recarregar os mesmos arquivos inválidos a cada verificação
+            try:
+                self.__failed_signature = self.file_signature()
+            except OSError:
+                pass
+            self.__failed_patch = self.patch_signature()
+
+            if isinstance(error, CatalogError):
+                raise
+            raise CatalogError('Não foi possível ler o catálogo de produtos: {0} !!!'.format(error))
+
+        for warmer in self.__warmers:
+            warmer(catalog)
+
+        return catalog, patch
+
+    def __publish(self, catalog:Catalog, patch:tuple=None):
+        """ Função que publica uma nova versão do catálogo com uma única troca de referência
+
+        Args:
+            catalog (Catalog): Nova versão do catálogo
+            patch (tuple): Dispositivo e inode do arquivo de atualizações e a posição aplicada nesta versão
+
+        Returns:
+            [Catalog]: Retorna a versão publicada
+        """
+        if patch is not None:
+            self.__patch_id, self.__patch_offset = patch
+            self.__failed_patch = None
+
+        self.__version = catalog.version
+        self.__failed_signature = None
+        self.__catalog = catalog
+        return catalog
+
+    def __run_quietly(self, target):
+        """ Função executada pela thread de recarga, registrando os erros ao invés de propagá-los
+
+        Args:
+            target (function): Função de recarga ou de atualização do catálogo
+        """
+        try:
+            target()
+        except CatalogError as error:
+            logger.error('O catálogo %s não foi atualizado: %s', self.__path, error)
@@ -1,81 +1,126 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 
+from decimal import Decimal, ROUND_HALF_UP
+from libs import catalog as cat
+
+# Menor fração da moeda, usada no arredondamento dos preços
+CENT = Decimal('0.01')
+
+
+def to_money(value):
+    """ Função que converte um valor monetário para Decimal exato, arredondado em centavos
+
+    Args:
+        value (float): Valor monetário, como float, int, str ou Decimal
+
+    Returns:
+        [Decimal]: Retorna o valor com duas casas decimais
+    """
+    if not isinstance(value, Decimal):
+        # A conversão pelo texto usa a representação curta do float, 10.99 e não 10.9900000000000002131628...
+        value = Decimal(str(value))
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def to_cents(value):
+    """ Função que converte um valor monetário para a quantidade inteira de centavos
+
+    Args:
+        value (float): Valor monetário, como float, int, str ou Decimal
+
+    Returns:
+        [int]: Retorna o valor em centavos
+    """
+    return int(to_money(value).scaleb(2))
+
+
+def from_cents(cents:int):
+    """ Função que converte uma quantidade inteira de centavos para o valor monetário
+
+    Args:
+        cents (int): Valor em centavos
+
+    Returns:
+        [Decimal]: Retorna o valor com duas casas decimais
+    """
+    return Decimal(cents).scaleb(-2)
+
+
 class Item:
-    """ Classe responsável pela criação dos produtos e seus atributos
+    """ Classe responsável pelos itens do carrinho de compras
+
+    O item guarda apenas a referência ao produto (catálogo e linha) e a quantidade, e os atributos do produto são lidos
+    da versão do catálogo compartilhada por todos os carrinhos, sem cópias por item.
     """
-    def __init__(self, id:int, name:str, price:float, minimun:int, amount_per_package:int, max_availability:int, quantity:int):
-        """ Função que cria o produto com os valores padrão passados por parâmetro
+    __slots__ = ('__catalog', '__row', '__quantity')
+
+    def __init__(self, catalog:cat.Catalog, row:int, quantity:int):
+        """ Função que cria o item do carrinho referenciando o produto na linha informada do catálogo
 
         Args:
-            id (int): Identificador do produto
-            name (str): Nome do produto
-            price (float): Preço do produto
-            minimun (int): Quantidade mínima de produto a ser vendida
-            amount_per_package (int): Quantidade a ser vendida por pacote
-            max_availability (int): Quantidade máxima disponível em estoque
+            catalog (cat.Catalog): Versão do catálogo usada nos preços do item
+            row (int): Linha do produto no catálogo
             quantity (int): Quantidade a ser colocada no carrinho de compras
         """
-        self.__id = id
-        self.__name = name
-        self.__price = price
-        self.__minimun = minimun
-        self.__amount_per_package = amount_per_package
-        self.__max_availability = max_availability
+        self.__catalog = catalog
+        self.__row = row
         self.__quantity = quantity
 
+    @classmethod
+    def from_product(cls, catalog:cat.Catalog, product:cat.Product, quantity:int):
+        """ Função que cria o item do carrinho a partir de um produto encontrado no catálogo
+
+        Args:
+            catalog (cat.Catalog): Catálogo em que o produto foi encontrado
+            product (cat.Product): Produto
+            quantity (int): Quantidade a ser colocada no carrinho de compras
+
+        Returns:
+            [Item]: Retorna o item do carrinho
+        """
+        return cls(catalog, product.row, quantity)
+
+    @property
+    def catalog(self):
+        return self.__catalog
+
+    @property
+    def row(self):
+        return self.__row
+
     @property
     def id(self):
-        return self.__id
+        return self.__catalog.value(self.__row, 'id')
 
     @property
     def name(self):
-        return self.__name
+        return self.__catalog.value(self.__row, 'name')
 
     @property
     def price(self):
-        return self.__price
+        return to_money(self.__catalog.value(self.__row, 'price'))
+
+    @property
+    def price_cents(self):
+        return to_cents(self.__catalog.value(self.__row, 'price'))
 
     @property
     def minimun(self):
-        return self.__minimun
+        return self.__catalog.value(self.__row, 'minimun')
 
     @property
     def amount_per_package(self):
-        return self.__amount_per_package
+        return self.__catalog.value(self.__row, 'amount-per-package')
 
     @property
     def max_availability(self):
-        return self.__max_availability
+        return self.__catalog.value(self.__row, 'max-availability')
 
     @property
     def quantity(self):
         return self.__quantity
 
-    @id.setter
-    def id(self, id):
-        self.__id = id
-
-    @name.setter
-    def name(self, name):
-        self.__name = name
-
-    @price.setter
-    def price(self, price):
-        self.__price = price
-
-    @minimun.setter
-    def minimun(self, minimun):
-        self.__minimun = minimun
-
-    @amount_per_package.setter
-    def amount_per_package(self, amount_per_package):
-        self.__amount_per_package = amount_per_package
-
-    @max_availability.setter
-    def max_availability(self, max_availability):
-        self.__max_availability = max_availability    
-
     @quantity.setter
     def quantity(self, quantity):
         self.__quantity = quantity
@@ -83,38 +128,124 @@ class Item:
 
 class Shopping_Cart:
     """ Classe que responsável por criar, e manipular o carrinho de compras
+
+    O total é mantido em centavos inteiros e atualizado a cada inclusão, atualização e remoção, então os itens do
+    carrinho devem ser alterados apenas pelas funções do carrinho. Todos os itens referenciam a mesma versão do
+    catálogo, usada nos preços do carrinho, que é trocada pela função reprice quando uma nova versão é publicada, e
+    nunca volta para uma versão anterior.
     """
     def __init__(self):
-        self.__items = []
-        self.__total_price = 0
+        # Itens indexados pelo id do produto, mantendo a ordem de inserção
+        self.__items = {}
+        self.__total_cents = 0
+        self.__catalog = None
+
+        # Ids dos itens removidos por não existirem mais no catálogo, ainda não informados ao cliente
+        self.__removed = []
 
     @property
     def items(self):
-        return self.__items
+        return list(self.__items.values())
+
+    @property
+    def total_cents(self):
+        return self.__total_cents
 
     @property
     def total_price(self):
-        total = 0
-        for item in self.items:
-            total = total + (item.price * item.quantity)
-        
-        self.__total_price = total
-        return self.__total_price
+        return from_cents(self.__total_cents)
+
+    @property
+    def catalog(self):
+        return self.__catalog
+
+    def reprice(self, catalog:cat.Catalog):
+        """ Função que fixa o carrinho na versão informada do catálogo, recalculando os itens e o total com os seus preços
+
+        Versões anteriores à versão fixada no carrinho são ignoradas, como as lidas por uma requisição concorrente antes
+        da publicação da versão atual.
+
+        Args:
+            catalog (cat.Catalog): Versão do catálogo
+
+        Returns:
+            [list]: Retorna os ids dos itens removidos por não existirem mais nesta versão do catálogo
+        """
+        removed = []
+
+        if catalog is self.__catalog or (self.__catalog is not None and catalog.version < self.__catalog.version):
+            return removed
+
+        items = {}
+        total_cents = 0
+
+        for id, item in self.__items.items():
+            product = catalog.get(id)
+
+            if product is None:
+                removed.append(id)
+                continue
+
+            item = Item.from_product(catalog, product, item.quantity)
+            items[id] = item
+            total_cents += item.price_cents * item.quantity
+
+        self.__items = items
+        self.__total_cents = total_cents
+        self.__catalog = catalog
+        self.__removed.extend(removed)
+
+        return removed
+
+    def take_removed(self):
+        """ Função que retorna os ids dos itens removidos por não existirem mais no catálogo desde a última chamada
+
+        Returns:
+            [list]: Retorna os ids dos itens removidos
+        """
+        removed, self.__removed = self.__removed, []
+        return removed
+
+    def pin(self, item:Item):
+        """ Função que fixa o carrinho na versão mais recente entre a sua e a do item, e retorna o item nesta versão
+
+        Args:
+            item (Item): Produto
+
+        Returns:
+            [Item]: Retorna o item na versão fixada no carrinho, ou None caso o produto não exista mais nesta versão
+        """
+        self.reprice(item.catalog)
+        catalog = self.__catalog
+
+        if item.catalog is catalog:
+            return item
+
+        # O item foi encontrado em uma versão anterior à fixada no carrinho
+        product = catalog.get(item.id)
+        if product is None:
+            return None
+
+        return Item.from_product(catalog, product, item.quantity)
+
+    def clear(self):
+        """ Função que esvazia o carrinho, liberando também a versão do catálogo usada nos preços
+        """
+        self.__items = {}
+        self.__total_cents = 0
+        self.__catalog = None
+        self.__removed = []
 
     def in_shopping_cart(self, Item:Item):
-        """ Função que retorna a posição caso encontre o item informado no carrinho
+        """ Função que retorna o item do carrinho com o mesmo id do item informado
 
         Args:
             Item (Item): Produto
 
         Returns:
-            [int]: Retorna a posição dentro do carrinho, caso o produto seja encontrado
+            [Item]: Retorna o item presente no carrinho, ou None caso o produto não seja encontrado
         """
-        pos = -1
-        for index, product in enumerate(self.__items):
-            if Item.id == product.id:
-                pos = index
-        return pos
+        return self.__items.get(Item.id)
 
     def verify_minimun(self, Item:Item):
         """ Função que valida se a quantidade mínima foi atingida
@@ -171,12 +302,18 @@ class Shopping_Cart:
             or
             [list]: Retorna uma lista com todos os erros encontrados
         """
+        # Os itens do carrinho passam para a versão do catálogo em que o item informado foi encontrado, caso seja mais recente
+        Item = self.pin(Item)
+
+        if Item is None:
+            return ["not_in_catalog"]
+
         errors = []
 
         # Verifica se o item já está no carrinho
         in_shopping_cart = self.in_shopping_cart(Item)
 
-        if in_shopping_cart != -1:
+        if in_shopping_cart is not None:
             errors.append("in_shopping_cart")
 
         # Verifica se o item atingiu a quantidade mínima
@@ -202,7 +339,8 @@ class Shopping_Cart:
             return errors
 
         # Caso atenda a todos os requisitos adiciona o item no carrinho
-        self.__items.append(Item)
+        self.__items[Item.id] = Item
+        self.__total_cents += Item.price_cents * Item.quantity
 
         return True
 
@@ -217,12 +355,18 @@ class Shopping_Cart:
             or
             [list]: Retorna uma lista com todos os erros encontrados
         """
+        # Os itens do carrinho passam para a versão do catálogo em que o item informado foi encontrado, caso seja mais recente
+        Item = self.pin(Item)
+
+        if Item is None:
+            return ["not_in_catalog"]
+
         errors = []
 
         # Verifica se o item está no carrinho
         in_shopping_cart = self.in_shopping_cart(Item)
 
-        if in_shopping_cart == -1:
+        if in_shopping_cart is None:
             errors.append("not_in_shopping_cart")
 
         # Verifica se o item atingiu a quantidade mínima
@@ -248,7 +392,8 @@ class Shopping_Cart:
             return errors
 
         # Caso atenda a todos os requisitos adiciona o item no carrinho
-        self.__items[in_shopping_cart].quantity = Item.quantity
+        self.__total_cents += in_shopping_cart.price_cents * (Item.quantity - in_shopping_cart.quantity)
+        in_shopping_cart.quantity = Item.quantity
 
         return True
 
@@ -264,46 +409,24 @@ class Shopping_Cart:
             or
             [list]: Retorna uma lista com todos os erros encontrados
         """
+        # Os itens do carrinho passam para a versão do catálogo em que o item informado foi encontrado, caso seja mais recente
+        # (um produto que não existe mais nesta versão também não está no carrinho)
+        self.reprice(Item.catalog)
+
         errors = []
 
         # Verifica se o item está no carrinho
         in_shopping_cart = self.in_shopping_cart(Item)
 
-        if in_shopping_cart == -1:
+        if in_shopping_cart is None:
             errors.append("not_in_shopping_cart")
 
         # Caso seja encontrado algum erro
         if errors != []:
             return errors
 
-        # Caso atenda a todos os requisitos adiciona o item no carrinho
-        del[self.__items[in_shopping_cart]]
+        # Caso atenda a todos os requisitos remove o item do carrinho
+        item = self.__items.pop(Item.id)
+        self.__total_cents -= item.price_cents * item.quantity
 
         return True
-
-
-
-
-# shopping_cart_1 = Shopping_Cart()
-
-# # (id, name, price, minimun, amount_per_package, max_availability, quantity)
-# item_1 = Item(1, "blar", 10.0, 5, 5, 100, 10)
-# item_2 = Item(2, "xablauzinho", 1.0, 10, 5, 200, 20)
-# item_3 = Item(1, "blar", 10.0, 5, 5, 100, 20)
-
-# shopping_cart_1.add_to_shopping_cart(item_1)
-# shopping_cart_1.add_to_shopping_cart(item_2)
-
-# print(shopping_cart_1.items)
-# print(shopping_cart_1.total_price)
-
-# shopping_cart_1.remove_from_shopping_cart(item_2)
-
-# print(shopping_cart_1.items)
-# print(shopping_cart_1.total_price)
-
-
-# print(shopping_cart_1.update_to_shopping_cart(item_3))
-
-# print(shopping_cart_1.items)
-# print(shopping_cart_1.total_price)
\ No newline at end of file
@@ -1,43 +1,269 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 
+import base64
 import json
+import os
 from os import error
 from libs import classes as cls
+from libs import carts
+from libs import catalog as cat
+from libs import search as srch
+from libs import shards
+
+# Caminho do catálogo, que pode ser o arquivo JSON ou um snapshot compilado com o comando flask compile-catalog
+CATALOG_PATH = os.environ.get('COTABEST_CATALOG', './docs/data.json')
+
+# Arquivo JSONL com as atualizações incrementais do catálogo, compartilhado por todos os processos (opcional)
+CATALOG_DELTA_PATH = os.environ.get('COTABEST_CATALOG_DELTA') or None
+
+# Intervalo, em segundos, entre as verificações de alteração do arquivo do catálogo
+CATALOG_CHECK_INTERVAL = float(os.environ.get('COTABEST_CATALOG_CHECK_INTERVAL', '1.0'))
+
+# Quantidade de processos da busca por nome em paralelo, desabilitada com menos de 2
+SEARCH_SHARDS = int(os.environ.get('COTABEST_SEARCH_SHARDS', '0'))
+
+# Busca por nome com o catálogo dividido entre processos, preparada a cada nova versão do catálogo
+search_shards = shards.Sharded_Search(SEARCH_SHARDS)
+
+# Índices montados em cada nova versão do catálogo antes da sua publicação
+CATALOG_WARMERS = [cat.Catalog.id_order, srch.trigram_index, srch.prefix_index, srch.pair_index, srch.deletion_index, srch.filter_indexes, search_shards.prepare]
+
+# Cache do catálogo compartilhado por todo o processo
+catalog_cache = cat.Catalog_Cache(CATALOG_PATH, CATALOG_CHECK_INTERVAL, CATALOG_WARMERS, CATALOG_DELTA_PATH)
+
+# Campos que podem ser selecionados na listagem de produtos
+PRODUCT_FIELDS = cat.PRODUCT_FIELDS
+
+# Quantidade padrão e máxima de produtos por página
+PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+# Quantidade padrão e máxima de sugestões do autocompletar
+AUTOCOMPLETE_LIMIT = 10
+MAX_AUTOCOMPLETE_LIMIT = 100
+
+# Quantidade padrão e máxima de produtos retornados pela busca por nome
+SEARCH_LIMIT = 100
+MAX_SEARCH_LIMIT = 1000
+
+# Campos que podem ser filtrados por faixa de valores
+FILTER_FIELDS = srch.FILTER_FIELDS
+
+# Quantidade máxima de respostas da busca por nome guardadas em cache
+SEARCH_CACHE_SIZE = int(os.environ.get('COTABEST_SEARCH_CACHE_SIZE', '1024'))
+
+# Cache das respostas da busca por nome, já serializadas, da versão atual do catálogo
+search_cache = srch.Query_Cache(SEARCH_CACHE_SIZE)
+
+# Quantidade máxima de nomes na busca em lote
+MAX_BATCH_QUERIES = 1000
+
+# Distância de edição usada quando a busca aproximada é solicitada com fuzzy: true
+FUZZY_DISTANCE = srch.FUZZY_MAX_DISTANCE
+
+# Quantidade máxima de carrinhos de compras mantidos em memória
+MAX_CARTS = int(os.environ.get('COTABEST_MAX_CARTS', '100000'))
+
+# Tempo máximo, em segundos, que um carrinho de compras é mantido sem acesso
+CART_IDLE_SECONDS = float(os.environ.get('COTABEST_CART_IDLE_SECONDS', '86400'))
+
+# Carrinhos de compras de cada cliente, identificados pelo token emitido pela API
+cart_store = carts.Cart_Store(MAX_CARTS, CART_IDLE_SECONDS)
+
+
+def read_catalog():
+    """ Função que retorna o snapshot atual do catálogo de produtos
+
+    Returns:
+        [cat.Catalog]: Retorna o catálogo, lido do arquivo JSON apenas quando ele for alterado
+    """
+    return catalog_cache.get()
 
 
 def read_products_list():
     """ Função que retorna a lista de produtos contida no arquivo JSON de exemplo
 
     Returns:
-        [list]: Retorna a lista de produtos
+        [tuple]: Retorna a lista imutável de produtos (visões das linhas) da versão atual do catálogo
     """
-    # Abre o JSON e salva em uma lista
-    with open('./docs/data.json') as json_file:
-        products = json.load(json_file)
+    return tuple(read_catalog())
+
+
+def encode_cursor(id:int):
+    """ Função que gera o cursor opaco da próxima página a partir do último id retornado
 
-    return products
+    Args:
+        id (int): Id do último produto da página
+
+    Returns:
+        [str]: Retorna o cursor codificado em base64
+    """
+    data = json.dumps({'after': id}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
 
 
-def find_products(name:str, products:list):
-    """ Função responsável por encontrar um produto na lista de produtos através do seu nome
+def decode_cursor(cursor:str):
+    """ Função que decodifica o cursor opaco da paginação
+
+    Args:
+        cursor (str): Cursor recebido do cliente
+
+    Returns:
+        [int]: Retorna o id do último produto já retornado, ou None caso o cursor seja inválido
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        after = json.loads(data)['after']
+    except (ValueError, TypeError, KeyError):
+        return None
+
+    # O cursor só é válido para ids inteiros
+    if type(after) != int:
+        return None
+
+    return after
+
+
+def paginate_products(catalog:cat.Catalog, after:int, limit:int, fields:list):
+    """ Função que retorna uma página de produtos ordenados por id, contendo apenas os campos informados
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+        after (int): Id decodificado do cursor, ou None para a primeira página
+        limit (int): Quantidade máxima de produtos na página
+        fields (list): Campos a serem retornados, ou None para todos
+
+    Returns:
+        [dict]: Retorna os produtos da página e o cursor da próxima página
+    """
+    # Busca um produto a mais para saber se existe uma próxima página
+    products = catalog.products_after(after, limit + 1)
+    next_cursor = None
+
+    if len(products) > limit:
+        products = products[:limit]
+        next_cursor = encode_cursor(products[-1]['id'])
+
+    if fields is not None:
+        products = [{field: product[field] for field in fields} for product in products]
+
+    data = {
+        'items': products,
+        'next_cursor': next_cursor
+    }
+
+    return data
+
+
+def find_products(name:str, catalog:cat.Catalog, fuzzy:int=0, limit:int=None, terms:bool=False):
+    """ Função responsável por encontrar um produto no catálogo através do seu nome
 
     Args:
         name (str): Nome ou parte do nome do produto
-        products (list): Lista de produtos
+        catalog (cat.Catalog): Catálogo de produtos
+        fuzzy (int): Distância de edição tolerada nas palavras do nome (1 ou 2), ou 0 para a busca exata
+        limit (int): Quantidade máxima de produtos, ou None para todos
+        terms (bool): Caso verdadeiro, o nome é interpretado como palavras, frases entre aspas e o operador OR
 
     Returns:
-        [list]: Retorna a lista de produtos com o nome informado
+        [list]: Retorna a lista de produtos com o nome informado, dos mais relevantes para os menos relevantes
     """
-    matches = []
+    # Busca por palavras, cruzando as listas de linhas do índice de palavras, na ordem do catálogo
+    if terms:
+        rows = srch.terms_rows(catalog, name, limit)
+
+    # Busca as linhas pelo índice de trigramas (ou de remoções simétricas, na busca aproximada) e mantém as mais relevantes,
+    # em paralelo nas partições do catálogo quando a busca em paralelo estiver habilitada
+    else:
+        rows = search_shards.ranked_rows(catalog, name, limit, fuzzy)
+        if rows is None:
+            rows = srch.ranked_rows(catalog, name, limit, fuzzy)
+
+    return [catalog[row] for row in rows]
 
-    # Varre a lista de produtos
-    for product in products:
-        # Caso encontre correspondência adiciona na lista de matches
-        if product['name'].lower().find(name.lower()) != -1:
-            matches.append(product)
 
-    return matches
+def search_cache_key(name:str, fuzzy:int, limit:int, terms:bool=False):
+    """ Função que retorna a chave do cache da busca por nome, com o nome normalizado como na própria busca
+
+    Args:
+        name (str): Nome ou parte do nome do produto
+        fuzzy (int): Distância de edição tolerada
+        limit (int): Quantidade máxima de produtos
+        terms (bool): Caso seja a busca por palavras
+
+    Returns:
+        [tuple]: Retorna a chave do cache
+    """
+    # Na busca por palavras a chave são os grupos de termos já interpretados, onde o operador OR é diferente da palavra or
+    if terms:
+        return ('find_products_terms', srch.parse_terms(name), limit)
+
+    return ('find_products', cat.fold(name), fuzzy, limit)
+
+
+def parse_ranges(data:dict):
+    """ Função que lê as faixas de valores do filtro de produtos, no formato {"price": {"min": 1, "max": 5}, ...}
+
+    Args:
+        data (dict): Corpo da requisição
+
+    Returns:
+        [dict]: Retorna as faixas (mínimo, máximo) indexadas pelo campo, ou None caso alguma faixa seja inválida
+    """
+    ranges = {}
+
+    for field in FILTER_FIELDS:
+        if field not in data:
+            continue
+
+        bounds = data[field]
+
+        # A faixa deve possuir apenas os limites min e max, com valores numéricos
+        if type(bounds) != dict or not bounds or any(bound not in ('min', 'max') for bound in bounds):
+            return None
+
+        if any(type(value) not in (int, float) for value in bounds.values()):
+            return None
+
+        ranges[field] = (bounds.get('min'), bounds.get('max'))
+
+    return ranges
+
+
+def filter_products(ranges:dict, name:str, limit:int, catalog:cat.Catalog):
+    """ Função que filtra os produtos por faixas de valores dos campos numéricos e, opcionalmente, pelo nome
+
+    Args:
+        ranges (dict): Faixas (mínimo, máximo) indexadas pelo campo
+        name (str): Nome ou parte do nome do produto, ou None
+        limit (int): Quantidade máxima de produtos
+        catalog (cat.Catalog): Catálogo de produtos
+
+    Returns:
+        [list]: Retorna a lista de produtos encontrados, na ordem do catálogo
+    """
+    # As faixas são resolvidas nos índices secundários, a partir do filtro mais seletivo
+    rows = srch.filter_rows(catalog, ranges, name, limit)
+
+    return [catalog[row] for row in rows]
+
+
+def autocomplete(prefix:str, limit:int, catalog:cat.Catalog):
+    """ Função que sugere produtos enquanto o nome é digitado, com alguma palavra do nome iniciada pelo texto informado
+
+    Args:
+        prefix (str): Texto digitado
+        limit (int): Quantidade máxima de produtos
+        catalog (cat.Catalog): Catálogo de produtos
+
+    Returns:
+        [list]: Retorna a lista de produtos sugeridos
+    """
+    # Busca apenas as primeiras entradas do índice de prefixos, sem percorrer o catálogo
+    rows = srch.autocomplete_rows(catalog, prefix, limit)
+
+    return [catalog[row] for row in rows]
 
 
 def get_shopping_cart(shopping_cart:cls.Shopping_Cart):
@@ -74,23 +300,21 @@ def get_shopping_cart(shopping_cart:cls.Shopping_Cart):
     return data
 
 
-def find_product_by_id(id:int, products:list):
-    """ Função responsável por encontrar um produto na lista de produtos através do seu id
+def find_product_by_id(id:int, catalog:cat.Catalog):
+    """ Função responsável por encontrar um produto no catálogo através do seu id
 
     Args:
         id (int): Id do produto
-        products (list): Lista de produtos
+        catalog (cat.Catalog): Catálogo de produtos
 
     Returns:
-        [dict]: Retorna um produto com base no id informado
+        [dict]: Retorna um produto com base no id informado, ou False caso não seja encontrado
     """
-    match = False
+    # Busca o produto no índice por id do catálogo
+    match = catalog.get(id)
 
-    # Varre a lista de produtos
-    for product in products:
-        # Caso encontre correspondência na lista de produtos
-        if product['id'] == id:
-            match = product
+    if match is None:
+        return False
 
     return match
 
@@ -109,6 +333,7 @@ def return_error_messages(errors:dict, item:cls.Item):
     error_messages = {
         'in_shopping_cart': 'O produto {0} já foi inserido no carrinho compras !!!'.format(item.name),
         'not_in_shopping_cart': 'O produto {0} não está cadastrado no carrinho compras !!!'.format(item.name),
+        'not_in_catalog': 'O produto {0} não está mais disponível no catálogo !!!'.format(item.name),
         'verify_minimun': 'O produto {0} não atingiu a quantidade mínima de {1} unidades !!!'.format(item.name, item.minimun),
         'verify_amount_per_package': 'O produto {0} não atingiu a quantidade por pacote de {1} unidades !!! Faltam {2} unidades na quantidade para solucionar o problema!!!',
         'verify_max_availability': 'O produto {0} ultrapassou a quantidade máxima de {1} unidades disponíveis em estoque!!!'.format(item.name, item.max_availability)
@@ -0,0 +1,1082 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import bisect
+import heapq
+import re
+import threading
+import weakref
+from array import array
+from collections import OrderedDict, deque
+from libs import catalog as cat
+
+# Tamanho dos trigramas do índice; buscas menores percorrem o catálogo
+TRIGRAM_LENGTH = 3
+
+# Quantidade máxima de listas de trigramas cruzadas em cada busca
+MAX_INTERSECTED_TRIGRAMS = 3
+
+# Distância de edição máxima da busca aproximada, e o tamanho mínimo das palavras buscadas com distância 1 e 2
+FUZZY_MAX_DISTANCE = 2
+FUZZY_MIN_LENGTHS = (4, 7)
+
+# Termos da busca por palavras: frases entre aspas (a aspa final é opcional) ou palavras separadas por espaços
+TERMS_PATTERN = re.compile(r'"([^"]*)"?|(\S+)')
+
+# Palavras das chaves de busca e dos textos digitados: sequências de letras e dígitos, sem a pontuação
+WORD_PATTERN = re.compile(r'\w+')
+
+# Campos numéricos que podem ser filtrados por faixa de valores
+FILTER_FIELDS = ('price', 'minimun', 'amount-per-package', 'max-availability')
+
+# Relevância dos resultados: nome igual à busca, iniciado pela busca, com uma palavra iniciada pela busca, contendo a
+# busca em qualquer posição, e encontrado apenas pela busca aproximada
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_WORD = 2
+RANK_SUBSTRING = 3
+RANK_FUZZY = 4
+
+
+def words(text:str):
+    """ Função que separa um texto em palavras, descartando a pontuação, da mesma forma nos índices e nas buscas
+
+    Args:
+        text (str): Texto, já normalizado pela função fold
+
+    Returns:
+        [list]: Retorna as palavras, na ordem do texto
+    """
+    return WORD_PATTERN.findall(text)
+
+
+def trigrams(text:str):
+    """ Função que retorna os trigramas (sequências de 3 caracteres) de um texto
+
+    Args:
+        text (str): Texto
+
+    Returns:
+        [set]: Retorna o conjunto de trigramas do texto
+    """
+    return {text[i:i + TRIGRAM_LENGTH] for i in range(len(text) - TRIGRAM_LENGTH + 1)}
+
+
+def gallop(rows, row:int, lo:int):
+    """ Função que encontra a posição de uma linha em uma lista ordenada a partir de uma posição inicial, avançando em
+    saltos que dobram de tamanho (galloping) antes da busca binária, então o custo depende da distância percorrida
+
+    Args:
+        rows (array): Lista ordenada de linhas
+        row (int): Linha procurada
+        lo (int): Posição a partir da qual a linha é procurada
+
+    Returns:
+        [int]: Retorna a primeira posição, a partir de lo, com uma linha maior ou igual à procurada
+    """
+    size = len(rows)
+
+    if lo >= size or rows[lo] >= row:
+        return lo
+
+    step = 1
+    while lo + step < size and rows[lo + step] < row:
+        lo += step
+        step *= 2
+
+    return bisect.bisect_left(rows, row, lo + 1, min(lo + step, size))
+
+
+def intersect(postings:list, limit:int=None):
+    """ Função que calcula a interseção de listas ordenadas de linhas, começando pela menor
+
+    Args:
+        postings (list): Listas ordenadas de linhas
+        limit (int): Quantidade máxima de listas usadas, das menores para as maiores
+
+    Returns:
+        [list]: Retorna as linhas presentes em todas as listas usadas, em ordem
+    """
+    postings = sorted(postings, key=len)[:limit]
+
+    if not postings:
+        return []
+
+    rows = postings[0]
+
+    for other in postings[1:]:
+        found = []
+        position = 0
+        size = len(other)
+
+        # As linhas estão em ordem, então cada busca começa de onde a anterior parou
+        for row in rows:
+            position = gallop(other, row, position)
+            if position == size:
+                break
+            if other[position] == row:
+                found.append(row)
+
+        rows = found
+        if not rows:
+            break
+
+    return list(rows)
+
+
+class Trigram_Index:
+    """ Classe que representa o índice invertido de trigramas dos nomes dos produtos, usado na busca por parte do nome
+    """
+    def __init__(self, catalog:cat.Catalog):
+        """ Função que monta as listas de linhas (posting lists) de cada trigrama das chaves de busca do catálogo
+
+        Args:
+            catalog (cat.Catalog): Catálogo de produtos
+        """
+        keys = catalog.column('search_key')
+        postings = {}
+
+        for row in catalog.rows():
+            for gram in trigrams(keys[row]):
+                rows = postings.get(gram)
+                if rows is None:
+                    rows = postings[gram] = array(cat.ROW_TYPECODE)
+                rows.append(row)
+
+        self.__postings = postings
+
+    def candidates(self, key:str):
+        """ Função que retorna as linhas cujos nomes possuem todos os trigramas da busca
+
+        Args:
+            key (str): Texto buscado, já normalizado pela função fold, com pelo menos 3 caracteres
+
+        Returns:
+            [list]: Retorna as linhas candidatas, em ordem, que ainda devem ser verificadas
+        """
+        postings = []
+
+        for gram in trigrams(key):
+            rows = self.__postings.get(gram)
+            if rows is None:
+                return []
+            postings.append(rows)
+
+        # As listas maiores quase não reduzem as candidatas, que ainda serão verificadas, então só as menores são cruzadas
+        return intersect(postings, MAX_INTERSECTED_TRIGRAMS)
+
+    def estimate(self, key:str):
+        """ Função que estima, sem percorrer as listas, a quantidade máxima de linhas encontradas pela busca
+
+        Args:
+            key (str): Texto buscado, já normalizado pela função fold, com pelo menos 3 caracteres
+
+        Returns:
+            [int]: Retorna o tamanho da menor lista de linhas entre os trigramas da busca
+        """
+        return min(len(self.__postings.get(gram, ())) for gram in trigrams(key))
+
+
+def trigram_index(catalog:cat.Catalog):
+    """ Função que retorna o índice de trigramas do catálogo, montado uma única vez na sua versão base
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+
+    Returns:
+        [Trigram_Index]: Retorna o índice de trigramas
+    """
+    base = catalog.base
+    return base.derived('trigram_index', lambda: Trigram_Index(base))
+
+
+def search_rows(catalog:cat.Catalog, query:str):
+    """ Função que retorna as linhas dos produtos cujo nome contém o texto buscado, sem diferenciar maiúsculas e acentos
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+        query (str): Nome ou parte do nome do produto
+
+    Returns:
+        [list]: Retorna as linhas encontradas, na ordem do catálogo
+    """
+    # A busca é normalizada como as chaves dos produtos, que já foram calculadas na carga do catálogo
+    rows = [row for row, text in search_matches(catalog, cat.fold(query))]
+
+    # As linhas alteradas desde a versão base são encontradas por último e precisam ser reordenadas
+    if catalog.dirty_names:
+        rows.sort()
+
+    return rows
+
+
+def search_matches(catalog:cat.Catalog, key:str):
+    """ Função que percorre os produtos cuja chave de busca contém o texto buscado
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+        key (str): Texto buscado, já normalizado pela função fold
+
+    Returns:
+        [iterator]: Retorna pares (linha, chave de busca), na ordem do catálogo e com as linhas alteradas no final
+    """
+    keys = catalog.column('search_key')
+
+    # Buscas com menos de 3 caracteres não possuem trigramas e percorrem o catálogo
+    if len(key) < TRIGRAM_LENGTH:
+        for row in catalog.rows():
+            text = keys[row]
+            if key in text:
+                yield row, text
+        return
+
+    # As linhas alteradas desde a versão base não são confiáveis no índice e são verificadas diretamente
+    dirty = catalog.dirty_names
+
+    for row in trigram_index(catalog).candidates(key):
+        if row not in dirty:
+            text = keys[row]
+            if key in text:
+                yield row, text
+
+    for row in dirty:
+        if catalog.is_alive(row):
+            text = keys[row]
+            if key in text:
+                yield row, text
+
+
+def match_rank(text:str, key:str):
+    """ Função que classifica a relevância de uma chave de busca para o texto buscado
+
+    Args:
+        text (str): Chave de busca do produto
+        key (str): Texto buscado, já normalizado pela função fold
+
+    Returns:
+        [int]: Retorna a relevância (quanto menor, mais relevante), ou None caso a chave não contenha o texto
+    """
+    if text == key:
+        return RANK_EXACT
+    if text.startswith(key):
+        return RANK_PREFIX
+    # As palavras das chaves são separadas por um espaço
+    if ' ' + key in text:
+        return RANK_WORD
+    if key in text:
+        return RANK_SUBSTRING
+    return None
+
+
+def ranked_rows(catalog:cat.Catalog, query:str, limit:int=None, fuzzy:int=0):
+    """ Função que retorna as linhas dos produtos encontrados, dos mais relevantes para os menos relevantes
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+        query (str): Nome ou parte do nome do produto
+        limit (int): Quantidade máxima de linhas, ou None para todas
+        fuzzy (int): Distância de edição tolerada nas palavras do nome (1 ou 2), ou 0 para a busca exata
+
+    Returns:
+        [list]: Retorna as linhas encontradas, ordenadas pela relevância e, em seguida, pela ordem do catálogo
+    """
+    return [row for rank, row in ranked_matches(catalog, query, limit, fuzzy)]
+
+
+def ranked_matches(catalog:cat.Catalog, query:str, limit:int=None, fuzzy:int=0):
+    """ Função que retorna a relevância e a linha dos produtos encontrados, dos mais relevantes para os menos relevantes
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+        query (str): Nome ou parte do nome do produto
+        limit (int): Quantidade máxima de linhas, ou None para todas
+        fuzzy (int): Distância de edição tolerada nas palavras do nome (1 ou 2), ou 0 para a busca exata
+
+    Returns:
+        [list]: Retorna os pares (relevância, linha) em ordem, permitindo juntar os resultados de vários catálogos
+    """
+    key = cat.fold(query)
+
+    if fuzzy:
+        keys = catalog.column('search_key')
+        ranks = ((match_rank(keys[row], key), row) for row in fuzzy_rows(catalog, query, fuzzy))
+        ranked = ((RANK_FUZZY if rank is None else rank, row) for rank, row in ranks)
+    else:
+        ranked = ((match_rank(text, key), row) for row, text in search_matches(catalog, key))
+
+    # Com limite, apenas os melhores resultados são mantidos em um heap, sem ordenar todos os encontrados
+    if limit is None:
+        ranked = sorted(ranked)
+    else:
+        ranked = heapq.nsmallest(limit, ranked)
+
+    return ranked
+
+
+class Prefix_Index:
+    """ Classe que representa o índice de prefixos do autocompletar: as palavras das chaves de busca em ordem alfabética,
+    cada uma com as linhas dos produtos que a possuem, percorrido com busca binária
+
+    O mesmo índice guarda também os pares de palavras vizinhas ("racao para"), usados no autocompletar com várias
+    palavras, onde o prefixo "para ca" encontra as linhas com "para" seguida de uma palavra iniciada por "ca".
+    """
+    def __init__(self, catalog:cat.Catalog, split=None):
+        """ Função que monta o vocabulário ordenado e as listas de linhas de cada palavra das chaves de busca do catálogo
+
+        Args:
+            catalog (cat.Catalog): Catálogo de produtos
+            split (function): Função que separa a chave de busca nos termos indexados, por padrão as palavras
+        """
+        split = split or words
+        keys = catalog.column('search_key')
+        postings = {}
+
+        for row in catalog.rows():
+            for word in set(split(keys[row])):
+                rows = postings.get(word)
+                if rows is None:
+                    rows = postings[word] = array(cat.ROW_TYPECODE)
+                rows.append(row)
+
+        self.__words = sorted(postings)
+        self.__postings = [postings[word] for word in self.__words]
+
+    @property
+    def words(self):
+        return self.__words
+
+    def word(self, word:str):
+        """ Função que retorna as linhas dos produtos que possuem uma palavra completa
+
+        Args:
+            word (str): Palavra, já normalizada pela função fold
+
+        Returns:
+            [array]: Retorna as linhas, em ordem, ou uma lista vazia caso a palavra não exista
+        """
+        position = bisect.bisect_left(self.__words, word)
+
+        if position < len(self.__words) and self.__words[position] == word:
+            return self.__postings[position]
+
+        return []
+
+    def prefixed(self, prefix:str):
+        """ Função que percorre as palavras que começam com o prefixo, em ordem alfabética
+
+        Args:
+            prefix (str): Prefixo, já normalizado pela função fold
+
+        Returns:
+            [iterator]: Retorna pares (palavra, linhas) de cada palavra encontrada
+        """
+        position = bisect.bisect_left(self.__words, prefix)
+
+        while position < len(self.__words) and self.__words[position].startswith(prefix):
+            yield self.__words[position], self.__postings[position]
+            position += 1
+
+
+def prefix_index(catalog:cat.Catalog):
+    """ Função que retorna o índice de prefixos do catálogo, montado uma única vez na sua versão base
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+
+    Returns:
+        [Prefix_Index]: Retorna o índice de prefixos
+    """
+    base = catalog.base
+    return base.derived('prefix_index', lambda: Prefix_Index(base))
+
+
+def word_pairs(key:str):
+    """ Função que separa uma chave de busca nos pares de palavras vizinhas, unidas por um espaço
+
+    Args:
+        key (str): Chave de busca do produto
+
+    Returns:
+        [list]: Retorna os pares de palavras, na ordem da chave
+    """
+    key_words = words(key)
+    return [key_words[i] + ' ' + key_words[i + 1] for i in range(len(key_words) - 1)]
+
+
+def pair_index(catalog:cat.Catalog):
+    """ Função que retorna o índice dos pares de palavras vizinhas do catálogo, montado uma única vez na sua versão base
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+
+    Returns:
+        [Prefix_Index]: Retorna o índice de prefixos dos pares de palavras
+    """
+    base = catalog.base
+    return base.derived('pair_index', lambda: Prefix_Index(base, word_pairs))
+
+
+def prefix_match(key:str, tokens:list):
+    """ Função que verifica se uma chave de busca possui as palavras digitadas, em sequência, com a última apenas iniciada
+
+    Args:
+        key (str): Chave de busca do produto
+        tokens (list): Palavras digitadas, já normalizadas pela função fold
+
+    Returns:
+        [str]: Retorna a palavra da chave usada na ordenação do resultado, ou None caso a chave não corresponda
+    """
+    # Todas as palavras digitadas precisam aparecer na chave, verificação mais barata que a separação das palavras
+    if any(token not in key for token in tokens):
+        return None
+
+    key_words = words(key)
+    size = len(tokens)
+    match = None
+
+    for start in range(len(key_words) - size + 1):
+        if key_words[start:start + size - 1] == tokens[:-1] and key_words[start + size - 1].startswith(tokens[-1]):
+            # Com uma única palavra digitada o produto é ordenado pela menor palavra encontrada
+            word = key_words[start] if size == 1 else tokens[0]
+            if match is None or word < match:
+                match = word
+
+    return match
+
+
+def autocomplete_rows(catalog:cat.Catalog, prefix:str, limit:int):
+    """ Função que retorna as linhas dos produtos com alguma palavra do nome iniciada pelo texto digitado
+
+    Com várias palavras digitadas, as anteriores à última devem estar completas e em sequência no nome. Os produtos são
+    ordenados pela palavra encontrada e pela ordem do catálogo, então apenas as primeiras entradas do índice são lidas.
+    Com várias palavras, as linhas são lidas do índice de pares de palavras vizinhas, e não das listas de cada palavra,
+    que podem ser longas mesmo quando poucos produtos possuem a sequência digitada.
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+        prefix (str): Texto digitado
+        limit (int): Quantidade máxima de produtos
+
+    Returns:
+        [list]: Retorna as linhas encontradas, na ordem do autocompletar
+    """
+    tokens = words(cat.fold(prefix))
+
+    if not tokens:
+        return []
+
+    index = prefix_index(catalog)
+    keys = catalog.column('search_key')
+    dirty = catalog.dirty_names
+    found = []
+    seen = set()
+
+    if len(tokens) == 1:
+        # As palavras e as linhas de cada palavra já estão em ordem, então a busca para no limite
+        for word, rows in index.prefixed(tokens[0]):
+            for row in rows:
+                if row not in seen and row not in dirty:
+                    seen.add(row)
+                    found.append((word, row))
+                    if len(found) == limit:
+                        break
+            if len(found) == limit:
+                break
+    else:
+        # Os pares de palavras completas devem existir, e o último par é formado pela última palavra completa e pelo
+        # início da palavra digitada por último
+        pairs = pair_index(catalog)
+        complete = [pairs.word(tokens[i] + ' ' + tokens[i + 1]) for i in range(len(tokens) - 2)]
+        last = [rows for pair, rows in pairs.prefixed(tokens[-2] + ' ' + tokens[-1])]
+
+        if all(len(rows) for rows in complete) and last:
+            # As linhas são percorridas na menor entre as listas dos pares completos e a união das listas do último par,
+            # e procuradas nas demais com cada posição avançando junto com as linhas
+            smallest = min(complete, key=len) if complete else None
+
+            if smallest is not None and len(smallest) < sum(len(rows) for rows in last):
+                driver, required, optional = smallest, [rows for rows in complete if rows is not smallest], last
+            else:
+                driver, required, optional = heapq.merge(*last), complete, []
+
+            positions = [0] * (len(required) + len(optional))
+
+            def contains(position, rows, row):
+                positions[position] = gallop(rows, row, positions[position])
+                return positions[position] < len(rows) and rows[positions[position]] == row
+
+            for row in driver:
+                if row in seen or row in dirty:
+                    continue
+
+                if not all(contains(position, rows, row) for position, rows in enumerate(required)):
+                    # Uma lista percorrida até o fim não possui mais nenhuma linha
+                    if any(positions[position] == len(rows) for position, rows in enumerate(required)):
+                        break
+                    continue
+
+                if optional and not any(contains(position, rows, row) for position, rows in enumerate(optional, len(required))):
+                    continue
+
+                # Com mais de duas palavras os pares podem estar em posições diferentes, então a sequência é verificada
+                if len(tokens) == 2 or prefix_match(keys[row], tokens) is not None:
+                    seen.add(row)
+                    found.append((tokens[0], row))
+                    if len(found) == limit:
+                        break
+
+    # As linhas alteradas desde a versão base não são confiáveis no índice e são verificadas diretamente
+    if dirty:
+        for row in dirty:
+            word = prefix_match(keys[row], tokens) if catalog.is_alive(row) else None
+            if word is not None:
+                found.append((word, row))
+        found = sorted(found)[:limit]
+
+    return [row for word, row in found]
+
+
+def deletions(word:str, distance:int):
+    """ Função que retorna as variações de uma palavra com até a quantidade informada de caracteres removidos
+
+    Args:
+        word (str): Palavra
+        distance (int): Quantidade máxima de caracteres removidos
+
+    Returns:
+        [set]: Retorna as variações, incluindo a própria palavra
+    """
+    variants = {word}
+    current = {word}
+
+    for _ in range(distance):
+        current = {variant[:i] + variant[i + 1:] for variant in current for i in range(len(variant))}
+        variants |= current
+
+    return variants
+
+
+def edit_distance(a:str, b:str, limit:int):
+    """ Função que calcula a distância de edição entre duas palavras (inserção, remoção, troca e transposição de caracteres)
+
+    Args:
+        a (str): Primeira palavra
+        b (str): Segunda palavra
+        limit (int): Distância máxima de interesse, a partir da qual o cálculo é interrompido
+
+    Returns:
+        [int]: Retorna a distância, ou limit + 1 caso ela seja maior que o limite
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous = None
+    current = list(range(len(b) + 1))
+
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+
+            # Caracteres vizinhos trocados de posição contam como uma única edição
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+
+        if min(current) > limit:
+            return limit + 1
+
+    return current[-1]
+
+
+class Deletion_Index:
+    """ Classe que representa o índice de remoções simétricas da busca aproximada: cada variação de uma palavra do
+    vocabulário, com até FUZZY_MAX_DISTANCE caracteres removidos, aponta para as palavras que a geraram
+
+    O índice é compartilhado entre as versões do catálogo e apenas as palavras novas são adicionadas a cada recarga.
+    Cada palavra conta as versões base que a possuem, e quando uma versão deixa de ser usada as suas palavras são
+    retiradas na próxima atualização do índice, removendo as que não estão mais em nenhuma versão.
+    """
+    def __init__(self):
+        self.__variants = {}
+        self.__counts = {}
+        self.__retired = deque()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__counts)
+
+    def __contains__(self, word:str):
+        return word in self.__counts
+
+    def add(self, words:list):
+        """ Função que adiciona ao índice as palavras que ainda não foram indexadas, e retira antes as palavras das
+        versões que deixaram de ser usadas
+
+        Args:
+            words (list): Palavras do vocabulário, já normalizadas pela função fold
+
+        Returns:
+            [Deletion_Index]: Retorna o próprio índice
+        """
+        with self.__lock:
+            self.__remove_retired()
+
+            for word in words:
+                if not fuzzy_word(word):
+                    continue
+
+                count = self.__counts.get(word, 0)
+                self.__counts[word] = count + 1
+
+                if count == 0:
+                    for variant in deletions(word, FUZZY_MAX_DISTANCE):
+                        self.__variants.setdefault(variant, []).append(word)
+
+        return self
+
+    def retire(self, words:list):
+        """ Função que agenda a retirada das palavras de uma versão que deixou de ser usada
+
+        Pode ser chamada durante a coleta de lixo, em qualquer thread, então apenas guarda as palavras sem adquirir o
+        lock, e a retirada é feita na próxima chamada da função add.
+
+        Args:
+            words (list): Palavras adicionadas pela versão
+        """
+        self.__retired.append(words)
+
+    def track(self, catalog:cat.Catalog, words:list):
+        """ Função que adiciona as palavras de uma versão base do catálogo e agenda a sua retirada quando ela for
+        descartada
+
+        Args:
+            catalog (cat.Catalog): Versão base do catálogo
+            words (list): Palavras do vocabulário da versão
+
+        Returns:
+            [Deletion_Index]: Retorna o próprio índice
+        """
+        self.add(words)
+        weakref.finalize(catalog, self.retire, words)
+        return self
+
+    def __remove_retired(self):
+        """ Função que remove do índice as palavras que não estão mais em nenhuma versão em uso, chamada com o lock
+        """
+        while self.__retired:
+            for word in self.__retired.popleft():
+                count = self.__counts.get(word)
+                if count is None:
+                    continue
+
+                if count > 1:
+                    self.__counts[word] = count - 1
+                    continue
+
+                del self.__counts[word]
+                for variant in deletions(word, FUZZY_MAX_DISTANCE):
+                    # As listas são substituídas, e não alteradas, pois podem estar sendo lidas por uma busca
+                    remaining = [other for other in self.__variants.get(variant, ()) if other != word]
+                    if remaining:
+                        self.__variants[variant] = remaining
+                    else:
+                        self.__variants.pop(variant, None)
+
+    def similar(self, token:str, distance:int):
+        """ Função que retorna as palavras indexadas a até a distância de edição informada do texto buscado
+
+        Args:
+            token (str): Palavra buscada, já normalizada pela função fold
+            distance (int): Distância de edição máxima
+
+        Returns:
+            [set]: Retorna as palavras encontradas
+        """
+        found = set()
+
+        for variant in deletions(token, distance):
+            for word in self.__variants.get(variant, ()):
+                if word not in found and edit_distance(token, word, distance) <= distance:
+                    found.add(word)
+
+        return found
+
+
+# Índice de remoções compartilhado por todas as versões do catálogo do processo
+DELETION_INDEX = Deletion_Index()
+
+
+def deletion_index(catalog:cat.Catalog):
+    """ Função que retorna o índice de remoções, após adicionar as palavras novas da versão base do catálogo
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+
+    Returns:
+        [Deletion_Index]: Retorna o índice de remoções
+    """
+    base = catalog.base
+    return base.derived('deletion_index', lambda: DELETION_INDEX.track(base, prefix_index(base).words))
+
+
+def fuzzy_word(word:str):
+    """ Função que verifica se uma palavra do catálogo pode ser encontrada com erros de digitação, e as palavras curtas
+    apenas sem erros, da mesma forma no índice de remoções e nas linhas verificadas diretamente
+
+    Args:
+        word (str): Palavra do catálogo, já normalizada pela função fold
+
+    Returns:
+        [bool]: Retorna verdadeiro caso a palavra tenha o tamanho mínimo da busca aproximada
+    """
+    return len(word) >= FUZZY_MIN_LENGTHS[0]
+
+
+def fuzzy_distance(token:str, distance:int):
+    """ Função que retorna a distância de edição permitida para uma palavra, menor nas palavras curtas
+
+    Args:
+        token (str): Palavra buscada
+        distance (int): Distância de edição solicitada
+
+    Returns:
+        [int]: Retorna a distância permitida
+    """
+    allowed = sum(len(token) >= length for length in FUZZY_MIN_LENGTHS)
+    return min(distance, allowed)
+
+
+def fuzzy_rows(catalog:cat.Catalog, query:str, distance:int):
+    """ Função que retorna as linhas dos produtos cujo nome contém o texto buscado ou, com erros de digitação, cujas
+    palavras estão a até a distância de edição informada de cada palavra buscada
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+        query (str): Nome ou parte do nome do produto
+        distance (int): Distância de edição máxima (1 ou 2)
+
+    Returns:
+        [list]: Retorna as linhas encontradas, na ordem do catálogo
+    """
+    rows = set(search_rows(catalog, query))
+    tokens = words(cat.fold(query))
+
+    if not tokens:
+        return sorted(rows)
+
+    index = prefix_index(catalog)
+    similar = deletion_index(catalog).similar
+    keys = catalog.column('search_key')
+    dirty = catalog.dirty_names
+
+    # Cada palavra buscada corresponde às palavras do vocabulário próximas dela
+    limits = [fuzzy_distance(token, distance) for token in tokens]
+    matches = []
+    for token, limit in zip(tokens, limits):
+        match = similar(token, limit)
+        match.add(token)
+        matches.append(match)
+
+    def matches_all(row):
+        if len(matches) == 1:
+            return True
+        row_words = set(words(keys[row]))
+        return all(not row_words.isdisjoint(match) for match in matches)
+
+    # As linhas são percorridas a partir da palavra buscada com menos produtos e verificadas nas demais
+    postings = [[index.word(word) for word in match] for match in matches]
+    smallest = min(postings, key=lambda lists: sum(len(rows) for rows in lists))
+
+    for candidates in smallest:
+        rows.update(row for row in candidates if row not in dirty and row not in rows and matches_all(row))
+
+    # As linhas alteradas desde a versão base possuem palavras fora do índice e são verificadas diretamente, com a
+    # mesma regra do índice para as palavras curtas
+    for row in dirty:
+        if catalog.is_alive(row) and row not in rows:
+            row_words = words(keys[row])
+            if all(any(word in match or (fuzzy_word(word) and edit_distance(token, word, limit) <= limit) for word in row_words)
+                   for token, limit, match in zip(tokens, limits, matches)):
+                rows.add(row)
+
+    return sorted(rows)
+
+
+class Query_Cache:
+    """ Classe que representa o cache LRU das respostas já serializadas da busca, válido para uma única versão do catálogo
+    """
+    def __init__(self, max_entries:int):
+        """ Função que cria o cache vazio
+
+        Args:
+            max_entries (int): Quantidade máxima de respostas guardadas, ou 0 para desabilitar o cache
+        """
+        self.__max_entries = max_entries
+        self.__entries = OrderedDict()
+        self.__version = None
+        self.__hits = 0
+        self.__misses = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def max_entries(self):
+        return self.__max_entries
+
+    @property
+    def hits(self):
+        return self.__hits
+
+    @property
+    def misses(self):
+        return self.__misses
+
+    def get(self, version:int, key:tuple):
+        """ Função que retorna a resposta guardada para a busca, marcando-a como a mais recente
+
+        Args:
+            version (int): Versão do catálogo usada na busca
+            key (tuple): Busca normalizada e seus parâmetros
+
+        Returns:
+            [bytes]: Retorna a resposta serializada, ou None caso ela não esteja no cache
+        """
+        with self.__lock:
+            body = self.__entries.get(key) if version == self.__version else None
+
+            if body is None:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+                self.__entries.move_to_end(key)
+
+            return body
+
+    def put(self, version:int, key:tuple, body:bytes):
+        """ Função que guarda a resposta de uma busca, removendo as menos usadas recentemente caso o cache esteja cheio
+
+        Args:
+            version (int): Versão do catálogo usada na busca
+            key (tuple): Busca normalizada e seus parâmetros
+            body (bytes): Resposta serializada
+        """
+        with self.__lock:
+            # Uma nova versão do catálogo invalida todas as respostas de uma vez
+            if self.__version is None or version > self.__version:
+                self.__entries.clear()
+                self.__version = version
+
+            # Respostas de versões anteriores, ainda em andamento durante a recarga, não são guardadas
+            if version != self.__version or self.__max_entries <= 0:
+                return
+
+            self.__entries[key] = body
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+
+    def stats(self):
+        """ Função que retorna os contadores do cache
+
+        Returns:
+            [dict]: Retorna a versão do catálogo, a quantidade de respostas guardadas, o limite e os acertos e falhas
+        """
+        with self.__lock:
+            data = {
+                'version': self.__version,
+                'entries': len(self.__entries),
+                'max_entries': self.__max_entries,
+                'hits': self.__hits,
+                'misses': self.__misses
+            }
+
+        return data
+
+
+def parse_terms(query:str):
+    """ Função que interpreta a busca por palavras: os termos separados por espaços devem estar todos no nome (E), o
+    operador OR entre dois termos aceita qualquer um deles (OU), e os termos entre aspas são frases em sequência
+
+    Ex: 'racao "para gato" OR "para cachorro" 15kg' busca ração, para gato ou para cachorro, e 15kg.
+
+    Args:
+        query (str): Texto da busca
+
+    Returns:
+        [tuple]: Retorna os grupos que devem estar todos no nome, cada um com as frases alternativas (tuplas de palavras
+        normalizadas pela função fold), podendo ser usado como chave de cache
+    """
+    groups = []
+    join = False
+
+    for phrase, word in TERMS_PATTERN.findall(query):
+        # O operador OR une o próximo termo ao grupo anterior
+        if word == 'OR':
+            join = bool(groups)
+            continue
+
+        # Termos com pontuação interna, como arroz-agulha, são tratados como frases
+        term = tuple(words(cat.fold(phrase if word == '' else word)))
+        if not term:
+            continue
+
+        if join:
+            groups[-1].append(term)
+        else:
+            groups.append([term])
+        join = False
+
+    return tuple(tuple(sorted(set(group))) for group in groups)
+
+
+def terms_match(text:str, groups:tuple):
+    """ Função que verifica se uma chave de busca atende a todos os grupos da busca por palavras
+
+    Args:
+        text (str): Chave de busca do produto
+        groups (tuple): Grupos retornados pela função parse_terms
+
+    Returns:
+        [bool]: Retorna verdadeiro caso a chave possua, em cada grupo, alguma das frases com as palavras completas
+    """
+    # As palavras da chave, sem a pontuação, são unidas por um espaço e as frases são procuradas entre espaços
+    padded = ' ' + ' '.join(words(text)) + ' '
+    return all(any(' ' + ' '.join(term) + ' ' in padded for term in group) for group in groups)
+
+
+def terms_rows(catalog:cat.Catalog, query:str, limit:int=None):
+    """ Função que retorna as linhas dos produtos encontrados pela busca por palavras, cruzando as listas de linhas do
+    índice de palavras da menor para a maior, então o custo acompanha o termo mais raro e não o tamanho do catálogo
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+        query (str): Texto da busca, interpretado pela função parse_terms
+        limit (int): Quantidade máxima de linhas, ou None para todas
+
+    Returns:
+        [list]: Retorna as linhas encontradas, na ordem do catálogo
+    """
+    groups = parse_terms(query)
+
+    if not groups:
+        return []
+
+    index = prefix_index(catalog)
+    keys = catalog.column('search_key')
+    dirty = catalog.dirty_names
+    postings = []
+
+    for group in groups:
+        # Cada frase corresponde às linhas com todas as suas palavras, e as alternativas de um grupo são unidas
+        alternatives = [intersect([index.word(word) for word in term]) for term in group]
+
+        if len(alternatives) == 1:
+            postings.append(alternatives[0])
+        else:
+            postings.append(sorted(set().union(*alternatives)))
+
+    rows = [row for row in intersect(postings) if row not in dirty]
+
+    # A interseção garante as palavras das frases, mas a sequência delas é verificada apenas nas linhas encontradas
+    if any(len(term) > 1 for group in groups for term in group):
+        rows = [row for row in rows if terms_match(keys[row], groups)]
+
+    # As linhas alteradas desde a versão base não são confiáveis no índice e são verificadas diretamente
+    if dirty:
+        rows.extend(row for row in dirty if catalog.is_alive(row) and terms_match(keys[row], groups))
+        rows.sort()
+
+    return rows[:limit]
+
+
+def sorted_index(catalog:cat.Catalog, field:str):
+    """ Função que retorna o índice secundário de um campo numérico, montado uma única vez na versão base do catálogo
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+        field (str): Campo numérico
+
+    Returns:
+        [tuple]: Retorna os valores do campo em ordem crescente e as linhas correspondentes
+    """
+    base = catalog.base
+
+    def build():
+        column = base.column(field)
+        rows = array(cat.ROW_TYPECODE, sorted(base.rows(), key=column.__getitem__))
+        return array(column.format if isinstance(column, memoryview) else column.typecode, (column[row] for row in rows)), rows
+
+    return base.derived('sorted_index:' + field, build)
+
+
+def filter_indexes(catalog:cat.Catalog):
+    """ Função que monta os índices secundários de todos os campos filtráveis do catálogo
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+
+    Returns:
+        [list]: Retorna os índices de cada campo, na ordem de FILTER_FIELDS
+    """
+    return [sorted_index(catalog, field) for field in FILTER_FIELDS]
+
+
+def filter_rows(catalog:cat.Catalog, ranges:dict, name:str=None, limit:int=None):
+    """ Função que retorna as linhas dos produtos com os campos dentro das faixas de valores e, opcionalmente, com o nome
+    contendo o texto buscado
+
+    Cada faixa é resolvida por busca binária no índice secundário do campo, o que informa a quantidade de linhas antes
+    de percorrê-las. As linhas são obtidas do filtro mais seletivo (incluindo a estimativa da busca por nome) e os demais
+    filtros são verificados diretamente nas colunas.
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+        ranges (dict): Faixas (mínimo, máximo) indexadas pelo campo, com None nos limites abertos
+        name (str): Nome ou parte do nome do produto, ou None para não filtrar pelo nome
+        limit (int): Quantidade máxima de linhas, ou None para todas
+
+    Returns:
+        [list]: Retorna as linhas encontradas, na ordem do catálogo
+    """
+    selections = []
+
+    for field, (lo, hi) in ranges.items():
+        values, rows = sorted_index(catalog, field)
+        start = 0 if lo is None else bisect.bisect_left(values, lo)
+        end = len(values) if hi is None else bisect.bisect_right(values, hi)
+        selections.append((max(end - start, 0), field, rows, start, end))
+
+    key = None if name is None else cat.fold(name)
+    name_size = None
+
+    if key is not None:
+        name_size = catalog.row_count if len(key) < 3 else trigram_index(catalog).estimate(key)
+
+    if selections:
+        size, field, rows, start, end = min(selections, key=lambda selection: selection[0])
+
+    if not selections or (name_size is not None and name_size < size):
+        # A busca por nome é a mais seletiva, ou a única
+        candidates = search_rows(catalog, '' if key is None else key)
+    else:
+        # As linhas alteradas desde a versão base não são confiáveis no índice e são verificadas diretamente
+        dirty = catalog.dirty_rows
+        candidates = [row for row in rows[start:end] if row not in dirty]
+        candidates.extend(row for row in dirty if catalog.is_alive(row))
+        candidates.sort()
+
+    columns = [(catalog.column(field), lo, hi) for field, (lo, hi) in ranges.items()]
+    keys = catalog.column('search_key')
+    found = []
+
+    for row in candidates:
+        if all((lo is None or lo <= column[row]) and (hi is None or column[row] <= hi) for column, lo, hi in columns):
+            if key is None or key in keys[row]:
+                found.append(row)
+                if len(found) == limit:
+                    break
+
+    return found
+
@@ -0,0 +1,378 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import heapq
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from array import array
+from multiprocessing.connection import wait
+from libs import catalog as cat
+from libs import search as srch
+
+logger = logging.getLogger(__name__)
+
+# Tempo máximo, em segundos, aguardando o encerramento de um processo de busca
+SHARD_JOIN_TIMEOUT = 5.0
+
+# Quantidade de canais de cada conjunto de processos, ou seja, de buscas enviadas ao mesmo tempo
+SHARD_CHANNELS = 8
+
+# Tempo máximo, em segundos, aguardando um canal livre e as respostas dos processos antes de buscar no próprio processo
+SHARD_SEARCH_TIMEOUT = 2.0
+
+
+def build_shard(catalog:cat.Catalog, rows):
+    """ Função que monta um catálogo menor apenas com as linhas informadas (partição), com os seus próprios índices
+
+    Args:
+        catalog (cat.Catalog): Catálogo de produtos
+        rows (iterable): Linhas da partição, em ordem
+
+    Returns:
+        [tuple]: Retorna o catálogo da partição e as linhas originais de cada uma das suas linhas
+    """
+    builder = cat.Catalog_Builder()
+    origin = array(cat.ROW_TYPECODE)
+
+    for row in rows:
+        if catalog.is_alive(row):
+            builder.add(dict(catalog[row]))
+            origin.append(row)
+
+    return builder.build(catalog.version), origin
+
+
+def shard_matches(shard:tuple, query:str, limit:int, fuzzy:int):
+    """ Função que executa a busca em uma partição, convertendo as linhas para as do catálogo original
+
+    Args:
+        shard (tuple): Catálogo da partição e as linhas originais, retornados pela função build_shard
+        query (str): Nome ou parte do nome do produto
+        limit (int): Quantidade máxima de linhas, ou None para todas
+        fuzzy (int): Distância de edição tolerada
+
+    Returns:
+        [list]: Retorna os pares (relevância, linha original) em ordem
+    """
+    catalog, origin = shard
+    return [(rank, origin[row]) for rank, row in srch.ranked_matches(catalog, query, limit, fuzzy)]
+
+
+def shard_worker(control, connections:list, catalog:cat.Catalog, start:int, end:int):
+    """ Função executada em cada processo de busca: monta a partição e responde às buscas recebidas pelos canais
+
+    Args:
+        control (Connection): Conexão com o processo principal usada para avisar a montagem e o encerramento
+        connections (list): Conexões de cada canal com o processo principal
+        catalog (cat.Catalog): Catálogo de produtos, herdado do processo principal sem cópia
+        start (int): Primeira linha da partição
+        end (int): Linha seguinte à última da partição
+    """
+    # O índice de remoções do processo principal pode ter sido copiado no meio de uma atualização
+    srch.DELETION_INDEX = srch.Deletion_Index()
+
+    shard = build_shard(catalog, range(start, end))
+    srch.trigram_index(shard[0])
+    control.send(True)
+
+    connections = list(connections)
+
+    while connections:
+        ready = wait(connections + [control])
+
+        # Qualquer mensagem na conexão de controle, ou o seu fechamento, encerra o processo
+        if control in ready:
+            break
+
+        for connection in ready:
+            try:
+                message = connection.recv()
+                try:
+                    result = shard_matches(shard, *message)
+                except Exception as error:
+                    result = error
+                connection.send(result)
+            except (EOFError, OSError):
+                connections.remove(connection)
+
+    for connection in connections + [control]:
+        connection.close()
+
+
+class Shard_Pool:
+    """ Classe que representa os processos de busca de uma versão do catálogo, cada um com uma partição das linhas
+
+    Cada busca utiliza um canal livre, com uma conexão para cada processo, então buscas simultâneas não se bloqueiam e
+    as respostas de um canal chegam sempre na ordem em que as buscas foram enviadas.
+    """
+    def __init__(self, catalog:cat.Catalog, shards:int, context, channels:int=SHARD_CHANNELS, timeout:float=SHARD_SEARCH_TIMEOUT):
+        """ Função que inicia um processo por partição e aguarda a montagem dos seus índices
+
+        Args:
+            catalog (cat.Catalog): Versão base do catálogo
+            shards (int): Quantidade de partições
+            context (multiprocessing.context.BaseContext): Contexto fork do multiprocessing
+            channels (int): Quantidade de canais, ou seja, de buscas enviadas ao mesmo tempo
+            timeout (float): Tempo máximo, em segundos, aguardando um canal livre e as respostas dos processos
+        """
+        self.__catalog = catalog
+        self.__timeout = timeout
+        self.__controls = []
+        self.__processes = []
+        self.__channels = queue.Queue()
+        self.__open_channels = channels
+        self.__lock = threading.Lock()
+        self.__closed = False
+
+        size = catalog.row_count
+        bounds = [size * shard // shards for shard in range(shards + 1)]
+        connections = []
+
+        for start, end in zip(bounds, bounds[1:]):
+            control, child_control = context.Pipe()
+            pipes = [context.Pipe() for channel in range(channels)]
+            children = [child for parent, child in pipes]
+
+            process = context.Process(target=shard_worker, args=(child_control, children, catalog, start, end), name='catalog-shard', daemon=True)
+            process.start()
+
+            child_control.close()
+            for child in children:
+                child.close()
+
+            self.__controls.append(control)
+            self.__processes.append(process)
+            connections.append([parent for parent, child in pipes])
+
+        for control in self.__controls:
+            control.recv()
+
+        # Cada canal possui a conexão do mesmo índice com cada um dos processos
+        for channel in zip(*connections):
+            self.__channels.put(channel)
+
+    @property
+    def catalog(self):
+        return self.__catalog
+
+    def search(self, query:str, limit:int, fuzzy:int):
+        """ Função que envia a busca para todas as partições e junta os melhores resultados de cada uma
+
+        Args:
+            query (str): Nome ou parte do nome do produto
+            limit (int): Quantidade máxima de linhas de cada partição, ou None para todas
+            fuzzy (int): Distância de edição tolerada
+
+        Raises:
+            EOFError: Caso os processos de busca tenham sido encerrados
+            TimeoutError: Caso nenhum canal fique livre, ou os processos não respondam, dentro do tempo máximo
+
+        Returns:
+            [iterator]: Retorna os pares (relevância, linha) de todas as partições, em ordem
+        """
+        if self.__closed:
+            raise EOFError('Os processos de busca foram encerrados')
+
+        try:
+            channel = self.__channels.get(timeout=self.__timeout)
+        except queue.Empty:
+            raise TimeoutError('Nenhum canal dos processos de busca ficou livre a tempo') from None
+
+        try:
+            for connection in channel:
+                connection.send((query, limit, fuzzy))
+
+            deadline = time.monotonic() + self.__timeout
+            results = []
+
+            for connection in channel:
+                if not connection.poll(max(deadline - time.monotonic(), 0)):
+                    raise TimeoutError('Os processos de busca não responderam a tempo')
+                results.append(connection.recv())
+        except TimeoutError:
+            # A resposta atrasada deixaria o canal fora de ordem, então ele é descartado
+            self.__discard(channel)
+            raise
+        except (EOFError, OSError):
+            # Com um processo encerrado nenhum canal recebe todas as respostas, então o conjunto é descartado
+            with self.__lock:
+                self.__closed = True
+            raise
+
+        self.__channels.put(channel)
+
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+        # As partições são faixas contínuas de linhas, então a junção mantém a ordem de relevância e do catálogo
+        return heapq.merge(*results)
+
+    def __discard(self, channel:tuple):
+        """ Função que descarta um canal com respostas pendentes, encerrando o conjunto quando não restar nenhum canal
+
+        Args:
+            channel (tuple): Conexões do canal com cada processo
+        """
+        for connection in channel:
+            connection.close()
+
+        with self.__lock:
+            self.__open_channels -= 1
+            if self.__open_channels == 0:
+                self.__closed = True
+
+    def close(self):
+        """ Função que encerra os processos de busca
+        """
+        with self.__lock:
+            self.__closed = True
+
+            # Os processos são avisados pela conexão de controle, que não é usada pelas buscas em andamento
+            for control in self.__controls:
+                try:
+                    control.send(None)
+                except OSError:
+                    pass
+
+            controls, self.__controls = self.__controls, []
+
+        for process in self.__processes:
+            process.join(SHARD_JOIN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+
+        for control in controls:
+            control.close()
+
+
+class Sharded_Search:
+    """ Classe responsável pela busca por nome em paralelo, dividindo o catálogo entre processos de busca
+
+    Cada versão base do catálogo possui os seus processos, criados com fork para herdar as colunas sem cópia, e cada
+    processo monta os índices apenas da sua partição. As linhas alteradas por atualizações incrementais ficam em uma
+    partição extra, montada no processo principal, até a próxima recarga.
+
+    Apenas as buscas que percorrem muitos produtos são enviadas aos processos: as aproximadas e as menores que um
+    trigrama. As demais são respondidas pelo índice de trigramas do próprio processo, mais rápido que a comunicação.
+    """
+    def __init__(self, shards:int, channels:int=SHARD_CHANNELS, timeout:float=SHARD_SEARCH_TIMEOUT):
+        """ Função que cria o mecanismo de busca em partições
+
+        Args:
+            shards (int): Quantidade de processos de busca, ou menos de 2 para desabilitar a busca em paralelo
+            channels (int): Quantidade de buscas enviadas ao mesmo tempo aos processos
+            timeout (float): Tempo máximo, em segundos, aguardando os processos antes de buscar no próprio processo
+        """
+        self.__shards = shards
+        self.__channels = channels
+        self.__timeout = timeout
+        self.__pool = None
+        self.__lock = threading.Lock()
+
+        # Os processos herdam o catálogo por fork, disponível apenas em sistemas POSIX
+        if shards > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            self.__context = multiprocessing.get_context('fork')
+        else:
+            self.__context = None
+
+    @property
+    def enabled(self):
+        return self.__context is not None
+
+    def prepare(self, catalog:cat.Catalog):
+        """ Função que prepara a busca em paralelo de uma nova versão do catálogo, antes da sua publicação
+
+        Args:
+            catalog (cat.Catalog): Nova versão do catálogo
+        """
+        if not self.enabled:
+            return
+
+        pool = self.__pool
+        base = catalog.base
+
+        # Versões com atualizações incrementais reaproveitam os processos da versão base
+        if pool is None or pool.catalog is not base:
+            pool = Shard_Pool(base, self.__shards, self.__context, self.__channels, self.__timeout)
+
+            with self.__lock:
+                old, self.__pool = self.__pool, pool
+
+            if old is not None:
+                old.close()
+
+        if catalog.dirty_names:
+            self.dirty_shard(catalog)
+
+    def dirty_shard(self, catalog:cat.Catalog):
+        """ Função que retorna a partição com as linhas alteradas desde a versão base, montada uma vez por versão
+
+        Args:
+            catalog (cat.Catalog): Catálogo de produtos
+
+        Returns:
+            [tuple]: Retorna o catálogo da partição e as linhas originais
+        """
+        return catalog.derived('dirty_shard', lambda: build_shard(catalog, sorted(catalog.dirty_names)))
+
+    def is_heavy(self, query:str, fuzzy:int=0):
+        """ Função que verifica se a busca percorre muitos produtos e compensa ser enviada aos processos de busca
+
+        Args:
+            query (str): Nome ou parte do nome do produto
+            fuzzy (int): Distância de edição tolerada
+
+        Returns:
+            [bool]: Retorna verdadeiro para as buscas aproximadas e as menores que um trigrama
+        """
+        return bool(fuzzy) or len(cat.fold(query)) < srch.TRIGRAM_LENGTH
+
+    def ranked_rows(self, catalog:cat.Catalog, query:str, limit:int=None, fuzzy:int=0):
+        """ Função que busca os produtos em todas as partições em paralelo, dos mais relevantes para os menos relevantes
+
+        Args:
+            catalog (cat.Catalog): Catálogo de produtos
+            query (str): Nome ou parte do nome do produto
+            limit (int): Quantidade máxima de linhas, ou None para todas
+            fuzzy (int): Distância de edição tolerada
+
+        Returns:
+            [list]: Retorna as linhas encontradas, ou None caso a busca em paralelo não esteja disponível para esta versão
+            ou não compense para esta busca
+        """
+        pool = self.__pool
+
+        if pool is None or pool.catalog is not catalog.base or not self.is_heavy(query, fuzzy):
+            return None
+
+        dirty = catalog.dirty_names
+
+        # As linhas alteradas são descartadas das partições, então cada uma retorna a mais para completar o limite
+        shard_limit = None if limit is None else limit + len(dirty)
+
+        try:
+            matches = pool.search(query, shard_limit, fuzzy)
+        except (EOFError, OSError) as error:
+            # Inclui o TimeoutError, e a busca é feita no próprio processo
+            logger.error('A busca em paralelo não está disponível: %s', error)
+            return None
+
+        if dirty:
+            matches = heapq.merge((match for match in matches if match[1] not in dirty),
+                                  shard_matches(self.dirty_shard(catalog), query, limit, fuzzy))
+
+        return [row for rank, row in itertools.islice(matches, limit)]
+
+    def close(self):
+        """ Função que encerra os processos de busca
+        """
+        with self.__lock:
+            pool, self.__pool = self.__pool, None
+
+        if pool is not None:
+            pool.close()
@@ -1,9 +1,23 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 
+import concurrent.futures
+import gc
 import json
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
 import unittest
 from cotabest_api import app
+from benchmarks import generate_catalog as gen
+from libs import carts
+from libs import catalog as cat
+from libs import classes as cls
+from libs import functions as funcs
+from libs import search as srch
+from libs import shards
 from werkzeug.wrappers import response
 
 class FlaskTestCase(unittest.TestCase):
@@ -16,6 +30,96 @@ class FlaskTestCase(unittest.TestCase):
         self.test_app = app.test_client()
 
 
+    def test_api_admin_catalog_delta_200(self):
+        """ Teste da rota /api/admin/catalog_delta que aplica atualizações incrementais no catálogo
+        """
+        app.config['ADMIN_TOKEN'] = 'token'
+        headers = {'X-Admin-Token': 'token'}
+        operations = [
+            {'op': 'upsert', 'product': {'id': 3, 'price': 1.25}},
+            {'op': 'upsert', 'product': {'id': 9, 'name': 'Café torrado', 'price': 12.0, 'minimun': 10, 'amount-per-package': 10, 'max-availability': 500}},
+            {'op': 'delete', 'id': 6}
+        ]
+
+        response = self.test_app.post('/api/admin/catalog_delta', data=json.dumps({'operations': operations}), content_type='application/json', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['products'], 8)
+
+        catalog = funcs.read_catalog()
+        self.assertEqual(catalog.get(3)['price'], 1.25)
+        self.assertEqual(catalog.get(9)['name'], 'Café torrado')
+        self.assertIsNone(catalog.get(6))
+
+        # Recarrega o arquivo, descartando as alterações em memória
+        response = self.test_app.post('/api/admin/reload_catalog', headers=headers)
+        self.assertEqual(json.loads(response.data)['products'], 8)
+        self.assertEqual(funcs.read_catalog().get(3)['price'], 1.0)
+
+
+    def test_api_admin_catalog_delta_400(self):
+        """ Teste da rota /api/admin/catalog_delta quando alguma operação não é válida
+        """
+        app.config['ADMIN_TOKEN'] = 'token'
+        version = funcs.read_catalog().version
+        operations = '{"op": "upsert", "product": {"id": 3, "price": 2.0}}\n{"op": "upsert", "product": {"id": 10, "price": 2.0}}\n'
+
+        response = self.test_app.post('/api/admin/catalog_delta', data=operations, content_type='application/x-ndjson', headers={'X-Admin-Token': 'token'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(funcs.read_catalog().version, version)
+        self.assertEqual(funcs.read_catalog().get(3)['price'], 1.0)
+
+
+    def test_api_admin_reload_catalog_200(self):
+        """ Teste da rota /api/admin/reload_catalog que publica uma nova versão do catálogo
+        """
+        version = funcs.read_catalog().version
+        app.config['ADMIN_TOKEN'] = 'token'
+
+        response = self.test_app.post('/api/admin/reload_catalog', headers={'X-Admin-Token': 'token'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data), {'version': version + 1, 'products': 8})
+        self.assertEqual(funcs.read_catalog().version, version + 1)
+
+
+    def test_api_admin_reload_catalog_403(self):
+        """ Teste da rota /api/admin/reload_catalog quando o token administrativo não é informado
+        """
+        app.config['ADMIN_TOKEN'] = 'token'
+
+        response = self.test_app.post('/api/admin/reload_catalog')
+        self.assertEqual(response.status_code, 403)
+
+        app.config['ADMIN_TOKEN'] = None
+
+        response = self.test_app.post('/api/admin/reload_catalog', headers={'X-Admin-Token': ''})
+        self.assertEqual(response.status_code, 403)
+
+
+    def test_api_admin_search_cache_200(self):
+        """ Teste da rota /api/admin/search_cache quando uma busca repetida é respondida pelo cache
+        """
+        app.config['ADMIN_TOKEN'] = 'token'
+        payload = json.dumps({
+            'name': 'Feijão'
+        })
+
+        first = self.test_app.post('/api/find_products', data=payload, content_type='application/json')
+        before = self.test_app.get('/api/admin/search_cache', headers={'X-Admin-Token': 'token'}).json
+
+        # A mesma busca normalizada (sem maiúsculas e acentos) utiliza a resposta guardada
+        payload = json.dumps({
+            'name': 'FEIJAO'
+        })
+
+        second = self.test_app.post('/api/find_products', data=payload, content_type='application/json')
+        after = self.test_app.get('/api/admin/search_cache', headers={'X-Admin-Token': 'token'}).json
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(after['hits'], before['hits'] + 1)
+        self.assertEqual(after['misses'], before['misses'])
+        self.assertEqual(after['version'], funcs.read_catalog().version)
+
+
     def test_api_list_products_200(self):
         """ Teste da rota /api/list_products que lista os produtos disponíveis
         """
@@ -24,6 +128,112 @@ class FlaskTestCase(unittest.TestCase):
         self.assertIn(response.content_type, 'application/json')
 
 
+    def test_api_list_products_200_pages(self):
+        """ Teste da rota /api/list_products paginada por cursor e com seleção de campos
+        """
+        response = self.test_app.get('/api/list_products?limit=5&fields=id,name,price')
+        data = json.loads(response.data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([product['id'] for product in data['items']], [1, 2, 3, 4, 5])
+        self.assertEqual(data['items'][2], {'id': 3, 'name': 'Refrigerante', 'price': 1.0})
+
+        response = self.test_app.get('/api/list_products?limit=5&fields=id,name,price&cursor=' + data['next_cursor'])
+        data = json.loads(response.data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([product['id'] for product in data['items']], [6, 7, 8])
+        self.assertIsNone(data['next_cursor'])
+
+
+    def test_api_list_products_400_pages(self):
+        """ Teste da rota /api/list_products quando os parâmetros de paginação são passados incorretamente
+        """
+        for query in ('limit=0', 'limit=abc', 'cursor=xablau', 'fields=id,color'):
+            response = self.test_app.get('/api/list_products?' + query)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(response.content_type, 'application/json')
+
+
+    def test_api_list_products_304(self):
+        """ Teste da rota /api/list_products quando o cliente já possui a versão atual do catálogo
+        """
+        response = self.test_app.get('/api/list_products')
+        etag = response.headers['ETag']
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(etag.startswith('W/'))
+        self.assertEqual(len(json.loads(response.data)), 8)
+
+        response = self.test_app.get('/api/list_products', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+
+
+    def test_api_autocomplete_200(self):
+        """ Teste da rota /api/autocomplete quando o prefixo é digitado sem acentos e com o limite de sugestões
+        """
+        response = self.test_app.get('/api/autocomplete?prefix=Rac&limit=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([product['id'] for product in response.json], [1, 2])
+
+        response = self.test_app.get('/api/autocomplete?prefix=para%20g')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([product['name'] for product in response.json], ['Ração para gato'])
+
+
+    def test_api_autocomplete_400(self):
+        """ Teste da rota /api/autocomplete quando o prefixo não é informado ou o limite é inválido
+        """
+        response = self.test_app.get('/api/autocomplete')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.test_app.get('/api/autocomplete?prefix=ra&limit=0')
+        self.assertEqual(response.status_code, 400)
+
+
+    def test_api_filter_products_200(self):
+        """ Teste da rota /api/filter_products quando as faixas de valores são combinadas com a busca por nome
+        """
+        payload = json.dumps({
+            'price': {'max': 10},
+            'minimun': {'min': 10}
+        })
+
+        response = self.test_app.post('/api/filter_products', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([product['id'] for product in response.json], [3, 4, 5, 6, 8])
+
+        payload = json.dumps({
+            'name': 'feijao',
+            'price': {'max': 5},
+            'max-availability': {'min': 10000},
+            'limit': 1
+        })
+
+        response = self.test_app.post('/api/filter_products', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([product['name'] for product in response.json], ['Feijão preto'])
+
+
+    def test_api_filter_products_400(self):
+        """ Teste da rota /api/filter_products quando nenhum filtro é informado ou uma faixa é inválida
+        """
+        response = self.test_app.post('/api/filter_products', data=json.dumps({}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        payload = json.dumps({
+            'price': {'below': 10}
+        })
+
+        response = self.test_app.post('/api/filter_products', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        # O corpo deve ser um objeto JSON
+        for body in ([{'price': {'min': 1}}], 'price', 10):
+            response = self.test_app.post('/api/filter_products', data=json.dumps(body), content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json, {'error': 'O corpo da requisição deve ser um objeto JSON !!!'})
+
+
     def test_api_find_products_200(self):
         """ Teste da rota /api/find_products quando uma palavra possui maiúsculas e o parâmetro name é passado corretamente
         """
@@ -39,6 +249,183 @@ class FlaskTestCase(unittest.TestCase):
         self.assertEqual(response.data, expected_return)
 
 
+    def test_api_find_products_200_accents(self):
+        """ Teste da rota /api/find_products quando a busca é digitada sem os acentos do nome do produto
+        """
+        payload = json.dumps({
+            'name': 'RACAO para'
+        })
+
+        response = self.test_app.post('/api/find_products', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([product['id'] for product in response.json], [1, 2, 7])
+
+
+    def test_api_find_products_200_fuzzy(self):
+        """ Teste da rota /api/find_products quando a busca aproximada tolera erros de digitação no nome
+        """
+        payload = json.dumps({
+            'name': 'refrigernte',
+            'fuzzy': 1
+        })
+
+        response = self.test_app.post('/api/find_products', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([product['id'] for product in response.json], [3])
+
+        payload = json.dumps({
+            'name': 'feijoa pretu',
+            'fuzzy': True
+        })
+
+        response = self.test_app.post('/api/find_products', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([product['name'] for product in response.json], ['Feijão preto'])
+
+
+    def test_api_find_products_200_ranked(self):
+        """ Teste da rota /api/find_products quando os produtos são ordenados pela relevância e limitados pelo parâmetro limit
+        """
+        payload = json.dumps({
+            'name': 'ca',
+            'limit': 3
+        })
+
+        response = self.test_app.post('/api/find_products', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        # Palavras iniciadas pela busca (cachorro e carioca) vêm antes das que apenas a contêm (ração)
+        self.assertEqual([product['id'] for product in response.json], [1, 5, 2])
+
+
+    def test_api_find_products_400_limit(self):
+        """ Teste da rota /api/find_products quando o parâmetro limit não é um número válido
+        """
+        payload = json.dumps({
+            'name': 'ca',
+            'limit': '3'
+        })
+
+        response = self.test_app.post('/api/find_products', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+    def test_api_find_products_400_name(self):
+        """ Teste da rota /api/find_products quando o parâmetro name não é um texto
+        """
+        response = self.test_app.post('/api/find_products', data=json.dumps(['refri']), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        for name in (123, ['refri'], {'name': 'refri'}):
+            payload = json.dumps({
+                'name': name
+            })
+
+            response = self.test_app.post('/api/find_products', data=payload, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json, {'error': 'O parâmetro name deve ser um texto !!!'})
+
+
+    def test_api_find_products_200_terms(self):
+        """ Teste da rota /api/find_products quando o nome é interpretado como palavras, frases entre aspas e o operador OR
+        """
+        payload = json.dumps({
+            'name': 'preto feijao',
+            'terms': True
+        })
+
+        response = self.test_app.post('/api/find_products', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([product['id'] for product in response.json], [4])
+
+        payload = json.dumps({
+            'name': 'ração "para gato" OR "para coelho"',
+            'terms': True
+        })
+
+        response = self.test_app.post('/api/find_products', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([product['id'] for product in response.json], [2, 7])
+
+
+    def test_api_find_products_400_terms(self):
+        """ Teste da rota /api/find_products quando a busca por palavras é combinada com a busca aproximada
+        """
+        payload = json.dumps({
+            'name': 'preto feijao',
+            'terms': True,
+            'fuzzy': 1
+        })
+
+        response = self.test_app.post('/api/find_products', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+    def test_api_find_products_400_fuzzy(self):
+        """ Teste da rota /api/find_products quando o parâmetro fuzzy não é uma distância de edição válida
+        """
+        payload = json.dumps({
+            'name': 'refrigernte',
+            'fuzzy': 3
+        })
+
+        response = self.test_app.post('/api/find_products', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+    def test_api_find_products_batch_200(self):
+        """ Teste da rota /api/find_products_batch que busca vários nomes, repetidos ou não, em uma única requisição
+        """
+        payload = json.dumps({
+            'queries': ['Feijão', 'refri', 'FEIJAO', 'xablau'],
+            'limit': 1
+        })
+
+        response = self.test_app.post('/api/find_products_batch', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([[product['id'] for product in products] for products in response.json], [[4], [3], [4], []])
+
+
+    def test_api_find_products_batch_400(self):
+        """ Teste da rota /api/find_products_batch quando a lista de nomes não é informada corretamente
+        """
+        payload = json.dumps({
+            'queries': 'feijao'
+        })
+
+        response = self.test_app.post('/api/find_products_batch', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        payload = json.dumps({
+            'queries': ['feijao'],
+            'fuzzy': 5
+        })
+
+        response = self.test_app.post('/api/find_products_batch', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        # O corpo deve ser um objeto JSON
+        response = self.test_app.post('/api/find_products_batch', data=json.dumps(['feijao']), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json, {'error': 'O corpo da requisição deve ser um objeto JSON !!!'})
+
+
+    def test_api_find_products_batch_200_cache(self):
+        """ Teste da rota /api/find_products_batch que reaproveita as respostas do cache sem guardar as buscas do lote
+        """
+        self.test_app.post('/api/find_products', data=json.dumps({'name': 'arroz'}), content_type='application/json')
+        entries = funcs.search_cache.stats()['entries']
+
+        payload = json.dumps({
+            'queries': ['arroz', 'lote {0}'.format(id(self)), 'lote 2 {0}'.format(id(self))]
+        })
+
+        response = self.test_app.post('/api/find_products_batch', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json), 3)
+        self.assertEqual(funcs.search_cache.stats()['entries'], entries)
+
+
     def test_api_find_products_400(self):
         """ Teste da rota /api/find_products quando uma palavra possui maiúsculas e o parâmetro name é passado incorretamente
         """
@@ -54,6 +441,114 @@ class FlaskTestCase(unittest.TestCase):
         self.assertEqual(response.data, expected_return)
 
 
+    def test_api_shopping_cart_200_per_customer(self):
+        """ Teste da rota /api/shopping_cart com carrinhos separados para cada cliente, identificados pelo token do carrinho
+        """
+        payload = json.dumps({
+            "id": 3,
+            "quantity": 120
+        })
+
+        response = self.test_app.post('/api/add_shopping_cart', data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        token = response.headers['X-Cart-Token']
+        self.assertIn('cart_token=' + token, response.headers['Set-Cookie'])
+
+        # O mesmo cliente, pelo cookie, continua com o seu carrinho
+        response = self.test_app.get('/api/shopping_cart')
+        self.assertEqual(response.headers['X-Cart-Token'], token)
+        self.assertEqual([item['id'] for item in json.loads(response.data)['items']], [3])
+        self.assertNotIn('Set-Cookie', response.headers)
+
+        # Outro cliente possui um carrinho vazio, que só é criado na inclusão de um produto
+        other_app = app.test_client(use_cookies=False)
+        stored = len(funcs.cart_store)
+        for method, url in (('get', '/api/shopping_cart'), ('get', '/api/checkout'), ('put', '/api/update_shopping_cart'), ('delete', '/api/remove_shopping_cart')):
+            response = getattr(other_app, method)(url, data=json.dumps({"id": 4, "quantity": 120}), content_type='application/json')
+            self.assertNotIn('X-Cart-Token', response.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(funcs.cart_store), stored)
+
+        response = other_app.get('/api/shopping_cart')
+        self.assertEqual(json.loads(response.data), {'items': [], 'total-price': 0})
+
+        response = other_app.post('/api/add_shopping_cart', data=json.dumps({"id": 4, "quantity": 120}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        other_token = response.headers['X-Cart-Token']
+        self.assertNotEqual(other_token, token)
+        self.assertEqual(len(funcs.cart_store), stored + 1)
+
+        # O token pode ser usado pelo cabeçalho
+        response = other_app.get('/api/shopping_cart', headers={'X-Cart-Token': other_token})
+        self.assertEqual(response.headers['X-Cart-Token'], other_token)
+        self.assertEqual([item['id'] for item in json.loads(response.data)['items']], [4])
+
+        response = other_app.get('/api/checkout', headers={'X-Cart-Token': other_token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in json.loads(response.data)['items']], [4])
+
+        # A finalização da compra esvazia apenas o carrinho do cliente
+        response = self.test_app.get('/api/shopping_cart')
+        self.assertEqual([item['id'] for item in json.loads(response.data)['items']], [3])
+
+        # Tokens desconhecidos não são aceitos, e um novo carrinho é criado apenas na inclusão de um produto
+        response = other_app.get('/api/shopping_cart', headers={'X-Cart-Token': 'inexistente'})
+        self.assertNotIn('X-Cart-Token', response.headers)
+        self.assertEqual(json.loads(response.data), {'items': [], 'total-price': 0})
+
+        response = other_app.post('/api/add_shopping_cart', data=json.dumps({"id": 4, "quantity": 120}), content_type='application/json', headers={'X-Cart-Token': 'inexistente'})
+        self.assertNotIn(response.headers['X-Cart-Token'], ('inexistente', token, other_token))
+
+
+    def test_api_shopping_cart_400_not_stored(self):
+        """ Teste da rota /api/add_shopping_cart quando a inclusão é rejeitada, sem guardar o carrinho nem emitir o token
+        """
+        stored = len(funcs.cart_store)
+
+        response = self.test_app.post('/api/add_shopping_cart', data=json.dumps({"id": 3, "quantity": 1}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('X-Cart-Token', response.headers)
+        self.assertNotIn('Set-Cookie', response.headers)
+        self.assertEqual(len(funcs.cart_store), stored)
+
+        # A primeira inclusão aceita guarda o carrinho
+        response = self.test_app.post('/api/add_shopping_cart', data=json.dumps({"id": 3, "quantity": 120}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(response.headers['X-Cart-Token'], funcs.cart_store)
+        self.assertEqual(len(funcs.cart_store), stored + 1)
+
+        response = self.test_app.get('/api/shopping_cart')
+        self.assertEqual([item['id'] for item in json.loads(response.data)['items']], [3])
+
+
+    def test_api_shopping_cart_200_removed(self):
+        """ Teste da rota /api/shopping_cart quando um produto do carrinho deixa de existir no catálogo
+        """
+        app.config['ADMIN_TOKEN'] = 'token'
+        headers = {'X-Admin-Token': 'token'}
+
+        response = self.test_app.post('/api/add_shopping_cart', data=json.dumps({"id": 3, "quantity": 120}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        response = self.test_app.post('/api/add_shopping_cart', data=json.dumps({"id": 6, "quantity": 40}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        try:
+            response = self.test_app.post('/api/admin/catalog_delta', data=json.dumps({'operations': [{'op': 'delete', 'id': 6}]}), content_type='application/json', headers=headers)
+            self.assertEqual(response.status_code, 200)
+
+            # Os ids removidos são informados uma única vez
+            response = self.test_app.get('/api/shopping_cart')
+            data = json.loads(response.data)
+            self.assertEqual([item['id'] for item in data['items']], [3])
+            self.assertEqual(data['removed'], [6])
+
+            response = self.test_app.get('/api/checkout')
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('removed', json.loads(response.data))
+        finally:
+            self.test_app.post('/api/admin/reload_catalog', headers=headers)
+
+
     def test_api_shopping_cart_200(self):
         """ Teste da rota /api/shopping_cart que exibe o carrinho de compras
         """
@@ -294,5 +789,767 @@ class FlaskTestCase(unittest.TestCase):
         self.assertIn(response.content_type, 'application/json')
 
 
+
+class CatalogTestCase(unittest.TestCase):
+    """ Classe responsável pelos testes unitários do catálogo de produtos
+    """
+    def setUp(self):
+        """ Copia o arquivo de produtos para um diretório temporário
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'data.json')
+        shutil.copy('./docs/data.json', self.path)
+
+
+    def tearDown(self):
+        """ Remove o diretório temporário
+        """
+        shutil.rmtree(self.tmp_dir)
+
+
+    def write_products(self, products):
+        """ Reescreve o arquivo de produtos temporário
+        """
+        with open(self.path, 'w') as json_file:
+            json.dump(products, json_file)
+
+
+    def test_catalog_cache_reuses_snapshot(self):
+        """ Teste do cache do catálogo quando o arquivo não foi alterado
+        """
+        cache = cat.Catalog_Cache(self.path)
+        catalog = cache.get()
+
+        self.assertIs(cache.get(), catalog)
+        self.assertEqual(catalog.version, 1)
+        self.assertEqual(len(catalog), 8)
+
+
+    def test_catalog_cache_reloads_changed_file(self):
+        """ Teste do cache do catálogo quando o arquivo é alterado
+        """
+        cache = cat.Catalog_Cache(self.path)
+        catalog = cache.get()
+
+        products = [dict(product) for product in catalog][:2]
+        self.write_products(products)
+        os.utime(self.path, ns=(0, 0))
+
+        # A recarga acontece em segundo plano, sem bloquear quem já possui uma versão
+        self.assertTrue(cache.check(wait=True))
+
+        reloaded = cache.get()
+        self.assertEqual(reloaded.version, 2)
+        self.assertEqual(len(reloaded), 2)
+        self.assertEqual(len(catalog), 8)
+
+
+    def test_catalog_cache_request_reload(self):
+        """ Teste da recarga solicitada por sinal, que apenas marca a solicitação e é iniciada na próxima verificação
+        """
+        cache = cat.Catalog_Cache(self.path, check_interval=3600)
+        cache.get()
+        self.assertFalse(cache.check(wait=True))
+
+        cache.request_reload()
+        self.assertTrue(cache.check(wait=True))
+        self.assertEqual(cache.get().version, 2)
+        self.assertFalse(cache.check(wait=True))
+
+
+    def test_catalog_cache_keeps_snapshot_on_error(self):
+        """ Teste do cache do catálogo quando o arquivo alterado não é um catálogo válido
+        """
+        cache = cat.Catalog_Cache(self.path)
+        catalog = cache.get()
+
+        with open(self.path, 'w') as json_file:
+            json_file.write('[{"id": 1, "name": "Ra')
+        os.utime(self.path, ns=(0, 0))
+
+        with self.assertRaises(cat.CatalogError):
+            cache.reload()
+
+        self.assertIs(cache.get(), catalog)
+        self.assertFalse(cache.check())
+
+
+    def test_catalog_duplicated_id(self):
+        """ Teste do carregamento do catálogo quando existem ids duplicados
+        """
+        cache = cat.Catalog_Cache(self.path)
+        products = [dict(product) for product in cache.get()]
+        self.write_products(products + [products[0]])
+        os.utime(self.path, ns=(0, 0))
+
+        with self.assertRaises(cat.CatalogError):
+            cache.reload()
+
+
+    def test_catalog_get_by_id(self):
+        """ Teste da busca de produtos pelo índice de ids do catálogo
+        """
+        catalog = cat.Catalog_Cache(self.path).get()
+
+        self.assertEqual(catalog.get(3)['name'], 'Refrigerante')
+        self.assertIsNone(catalog.get(10))
+        self.assertIsNone(catalog.get([3]))
+        self.assertEqual(catalog.get(3.0)['id'], 3)
+
+
+    def test_catalog_columns(self):
+        """ Teste do armazenamento do catálogo em colunas tipadas
+        """
+        catalog = cat.Catalog_Cache(self.path).get()
+
+        self.assertEqual(catalog.column('price').typecode, 'd')
+        self.assertEqual(list(catalog.column('minimun')), [10, 2, 120, 24, 24, 40, 40, 200])
+        self.assertEqual(catalog.column('name')[7], 'Pão de forma')
+        self.assertEqual(dict(catalog[2]), {'id': 3, 'name': 'Refrigerante', 'price': 1.0, 'minimun': 120, 'amount-per-package': 12, 'max-availability': 150000})
+
+
+    def test_catalog_invalid_field(self):
+        """ Teste do carregamento do catálogo quando um produto possui um campo inválido
+        """
+        cache = cat.Catalog_Cache(self.path)
+        products = [dict(product) for product in cache.get()]
+        products[0]['price'] = '50,00'
+        self.write_products(products)
+        os.utime(self.path, ns=(0, 0))
+
+        with self.assertRaises(cat.CatalogError):
+            cache.reload()
+
+
+    def test_catalog_streaming_loader(self):
+        """ Teste do carregador incremental lendo o arquivo em blocos pequenos
+        """
+        with open(self.path, 'rb') as json_file:
+            products = list(cat.iter_json_array(json_file, chunk_size=7))
+
+        with open(self.path) as json_file:
+            self.assertEqual(products, json.load(json_file))
+
+
+    def test_catalog_streaming_loader_invalid(self):
+        """ Teste do carregador incremental quando o arquivo não é um array JSON válido
+        """
+        for content in ('{"id": 1}', '[{"id": 1},]', '[{"id": 1}', '[{"id": 1}] []'):
+            with open(self.path, 'w') as json_file:
+                json_file.write(content)
+
+            with self.assertRaises(cat.CatalogError):
+                cat.load_catalog(self.path, 1)
+
+        # Um elemento inválido no início do arquivo é rejeitado sem ler o restante do arquivo
+        with open(self.path, 'w') as json_file:
+            json_file.write('[{"id": 1, "name": xablau},' + ',\n'.join(['{"id": 2, "name": "Refrigerante"}'] * 20000) + ']')
+
+        with open(self.path, 'rb') as json_file:
+            with self.assertRaises(cat.CatalogError):
+                list(cat.iter_json_array(json_file, chunk_size=1024))
+            self.assertLess(json_file.tell(), 4096)
+
+
+    def test_catalog_snapshot(self):
+        """ Teste do snapshot binário compilado e mapeado em memória
+        """
+        snapshot_path = os.path.join(self.tmp_dir, 'data.catalog')
+        catalog = cat.compile_catalog(self.path, snapshot_path)
+        snapshot = cat.Catalog_Cache(snapshot_path).get()
+
+        self.assertEqual([dict(product) for product in snapshot], [dict(product) for product in catalog])
+        self.assertEqual(snapshot.fingerprint, catalog.fingerprint)
+        self.assertEqual(snapshot.get(8)['name'], 'Pão de forma')
+        self.assertEqual([product['id'] for product in snapshot.products_after(6, 10)], [7, 8])
+
+
+    def test_catalog_snapshot_truncated(self):
+        """ Teste do carregamento de um snapshot binário incompleto
+        """
+        snapshot_path = os.path.join(self.tmp_dir, 'data.catalog')
+        cat.compile_catalog(self.path, snapshot_path)
+
+        with open(snapshot_path, 'r+b') as snapshot_file:
+            snapshot_file.truncate(100)
+
+        with self.assertRaises(cat.CatalogError):
+            cat.load_catalog(snapshot_path, 1)
+
+
+    def test_catalog_delta(self):
+        """ Teste das atualizações incrementais do catálogo, que geram uma nova versão sem alterar a anterior
+        """
+        catalog = cat.Catalog_Cache(self.path).get()
+        operations = [
+            {'op': 'upsert', 'product': {'id': 4, 'name': 'Feijão preto 1kg'}},
+            {'op': 'upsert', 'product': {'id': 0, 'name': 'Açúcar', 'price': 3.5, 'minimun': 10, 'amount-per-package': 10, 'max-availability': 100}},
+            {'op': 'delete', 'id': 2}
+        ]
+        updated = catalog.apply_delta(operations, 2)
+
+        self.assertEqual(updated.version, 2)
+        self.assertEqual(len(updated), 8)
+        self.assertEqual(updated.get(4)['name'], 'Feijão preto 1kg')
+        self.assertEqual(updated.get(4)['price'], 4.0)
+        self.assertIsNone(updated.get(2))
+        self.assertEqual([product['id'] for product in updated.products_after(None, 3)], [0, 1, 3])
+        self.assertNotEqual(updated.fingerprint, catalog.fingerprint)
+
+        self.assertEqual(catalog.get(4)['name'], 'Feijão preto')
+        self.assertEqual(catalog.get(2)['id'], 2)
+        self.assertIsNone(catalog.get(0))
+
+        compacted = updated.compact()
+        self.assertEqual([dict(product) for product in compacted], [dict(product) for product in updated])
+        self.assertEqual(compacted.dirty_rows, frozenset())
+
+
+    def test_catalog_delta_file(self):
+        """ Teste do arquivo de atualizações compartilhado pelos processos, aplicado em cada carga do catálogo
+        """
+        delta_path = os.path.join(self.tmp_dir, 'delta.jsonl')
+        worker_1 = cat.Catalog_Cache(self.path, delta_path=delta_path)
+        worker_2 = cat.Catalog_Cache(self.path, delta_path=delta_path)
+        self.assertEqual(worker_2.get().get(3)['price'], 1.0)
+
+        worker_1.apply_delta([{'op': 'upsert', 'product': {'id': 3, 'price': 1.25}}])
+        self.assertEqual(worker_1.get().get(3)['price'], 1.25)
+
+        # O outro processo aplica apenas as novas operações do arquivo
+        self.assertTrue(worker_2.check(wait=True))
+        self.assertEqual(worker_2.get().get(3)['price'], 1.25)
+        self.assertFalse(worker_2.check(wait=True))
+
+        # Operações inválidas não são gravadas no arquivo
+        with self.assertRaises(cat.CatalogError):
+            worker_2.apply_delta([{'op': 'upsert', 'product': {'id': 99, 'price': 1.0}}])
+
+        worker_2.apply_delta([{'op': 'delete', 'id': 6}])
+        self.assertTrue(worker_1.check(wait=True))
+        self.assertIsNone(worker_1.get().get(6))
+
+        # Uma linha ainda sendo gravada é aplicada apenas quando estiver completa
+        with open(delta_path, 'a') as delta_file:
+            delta_file.write('{"op": "delete", "id": 5}')
+        worker_1.check(wait=True)
+        self.assertIsNotNone(worker_1.get().get(5))
+
+        with open(delta_path, 'a') as delta_file:
+            delta_file.write('\n')
+        self.assertTrue(worker_1.check(wait=True))
+        self.assertIsNone(worker_1.get().get(5))
+
+        # As atualizações sobrevivem à recarga do arquivo de produtos
+        os.utime(self.path, ns=(0, 0))
+        self.assertTrue(worker_1.check(wait=True))
+        reloaded = worker_1.get()
+        self.assertEqual(reloaded.get(3)['price'], 1.25)
+        self.assertIsNone(reloaded.get(6))
+        self.assertEqual(worker_1.reload().get(3)['price'], 1.25)
+
+        # Removido o arquivo de atualizações, o catálogo volta ao arquivo de produtos
+        os.remove(delta_path)
+        self.assertTrue(worker_2.check(wait=True))
+        self.assertEqual(worker_2.get().get(3)['price'], 1.0)
+        self.assertIsNotNone(worker_2.get().get(6))
+
+
+    def test_generate_catalog(self):
+        """ Teste do gerador de catálogos sintéticos usado nos benchmarks
+        """
+        gen.generate_catalog(self.path, 500, seed=7)
+        with open(self.path, 'rb') as json_file:
+            content = json_file.read()
+
+        gen.generate_catalog(self.path, 500, seed=7)
+        with open(self.path, 'rb') as json_file:
+            self.assertEqual(json_file.read(), content)
+
+        catalog = cat.load_catalog(self.path, 1)
+        self.assertEqual(len(catalog), 500)
+        self.assertTrue(all(product['minimun'] % product['amount-per-package'] == 0 for product in catalog))
+
+
+    def test_search_folded_keys(self):
+        """ Teste das chaves de busca sem maiúsculas e acentos, calculadas na carga e mantidas no snapshot e nas atualizações
+        """
+        self.assertEqual(cat.fold('Ração para Cachorro'), 'racao para cachorro')
+        self.assertEqual(cat.fold('PÃO DE FORMA'), 'pao de forma')
+
+        catalog = cat.load_catalog(self.path, 1)
+        self.assertEqual(catalog.column('search_key')[0], 'racao para cachorro')
+        self.assertNotIn('search_key', catalog[0])
+
+        snapshot_path = os.path.join(self.tmp_dir, 'data.catalog')
+        cat.compile_catalog(self.path, snapshot_path)
+        snapshot = cat.load_catalog(snapshot_path, 2)
+        self.assertEqual(list(snapshot.column('search_key')), list(catalog.column('search_key')))
+
+        catalog = catalog.apply_delta([{'op': 'upsert', 'product': {'id': 3, 'name': 'Refrigerante Limão'}}], 3)
+        self.assertEqual(catalog.column('search_key')[2], 'refrigerante limao')
+        self.assertEqual(srch.search_rows(catalog, 'limao'), [2])
+
+
+    def test_search_filters(self):
+        """ Teste dos filtros por faixas de valores pelos índices secundários, comparados com a verificação de todas as linhas
+        """
+        gen.generate_catalog(self.path, 2000, seed=3)
+        catalog = cat.load_catalog(self.path, 1)
+        catalog = catalog.apply_delta([{'op': 'upsert', 'product': {'id': 10, 'price': 1.5, 'minimun': 1}}, {'op': 'delete', 'id': 11}], 2)
+        keys = catalog.column('search_key')
+
+        cases = [
+            ({'price': (None, 5), 'minimun': (None, 24), 'max-availability': (1000, None)}, None),
+            ({'price': (10, 20)}, 'racao'),
+            ({'amount-per-package': (12, 12)}, 'xablau'),
+            ({'price': (5, 1)}, None),
+            ({}, 'feij')
+        ]
+
+        for ranges, name in cases:
+            expected = [row for row in catalog.rows() if (name is None or cat.fold(name) in keys[row]) and
+                        all((lo is None or lo <= catalog.value(row, field)) and (hi is None or catalog.value(row, field) <= hi) for field, (lo, hi) in ranges.items())]
+            self.assertEqual(srch.filter_rows(catalog, ranges, name), expected)
+            self.assertEqual(srch.filter_rows(catalog, ranges, name, 3), expected[:3])
+
+
+    def test_search_fuzzy(self):
+        """ Teste da busca aproximada, com as palavras novas de cada versão do catálogo adicionadas ao índice de remoções
+        """
+        catalog = cat.load_catalog(self.path, 1)
+        self.assertEqual(srch.edit_distance('refrigerante', 'refrigernte', 2), 1)
+        self.assertEqual(srch.edit_distance('feijao', 'fiejao', 2), 1)
+        self.assertEqual(srch.fuzzy_rows(catalog, 'refrigernte', 1), [2])
+        self.assertEqual(srch.fuzzy_rows(catalog, 'racao para gtao', 1), [6])
+        self.assertEqual(srch.fuzzy_rows(catalog, 'pao', 2), [7])
+
+        # Produtos alterados por atualizações incrementais são verificados diretamente
+        delta = catalog.apply_delta([{'op': 'upsert', 'product': {'id': 3, 'name': 'Biscoito recheado'}}], 2)
+        self.assertEqual(srch.fuzzy_rows(delta, 'biscoto', 1), [2])
+        self.assertEqual(srch.fuzzy_rows(delta, 'refrigernte', 1), [])
+
+        # Uma nova versão completa adiciona apenas as suas palavras novas ao índice compartilhado
+        self.write_products([{'id': 1, 'name': 'Chocolate amargo', 'price': 5.0, 'minimun': 1, 'amount-per-package': 1, 'max-availability': 10}])
+        reloaded = cat.load_catalog(self.path, 3)
+        self.assertIs(srch.deletion_index(reloaded), srch.deletion_index(catalog))
+        self.assertEqual(srch.fuzzy_rows(reloaded, 'chocolte amrgo', 1), [0])
+        self.assertEqual(srch.fuzzy_rows(reloaded, 'refrigernte', 1), [])
+
+
+    def test_search_fuzzy_dirty_rows(self):
+        """ Teste da busca aproximada com o mesmo resultado antes e depois de uma atualização incremental que não altera
+        o nome, inclusive para as palavras curtas, encontradas apenas sem erros de digitação
+        """
+        builder = cat.Catalog_Builder()
+        for id, name in enumerate(('Pão São Jorge', 'Pão São Jorge', 'Sabor Real'), 1):
+            builder.add({'id': id, 'name': name, 'price': 1.0, 'minimun': 1, 'amount-per-package': 1, 'max-availability': 10})
+
+        catalog = builder.build(1)
+        delta = catalog.apply_delta([{'op': 'upsert', 'product': {'id': 2, 'name': 'Pão São Jorge'}}], 2)
+        self.assertEqual(srch.fuzzy_rows(catalog, 'saor', 1), [2])
+        self.assertEqual(srch.fuzzy_rows(delta, 'saor', 1), [2])
+        self.assertEqual(srch.fuzzy_rows(delta, 'sao', 1), [0, 1])
+
+        gen.generate_catalog(self.path, 2000, seed=3)
+        catalog = cat.load_catalog(self.path, 1)
+        delta = catalog.apply_delta([{'op': 'upsert', 'product': {'id': id, 'name': catalog.get(id)['name']}} for id in range(1, 2001, 3)], 2)
+
+        for query, distance in (('sabo', 1), ('saor', 1), ('refrigernte', 2), ('cafe organco', 1), ('de', 1)):
+            self.assertEqual(srch.fuzzy_rows(delta, query, distance), srch.fuzzy_rows(catalog, query, distance))
+
+
+    def test_search_deletion_index_retire(self):
+        """ Teste da retirada do índice de remoções das palavras que não estão mais em nenhuma versão em uso
+        """
+        index = srch.Deletion_Index()
+        self.write_products([{'id': 1, 'name': 'Xilofone infantil', 'price': 5.0, 'minimun': 1, 'amount-per-package': 1, 'max-availability': 10}])
+        first = cat.load_catalog(self.path, 1)
+        index.track(first, ['xilofone', 'infantil'])
+        second = cat.load_catalog(self.path, 2)
+        index.track(second, ['infantil', 'pandeiro'])
+        self.assertEqual(index.similar('xilofne', 1), {'xilofone'})
+
+        # A palavra de uma versão descartada sai do índice, e a compartilhada com uma versão em uso é mantida
+        del first
+        gc.collect()
+        index.add([])
+        self.assertNotIn('xilofone', index)
+        self.assertEqual(index.similar('xilofne', 1), set())
+        self.assertEqual(index.similar('infantl', 1), {'infantil'})
+
+        del second
+        gc.collect()
+        index.add([])
+        self.assertEqual(len(index), 0)
+
+
+    def test_search_query_cache(self):
+        """ Teste do cache LRU das respostas da busca, limitado em tamanho e invalidado por uma nova versão do catálogo
+        """
+        cache = srch.Query_Cache(2)
+        cache.put(1, 'a', b'1')
+        cache.put(1, 'b', b'2')
+        self.assertEqual(cache.get(1, 'a'), b'1')
+
+        # A resposta usada menos recentemente é removida
+        cache.put(1, 'c', b'3')
+        self.assertIsNone(cache.get(1, 'b'))
+        self.assertEqual(cache.get(1, 'c'), b'3')
+
+        # Respostas de outra versão do catálogo não são retornadas, e uma versão nova limpa o cache
+        self.assertIsNone(cache.get(2, 'a'))
+        cache.put(2, 'd', b'4')
+        cache.put(1, 'e', b'5')
+        self.assertIsNone(cache.get(2, 'a'))
+        self.assertIsNone(cache.get(2, 'e'))
+        self.assertEqual(cache.stats(), {'version': 2, 'entries': 1, 'max_entries': 2, 'hits': 2, 'misses': 4})
+
+
+    def test_search_ranked(self):
+        """ Teste da relevância dos resultados da busca: nome igual, iniciado, com palavra iniciada e contendo a busca
+        """
+        self.assertEqual(srch.match_rank('refrigerante', 'refrigerante'), srch.RANK_EXACT)
+        self.assertEqual(srch.match_rank('racao para gato', 'racao'), srch.RANK_PREFIX)
+        self.assertEqual(srch.match_rank('racao para gato', 'gat'), srch.RANK_WORD)
+        self.assertEqual(srch.match_rank('racao para gato', 'ato'), srch.RANK_SUBSTRING)
+        self.assertIsNone(srch.match_rank('racao para gato', 'cachorro'))
+
+        self.write_products([
+            {'id': 1, 'name': 'Suco de uva', 'price': 5.0, 'minimun': 1, 'amount-per-package': 1, 'max-availability': 10},
+            {'id': 2, 'name': 'Uvas passas', 'price': 5.0, 'minimun': 1, 'amount-per-package': 1, 'max-availability': 10},
+            {'id': 3, 'name': 'Uva', 'price': 5.0, 'minimun': 1, 'amount-per-package': 1, 'max-availability': 10},
+            {'id': 4, 'name': 'Chuva de granulado', 'price': 5.0, 'minimun': 1, 'amount-per-package': 1, 'max-availability': 10}
+        ])
+        catalog = cat.load_catalog(self.path, 1)
+
+        self.assertEqual(srch.ranked_rows(catalog, 'UVA'), [2, 1, 0, 3])
+        self.assertEqual(srch.ranked_rows(catalog, 'uva', 2), [2, 1])
+        self.assertEqual(srch.ranked_rows(catalog, 'uvaas', 10, 1), [1])
+
+
+    def test_search_prefix_index(self):
+        """ Teste do autocompletar pelo índice de prefixos, comparado com a verificação de todas as chaves do catálogo
+        """
+        gen.generate_catalog(self.path, 2000, seed=3)
+        catalog = cat.load_catalog(self.path, 1)
+        catalog = catalog.apply_delta([{'op': 'upsert', 'product': {'id': 10, 'name': 'Ração Aaa'}}, {'op': 'delete', 'id': 11}], 2)
+        keys = catalog.column('search_key')
+
+        for prefix in ('r', 'RAÇ', 'aa', 'racao para c', 'de uva', 'sem x', ' ', 'com gas 1', 'suco de u', 'racao para cachorro s', 'de'):
+            tokens = srch.words(cat.fold(prefix))
+            matches = sorted((srch.prefix_match(keys[row], tokens), row) for row in catalog.rows() if tokens and srch.prefix_match(keys[row], tokens))
+            for limit in (10, 2000):
+                self.assertEqual(srch.autocomplete_rows(catalog, prefix, limit), [row for word, row in matches[:limit]])
+
+        # A pontuação não faz parte das palavras, nem no índice nem no texto digitado
+        builder = cat.Catalog_Builder()
+        for id, name in enumerate(['Feijão, preto (1kg)', 'Arroz-agulha 5kg', 'Feijão carioca 1kg', 'Doce de leite e de coco', 'Doce de coco'], 1):
+            builder.add({'id': id, 'name': name, 'price': 1.0, 'minimun': 1, 'amount-per-package': 1, 'max-availability': 10})
+        catalog = builder.build(1)
+
+        self.assertEqual(srch.words(cat.fold('Feijão, preto (1kg)')), ['feijao', 'preto', '1kg'])
+        self.assertEqual(srch.autocomplete_rows(catalog, '1kg', 10), [0, 2])
+        self.assertEqual(srch.autocomplete_rows(catalog, 'feijao, pre', 10), [0])
+        self.assertEqual(srch.autocomplete_rows(catalog, 'agul', 10), [1])
+        self.assertEqual(srch.autocomplete_rows(catalog, 'arroz agulha 5', 10), [1])
+
+        # Os pares de palavras vizinhas existem em posições diferentes, mas não em sequência
+        self.assertEqual(srch.autocomplete_rows(catalog, 'doce de leite', 10), [3])
+        self.assertEqual(srch.autocomplete_rows(catalog, 'doce de c', 10), [4])
+        self.assertEqual(srch.autocomplete_rows(catalog, 'leite e de c', 10), [3])
+
+
+    def test_search_shards(self):
+        """ Teste da busca em paralelo nos processos de busca, comparada com a busca no próprio processo
+        """
+        engine = shards.Sharded_Search(3)
+        if not engine.enabled:
+            self.skipTest('A busca em paralelo depende do fork')
+
+        gen.generate_catalog(self.path, 2000, seed=3)
+        catalog = cat.load_catalog(self.path, 1)
+        delta = catalog.apply_delta([{'op': 'upsert', 'product': {'id': 10, 'name': 'Ração Aaa'}}, {'op': 'delete', 'id': 11}], 2)
+
+        try:
+            engine.prepare(catalog)
+            engine.prepare(delta)
+
+            for query, limit, fuzzy in (('a', 10, 0), ('aa', None, 0), ('refrigernte', 20, 1), ('racao', 5, 2), ('xablau', 10, 1)):
+                self.assertEqual(engine.ranked_rows(catalog, query, limit, fuzzy), srch.ranked_rows(catalog, query, limit, fuzzy))
+                self.assertEqual(engine.ranked_rows(delta, query, limit, fuzzy), srch.ranked_rows(delta, query, limit, fuzzy))
+
+            # As buscas pelo índice de trigramas são feitas no próprio processo
+            self.assertIsNone(engine.ranked_rows(catalog, 'racao', 10))
+
+            # Buscas simultâneas utilizam canais diferentes, sem misturar as respostas
+            queries = [('a', 10, 0), ('e', 10, 0), ('refrigernte', 20, 1), ('cafe', 20, 1)] * 4
+            with concurrent.futures.ThreadPoolExecutor(8) as executor:
+                results = list(executor.map(lambda args: engine.ranked_rows(catalog, *args), queries))
+            self.assertEqual(results, [srch.ranked_rows(catalog, *args) for args in queries])
+        finally:
+            engine.close()
+
+        # Sem os processos a busca deve ser feita no próprio processo
+        self.assertIsNone(engine.ranked_rows(catalog, 'a', 10))
+
+
+    def test_search_shards_timeout(self):
+        """ Teste da busca em paralelo quando um processo de busca não responde dentro do tempo máximo
+        """
+        engine = shards.Sharded_Search(2, channels=2, timeout=0.2)
+        if not engine.enabled:
+            self.skipTest('A busca em paralelo depende do fork')
+
+        gen.generate_catalog(self.path, 200, seed=3)
+        catalog = cat.load_catalog(self.path, 1)
+
+        try:
+            engine.prepare(catalog)
+            process = next(child for child in multiprocessing.active_children() if child.name == 'catalog-shard')
+
+            # O canal sem resposta é descartado e a busca deve ser feita no próprio processo
+            os.kill(process.pid, signal.SIGSTOP)
+            try:
+                self.assertIsNone(engine.ranked_rows(catalog, 'a', 10))
+            finally:
+                os.kill(process.pid, signal.SIGCONT)
+
+            # O canal restante continua respondendo
+            self.assertEqual(engine.ranked_rows(catalog, 'a', 10), srch.ranked_rows(catalog, 'a', 10))
+        finally:
+            engine.close()
+
+
+    def test_search_terms(self):
+        """ Teste da busca por palavras pelo índice de palavras, comparada com a verificação de todas as chaves do catálogo
+        """
+        self.assertEqual(srch.parse_terms('Ração "para GATO" OR cachorro 15kg'), ((('racao',),), (('cachorro',), ('para', 'gato')), (('15kg',),)))
+        self.assertEqual(srch.gallop([1, 3, 5, 7, 9, 11, 13], 10, 1), 5)
+        self.assertEqual(srch.intersect([[1, 3, 5, 7, 9], [2, 3, 9, 10], [0, 3, 4, 9]]), [3, 9])
+
+        gen.generate_catalog(self.path, 2000, seed=3)
+        catalog = cat.load_catalog(self.path, 1)
+        catalog = catalog.apply_delta([{'op': 'upsert', 'product': {'id': 10, 'name': 'Ração 15kg Xablau'}}, {'op': 'delete', 'id': 11}], 2)
+        keys = catalog.column('search_key')
+
+        for query in ('racao 15kg', '"de uva" suco', 'cafe OR cha organico', '"feijao preto" OR xablau', 'inexistente', 'OR'):
+            groups = srch.parse_terms(query)
+            expected = [row for row in catalog.rows() if groups and srch.terms_match(keys[row], groups)]
+            self.assertEqual(srch.terms_rows(catalog, query), expected)
+
+        # A pontuação é ignorada nas palavras e nas frases, como no índice de palavras
+        builder = cat.Catalog_Builder()
+        for id, name in enumerate(['Feijão, preto (1kg)', 'Arroz-agulha 5kg', 'Feijão carioca 1kg', 'Doce de leite e de coco', 'Doce de coco'], 1):
+            builder.add({'id': id, 'name': name, 'price': 1.0, 'minimun': 1, 'amount-per-package': 1, 'max-availability': 10})
+        catalog = builder.build(1)
+
+        self.assertEqual(srch.terms_rows(catalog, 'feijao preto'), [0])
+        self.assertEqual(srch.terms_rows(catalog, '"feijao preto"'), [0])
+        self.assertEqual(srch.terms_rows(catalog, '1kg feijao'), [0, 2])
+        self.assertEqual(srch.terms_rows(catalog, 'arroz-agulha OR carioca'), [1, 2])
+
+
+    def test_search_trigram_index(self):
+        """ Teste da busca por parte do nome pelo índice de trigramas, comparada com a varredura do catálogo
+        """
+        gen.generate_catalog(self.path, 2000, seed=3)
+        catalog = cat.load_catalog(self.path, 1)
+        catalog = catalog.apply_delta([{'op': 'upsert', 'product': {'id': 10, 'name': 'Refrigerante Xablau 2L'}}, {'op': 'delete', 'id': 11}], 2)
+
+        for query in ('Refri', 'xablau', 'de uva Da', 'ã', 'feijao', 'AGUA MINERAL', 'sêni', '5kg', 'inexistente'):
+            expected = [row for row in catalog.rows() if cat.fold(query) in cat.fold(catalog[row]['name'])]
+            self.assertEqual(srch.search_rows(catalog, query), expected)
+
+
+
+class ShoppingCartTestCase(unittest.TestCase):
+    """ Classe responsável pelos testes unitários do carrinho de compras
+    """
+    def build_catalog(self, size:int, price:float, minimun:int, amount_per_package:int, max_availability:int, version:int=1):
+        """ Monta um catálogo em memória com produtos de mesmas regras de venda
+        """
+        builder = cat.Catalog_Builder()
+
+        for id in range(1, size + 1):
+            builder.add({'id': id, 'name': 'Produto {0}'.format(id), 'price': price, 'minimun': minimun,
+                         'amount-per-package': amount_per_package, 'max-availability': max_availability})
+
+        return builder.build(version)
+
+
+    def item(self, catalog, id:int, quantity:int):
+        """ Cria o item do carrinho a partir do produto do catálogo, como nas rotas do carrinho
+        """
+        return cls.Item.from_product(catalog, catalog.get(id), quantity)
+
+
+    def test_shopping_cart_keyed_items(self):
+        """ Teste do carrinho indexado pelo id do produto, mantendo a ordem de inserção e os erros de validação
+        """
+        catalog = self.build_catalog(2000, 1.5, 5, 5, 100)
+        shopping_cart = cls.Shopping_Cart()
+
+        for id in range(1, 2001):
+            self.assertTrue(shopping_cart.add_to_shopping_cart(self.item(catalog, id, 10)))
+
+        self.assertEqual([item.id for item in shopping_cart.items], list(range(1, 2001)))
+        self.assertEqual(shopping_cart.add_to_shopping_cart(self.item(catalog, 7, 3)), ['in_shopping_cart', 'verify_minimun', {'verify_amount_per_package': (3, 0, 2)}])
+
+        self.assertTrue(shopping_cart.update_to_shopping_cart(self.item(catalog, 7, 20)))
+        self.assertEqual(shopping_cart.in_shopping_cart(self.item(catalog, 7, 0)).quantity, 20)
+
+        self.assertTrue(shopping_cart.remove_from_shopping_cart(self.item(catalog, 1, 0)))
+        self.assertEqual(shopping_cart.remove_from_shopping_cart(self.item(catalog, 1, 0)), ['not_in_shopping_cart'])
+        self.assertEqual(shopping_cart.update_to_shopping_cart(self.item(catalog, 1, 10)), ['not_in_shopping_cart'])
+
+        # O item adicionado novamente vai para o final do carrinho
+        self.assertTrue(shopping_cart.add_to_shopping_cart(self.item(catalog, 1, 10)))
+        self.assertEqual([item.id for item in shopping_cart.items][-2:], [2000, 1])
+        self.assertEqual(len(shopping_cart.items), 2000)
+
+
+    def test_shopping_cart_store(self):
+        """ Teste do repositório de carrinhos, com o descarte dos menos usados recentemente e dos carrinhos sem acesso
+        """
+        now = [0.0]
+        store = carts.Cart_Store(3, 60, clock=lambda: now[0])
+
+        tokens = []
+        for _ in range(3):
+            with store.open() as (token, shopping_cart):
+                tokens.append(token)
+
+        self.assertEqual(len(set(tokens)), 3)
+
+        # O acesso ao primeiro carrinho o torna o mais recente, e o segundo é descartado ao atingir o limite
+        with store.open(tokens[0]) as (token, shopping_cart):
+            self.assertEqual(token, tokens[0])
+
+        with store.open() as (token, shopping_cart):
+            tokens.append(token)
+
+        self.assertEqual(len(store), 3)
+        self.assertNotIn(tokens[1], store)
+        self.assertIn(tokens[0], store)
+
+        # Os carrinhos sem acesso pelo tempo máximo são descartados
+        now[0] = 30.0
+        with store.open(tokens[3]) as (token, shopping_cart):
+            self.assertEqual(token, tokens[3])
+
+        now[0] = 61.0
+        with store.open(tokens[0]) as (token, shopping_cart):
+            self.assertNotEqual(token, tokens[0])
+
+        self.assertEqual(len(store), 2)
+        self.assertIn(tokens[3], store)
+
+        store.discard(tokens[3])
+        self.assertNotIn(tokens[3], store)
+
+        # Sem a criação, um token desconhecido recebe um carrinho vazio que não é guardado
+        with store.open('inexistente', create=False) as (token, shopping_cart):
+            self.assertIsNone(token)
+            self.assertEqual(shopping_cart.items, [])
+
+        self.assertEqual(len(store), 1)
+
+        # Um carrinho ainda não guardado recebe um novo token
+        shopping_cart = cls.Shopping_Cart()
+        token = store.store(shopping_cart)
+        with store.open(token) as (opened, opened_cart):
+            self.assertEqual(opened, token)
+            self.assertIs(opened_cart, shopping_cart)
+
+
+    def test_shopping_cart_flyweight_item(self):
+        """ Teste do item do carrinho que referencia o produto do catálogo, sem __dict__ e sem cópia dos seus atributos
+        """
+        catalog = self.build_catalog(3, 10.99, 5, 5, 100)
+        item = self.item(catalog, 2, 10)
+        self.assertFalse(hasattr(item, '__dict__'))
+
+        with self.assertRaises(AttributeError):
+            item.name = 'Produto 9'
+
+        item.quantity = 20
+        self.assertIs(item.catalog, catalog)
+        self.assertEqual((item.id, item.name, item.price, item.price_cents, item.minimun, item.amount_per_package, item.max_availability, item.quantity),
+                         (2, 'Produto 2', cls.to_money('10.99'), 1099, 5, 5, 100, 20))
+
+
+    def test_shopping_cart_reprice(self):
+        """ Teste do carrinho fixado na versão do catálogo usada nos seus preços, atualizado quando uma nova versão é publicada
+        """
+        catalog = self.build_catalog(3, 2.5, 1, 1, 100)
+        shopping_cart = cls.Shopping_Cart()
+
+        for id in (3, 1, 2):
+            shopping_cart.add_to_shopping_cart(self.item(catalog, id, 10))
+
+        self.assertIs(shopping_cart.catalog, catalog)
+        self.assertEqual(shopping_cart.total_cents, 7500)
+
+        delta = catalog.apply_delta([{'op': 'upsert', 'product': {'id': 1, 'price': 4.0}}, {'op': 'delete', 'id': 2}], 2)
+
+        # Os preços do carrinho não mudam até que ele seja fixado na nova versão
+        self.assertEqual(shopping_cart.total_cents, 7500)
+        self.assertEqual(shopping_cart.reprice(delta), [2])
+        self.assertEqual(shopping_cart.reprice(delta), [])
+        self.assertIs(shopping_cart.catalog, delta)
+        self.assertEqual([(item.id, item.price_cents) for item in shopping_cart.items], [(3, 250), (1, 400)])
+        self.assertEqual(shopping_cart.total_cents, 6500)
+
+        # Um item encontrado em outra versão do catálogo também fixa o carrinho nesta versão
+        newer = delta.apply_delta([{'op': 'upsert', 'product': {'id': 3, 'price': 1.0}}], 3)
+        shopping_cart.update_to_shopping_cart(self.item(newer, 3, 20))
+        self.assertIs(shopping_cart.catalog, newer)
+        self.assertEqual(shopping_cart.total_cents, 6000)
+        self.assertEqual(shopping_cart.take_removed(), [2])
+        self.assertEqual(shopping_cart.take_removed(), [])
+
+        # Um item encontrado em uma versão anterior não volta o carrinho, e é usado com os preços da versão fixada
+        self.assertEqual(shopping_cart.reprice(catalog), [])
+        self.assertIs(shopping_cart.catalog, newer)
+        self.assertTrue(shopping_cart.add_to_shopping_cart(self.item(catalog, 1, 10)) == ['in_shopping_cart'])
+        self.assertTrue(shopping_cart.update_to_shopping_cart(self.item(delta, 1, 5)))
+        self.assertIs(shopping_cart.catalog, newer)
+        self.assertEqual([(item.id, item.price_cents, item.quantity) for item in shopping_cart.items], [(3, 100, 20), (1, 400, 5)])
+        self.assertEqual(shopping_cart.total_cents, 4000)
+
+        # Um produto que não existe mais na versão fixada não é adicionado
+        self.assertEqual(shopping_cart.add_to_shopping_cart(self.item(catalog, 2, 10)), ['not_in_catalog'])
+        self.assertEqual(shopping_cart.total_cents, 4000)
+
+
+    def test_shopping_cart_total_cents(self):
+        """ Teste do total do carrinho mantido em centavos inteiros, sem o acúmulo de erros do float
+        """
+        self.assertEqual(cls.to_cents(10.99), 1099)
+        self.assertEqual(cls.to_cents(0.1), 10)
+        self.assertEqual(cls.to_cents('2.005'), 201)
+        self.assertEqual(str(cls.from_cents(123456)), '1234.56')
+
+        catalog = self.build_catalog(1000, 0.1, 1, 1, 1000)
+        shopping_cart = cls.Shopping_Cart()
+        self.assertEqual(shopping_cart.total_price, 0)
+
+        for id in range(1, 1001):
+            shopping_cart.add_to_shopping_cart(self.item(catalog, id, 3))
+
+        self.assertEqual(shopping_cart.total_cents, 30000)
+        self.assertEqual(str(shopping_cart.total_price), '300.00')
+
+        shopping_cart.update_to_shopping_cart(self.item(catalog, 1, 13))
+        shopping_cart.remove_from_shopping_cart(self.item(catalog, 2, 0))
+        self.assertEqual(shopping_cart.total_cents, 30070)
+        self.assertEqual(shopping_cart.total_cents, sum(item.price_cents * item.quantity for item in shopping_cart.items))
+
+        # As falhas de validação não alteram o total
+        shopping_cart.add_to_shopping_cart(self.item(catalog, 1, 5))
+        shopping_cart.update_to_shopping_cart(self.item(catalog, 3, 5000))
+        self.assertEqual(shopping_cart.total_cents, 30070)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file